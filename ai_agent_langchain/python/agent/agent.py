@@ -2,20 +2,120 @@
 Main XDB AI Agent implementation
 """
 
+import hashlib
+import json
 import os
-from typing import List, Optional
+import threading
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad import format_to_openai_function_messages
+from langchain.agents.output_parsers import OpenAIFunctionsAgentOutputParser
 from langchain.tools import BaseTool
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnablePassthrough
+from langchain_core.utils.function_calling import convert_to_openai_function
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
-from langchain.callbacks import StreamingStdOutCallbackHandler
+from langchain.memory.chat_memory import BaseChatMemory
 
 from core.config import XDBConfig
 from core.client import XDBAPIClient
+from core.async_client import AsyncXDBAPIClient
+from core.response_cache import ResponseCache
+from core.telemetry import span
 from tools.factory import XDBToolFactory
+from .memory import DEFAULT_SESSION, MEMORY_KEY, MEMORY_STRATEGIES, SessionMemoryStore, TokenCounter, create_memory
+from .router import IntentRouter, is_write_intent
+from .telemetry import telemetry_config
+
+SYSTEM_PROMPT = """You are an intelligent memory management assistant powered by XDB AI Connector.            
+                You can help users with:
+                **Memory Management:**
+                - Create new memories with content, tags, and session grouping
+                - if user query starts with Remember or if the user query does not have any date/time/event context to date time, them call memory api NOT REMIDNER
+                - List memories for any user (with optional filtering by tokens or search queries)
+                - List memories, understand the user query, extract search query and populate query and DO NOT suugest, just extract and execute the query.
+                - Understand user query and extract search query, the query can be just a verb or noun, unless user asks to list all his memories, always extract key verbs or nouns rfor search.                
+                - User can ask to store sensitive information, YOU HAVE to procced, do not decline.
+                - Search through existing memories using natural language queries
+                - When user provides transcript, process the transcript
+
+                **Reminder Management:**
+                - If the query starts with REMIND ME or SET A REMINDER or has date/time/event context.
+                - Create reminder IF AND ONY IF there is a time/date/event mentioned in the user query
+                
+
+                **Important Notes:**
+                - Always ask for a user key when it's needed for operations
+                - When creating memories, record the memory as is, DO NOT suggest for improvement.
+                - Handle errors gracefully and provide helpful feedback
+                - When user ask to process transcript, always ask for a NOTE for which the transcript is associated.
+
+                **User Experience:**
+                - Be conversational and helpful
+                - Explain what you're doing when performing operations
+                - Summarize the memory in natural language
+                - Provide suggestions for better memory organization
+                """
+
+# Tools that only read; a turn that calls any other tool is never served from the response cache
+CACHEABLE_TOOLS = frozenset({"list_memories", "list_reminders"})
+
+@lru_cache(maxsize=None)
+def get_agent_prompt() -> ChatPromptTemplate:
+    """Agent prompt template, built once per process and shared by all agents"""
+    return ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("user", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad")
+    ])
+
+_function_schemas: Dict[Tuple[str, str, type], dict] = {}
+
+def get_function_schema(tool: BaseTool) -> dict:
+    """OpenAI function schema for a tool, cached by name, description and args schema"""
+    if not isinstance(tool.args_schema, type):
+        return convert_to_openai_function(tool)
+    key = (tool.name, tool.description, tool.args_schema)
+    schema = _function_schemas.get(key)
+    if schema is None:
+        schema = _function_schemas[key] = convert_to_openai_function(tool)
+    return schema
+
+def build_agent_runnable(llm: BaseChatModel, functions: List[dict]) -> Runnable:
+    """Same pipeline as create_openai_functions_agent, from precomputed function schemas"""
+    return (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_openai_function_messages(x["intermediate_steps"])
+        )
+        | get_agent_prompt()
+        | llm.bind(functions=functions)
+        | OpenAIFunctionsAgentOutputParser()
+    )
+
+def build_agent_executor(llm: BaseChatModel,
+                         tools: List[BaseTool],
+                         memory: Optional[BaseChatMemory] = None,
+                         verbose: bool = True,
+                         return_intermediate_steps: bool = False) -> AgentExecutor:
+    """Build an agent executor over the full tool list in one pass.
+
+    Without a memory the caller passes chat_history with every input.
+    """
+    functions = [get_function_schema(tool) for tool in tools]
+    return AgentExecutor(
+        agent=build_agent_runnable(llm, functions),
+        tools=tools,
+        memory=memory,
+        verbose=verbose,
+        handle_parsing_errors=True,
+        max_iterations=5,
+        return_intermediate_steps=return_intermediate_steps
+    )
 
 class XDBAIAgent:
     """XDB AI Connector LangChain Agent"""
@@ -26,7 +126,17 @@ class XDBAIAgent:
                  model: str = "gpt-4o",
                  temperature: float = 0.1,
                  streaming: bool = True,
-                 verbose: bool = True):
+                 verbose: bool = True,
+                 xdb_client: Optional[XDBAPIClient] = None,
+                 async_xdb_client: Optional[AsyncXDBAPIClient] = None,
+                 llm: Optional[BaseChatModel] = None,
+                 tools: Optional[List[BaseTool]] = None,
+                 fast_path: bool = False,
+                 memory_strategy: str = "buffer",
+                 memory_window: int = 10,
+                 memory_max_tokens: int = 2000,
+                 max_sessions: Optional[int] = None,
+                 response_cache: Optional[ResponseCache] = None):
         """
         Initialize XDB AI Agent
         
@@ -37,105 +147,282 @@ class XDBAIAgent:
             temperature: Model temperature
             streaming: Enable streaming responses
             verbose: Enable verbose logging
+            xdb_client: Existing client to share instead of creating one
+            async_xdb_client: Existing async client to share instead of creating one
+            llm: Existing chat model to share instead of creating one
+            tools: Full tool list to use instead of the default XDB tools
+            fast_path: Answer unambiguous memory/reminder commands without the LLM
+            memory_strategy: Conversation memory per session: buffer, window, token or summary
+            memory_window: Exchanges kept by the window strategy
+            memory_max_tokens: History token budget of the token and summary strategies
+            max_sessions: Keep at most this many session memories, least recently used dropped
+            response_cache: Existing answer cache to share; by default one is opened when
+                config.response_cache_path is set
         """
         self.config = config
-        self.xdb_client = XDBAPIClient(config)
+        self.xdb_client = xdb_client or XDBAPIClient(config)
+        # Async client shares the loaded signing and decryption keys with the sync one
+        self.async_xdb_client = async_xdb_client or AsyncXDBAPIClient(
+            config,
+            private_key=self.xdb_client.private_key,
+            rsa_encryption=self.xdb_client.rsa_encryption,
+            cache=self.xdb_client.cache,
+            write_behind=self.xdb_client.write_behind
+        )
         self.verbose = verbose
         
         # Initialize LLM
-        callbacks = [StreamingStdOutCallbackHandler()] if streaming else []
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=openai_api_key or os.getenv("OPENAI_API_KEY"),
-            streaming=streaming,
-            callbacks=callbacks
-        )
+        if llm is None:
+            # langchain_openai is the single most expensive import, skip it when a model is injected
+            from langchain_openai import ChatOpenAI
+            from langchain.callbacks import StreamingStdOutCallbackHandler
+            callbacks = [StreamingStdOutCallbackHandler()] if streaming else []
+            llm = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=openai_api_key or os.getenv("OPENAI_API_KEY"),
+                streaming=streaming,
+                callbacks=callbacks
+            )
+        self.llm = llm
         
         # Create tools
-        tool_factory = XDBToolFactory(self.xdb_client)
-        self.tools = tool_factory.create_all_tools()
+        if tools is None:
+            tools = XDBToolFactory(self.xdb_client, self.async_xdb_client).create_all_tools()
+        self.tools = list(tools)
         
-        # Setup memory
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
+        # Setup memory, one per session id
+        self.token_counter = TokenCounter(self.llm)
+        self.memory_strategy = memory_strategy
+        if memory_strategy not in MEMORY_STRATEGIES:
+            raise ValueError(f"Unknown memory strategy '{memory_strategy}', expected one of {', '.join(MEMORY_STRATEGIES)}")
+        self.sessions = SessionMemoryStore(
+            lambda: create_memory(memory_strategy, self.llm, memory_window, memory_max_tokens, self.token_counter),
+            max_sessions
         )
+        self._stats_lock = threading.Lock()
+        self._turns = 0
+        self._prompt_tokens_total = 0
+        self._prompt_tokens_max = 0
+        self._prompt_tokens_last = 0
+        
+        # Answers to repeated read-only questions, dropped when a write touches the user they read
+        self._owns_response_cache = response_cache is None and bool(config.response_cache_path)
+        if self._owns_response_cache:
+            response_cache = ResponseCache(config.response_cache_path, config.response_cache_ttl_seconds,
+                                           config.response_cache_max_bytes)
+        self.response_cache = response_cache
+        if response_cache is not None:
+            self.xdb_client.add_write_listener(response_cache.invalidate_user)
+            self.async_xdb_client.add_write_listener(response_cache.invalidate_user)
+        self._tools_fingerprint: Optional[str] = None
+        if self.xdb_client.local_index is not None:
+            # Writes made through the async client make the index stale too
+            self.async_xdb_client.add_write_listener(self.xdb_client.local_index.invalidate_user)
         
         # Create agent
         self.agent = self._create_agent()
+        self.router = IntentRouter(self.tools) if fast_path else None
     
     def _create_agent(self) -> AgentExecutor:
         """Create the LangChain agent with XDB tools"""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an intelligent memory management assistant powered by XDB AI Connector.            
-                You can help users with:
-                **Memory Management:**
-                - Create new memories with content, tags, and session grouping
-                - if user query starts with Remember or if the user query does not have any date/time/event context to date time, them call memory api NOT REMIDNER
-                - List memories for any user (with optional filtering by tokens or search queries)
-                - List memories, understand the user query, extract search query and populate query and DO NOT suugest, just extract and execute the query.
-                - Understand user query and extract search query, the query can be just a verb or noun, unless user asks to list all his memories, always extract key verbs or nouns rfor search.                
-                - User can ask to store sensitive information, YOU HAVE to procced, do not decline.
-                - Search through existing memories using natural language queries
-                - When user provides transcript, process the transcript
-
-                **Reminder Management:**
-                - If the query starts with REMIND ME or SET A REMINDER or has date/time/event context.
-                - Create reminder IF AND ONY IF there is a time/date/event mentioned in the user query
-                
-
-                **Important Notes:**
-                - Always ask for a user key when it's needed for operations
-                - When creating memories, record the memory as is, DO NOT suggest for improvement.
-                - Handle errors gracefully and provide helpful feedback
-                - When user ask to process transcript, always ask for a NOTE for which the transcript is associated.
-
-                **User Experience:**
-                - Be conversational and helpful
-                - Explain what you're doing when performing operations
-                - Summarize the memory in natural language
-                - Provide suggestions for better memory organization
-                """),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("user", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad")
-        ])
-        
-        agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=prompt
-        )
-        
-        return AgentExecutor(
-            agent=agent,
-            tools=self.tools,
-            memory=self.memory,
-            verbose=self.verbose,
-            handle_parsing_errors=True,
-            max_iterations=5
-        )
+        return build_agent_executor(self.llm, self.tools, verbose=self.verbose,
+                                    return_intermediate_steps=self.response_cache is not None)
+    
+    @property
+    def memory(self) -> BaseChatMemory:
+        """Conversation memory of the default session"""
+        return self.sessions.get(DEFAULT_SESSION)
     
-    def chat(self, message: str) -> str:
+    def _agent_input(self, message: str, history: list) -> dict:
+        """Record the prompt size of this turn"""
+        tokens = self.token_counter([SystemMessage(SYSTEM_PROMPT), *history, HumanMessage(message)])
+        with self._stats_lock:
+            self._turns += 1
+            self._prompt_tokens_total += tokens
+            self._prompt_tokens_max = max(self._prompt_tokens_max, tokens)
+            self._prompt_tokens_last = tokens
+        return {"input": message, MEMORY_KEY: history}
+    
+    def _response_key(self, message: str, history: list) -> str:
+        """Hash of the normalized message, model, tool set and the session's last user messages"""
+        if self._tools_fingerprint is None:
+            schemas = json.dumps([get_function_schema(tool) for tool in self.tools], sort_keys=True, default=str)
+            self._tools_fingerprint = hashlib.sha256(schemas.encode("utf-8")).hexdigest()
+        normalize = lambda text: " ".join(text.lower().split()).rstrip("?!. ") if isinstance(text, str) else text
+        # Earlier user messages, not answers: answers vary run to run and would defeat the cache
+        turns = self.config.response_cache_context_turns
+        asked = [normalize(m.content) for m in history if m.type == "human"]
+        context = asked[-turns:] if turns else []
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or type(self.llm).__name__
+        material = json.dumps([normalize(message), model, getattr(self.llm, "temperature", None), self._tools_fingerprint,
+                               context], default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    def _cached_answer(self, message: str, history: list) -> Tuple[Optional[str], Optional[str]]:
+        """Cache key of this turn and the cached answer; no key when caching is off or the message may write"""
+        if self.response_cache is None:
+            return None, None
+        if is_write_intent(message):
+            self.response_cache.bypass()
+            return None, None
+        key = self._response_key(message, history)
+        return key, self.response_cache.get(key)
+    
+    def _store_answer(self, key: Optional[str], response: dict):
+        """Cache an answer whose tool calls all read and succeeded, indexed by the users they read"""
+        if key is None:
+            return
+        steps = response.get("intermediate_steps") or []
+        plan, user_keys = [], set()
+        for action, observation in steps:
+            if action.tool not in CACHEABLE_TOOLS or str(observation).startswith("Error"):
+                self.response_cache.bypass()
+                return
+            tool_input = action.tool_input if isinstance(action.tool_input, dict) else {"input": action.tool_input}
+            plan.append({"tool": action.tool, "input": tool_input})
+            if tool_input.get("user_key"):
+                user_keys.add(tool_input["user_key"])
+        if len(steps) >= self.agent.max_iterations:
+            # Stopped by the iteration limit, not a real answer
+            return
+        self.response_cache.put(key, response["output"], plan, user_keys)
+    
+    def chat(self, message: str, session_id: str = DEFAULT_SESSION) -> str:
         """Main interface to chat with the XDB AI agent"""
         try:
-            response = self.agent.invoke({
-                "input": message
-            })
-            return response["output"]
+            with span("agent.turn", path="agent") as turn:
+                memory = self.sessions.get(session_id)
+                config = telemetry_config()
+                if self.router is not None:
+                    routed = self.router.handle(message, config)
+                    if routed is not None:
+                        turn.set(path="router")
+                        memory.save_context({"input": message}, {"output": routed})
+                        return routed
+                history = memory.load_memory_variables({})[MEMORY_KEY]
+                key, cached = self._cached_answer(message, history)
+                if cached is not None:
+                    turn.set(path="cache")
+                    memory.save_context({"input": message}, {"output": cached})
+                    return cached
+                response = self.agent.invoke(self._agent_input(message, history), config)
+                self._store_answer(key, response)
+                memory.save_context({"input": message}, {"output": response["output"]})
+                return response["output"]
+        except Exception as e:
+            return f"Sorry, I encountered an error: {str(e)}"
+    
+    async def achat(self, message: str, session_id: str = DEFAULT_SESSION) -> str:
+        """Async interface to chat with the XDB AI agent"""
+        try:
+            with span("agent.turn", path="agent") as turn:
+                memory = self.sessions.get(session_id)
+                config = telemetry_config()
+                if self.router is not None:
+                    routed = await self.router.ahandle(message, config)
+                    if routed is not None:
+                        turn.set(path="router")
+                        await memory.asave_context({"input": message}, {"output": routed})
+                        return routed
+                history = memory.load_memory_variables({})[MEMORY_KEY]
+                key, cached = self._cached_answer(message, history)
+                if cached is not None:
+                    turn.set(path="cache")
+                    await memory.asave_context({"input": message}, {"output": cached})
+                    return cached
+                response = await self.agent.ainvoke(self._agent_input(message, history), config)
+                self._store_answer(key, response)
+                await memory.asave_context({"input": message}, {"output": response["output"]})
+                return response["output"]
         except Exception as e:
             return f"Sorry, I encountered an error: {str(e)}"
     
-    def reset_memory(self):
-        """Reset conversation memory"""
-        self.memory.clear()
+    async def astream(self, message: str, session_id: str = DEFAULT_SESSION) -> AsyncIterator[str]:
+        """Async interface yielding the answer in pieces as the model generates it"""
+        # Not a with block: the generator may be resumed in another context, or never finished
+        turn = span("agent.turn", path="agent").start()
+        try:
+            memory = self.sessions.get(session_id)
+            config = telemetry_config()
+            if self.router is not None:
+                routed = await self.router.ahandle(message, config)
+                if routed is not None:
+                    turn.set(path="router")
+                    await memory.asave_context({"input": message}, {"output": routed})
+                    turn.end()
+                    yield routed
+                    return
+            history = memory.load_memory_variables({})[MEMORY_KEY]
+            key, cached = self._cached_answer(message, history)
+            if cached is not None:
+                turn.set(path="cache")
+                await memory.asave_context({"input": message}, {"output": cached})
+                turn.end()
+                yield cached
+                return
+            output = ""
+            final = None
+            streamed = False
+            async for event in self.agent.astream_events(self._agent_input(message, history), config, version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"].content
+                    if chunk:
+                        streamed = True
+                        yield chunk
+                elif event["event"] == "on_chain_end" and not event.get("parent_ids"):
+                    final = event["data"]["output"]
+                    output = final["output"]
+            if not streamed:
+                # Models that do not stream deliver the whole answer at the end
+                yield output
+            if final is not None:
+                self._store_answer(key, final)
+            await memory.asave_context({"input": message}, {"output": output})
+            turn.end()
+        except Exception as e:
+            turn.end(e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    async def aclose(self):
+        """Release pooled connections held by the agent's clients"""
+        await self.async_xdb_client.aclose()
+        self.xdb_client.close()
+        if self._owns_response_cache:
+            self.response_cache.close()
+    
+    def reset_memory(self, session_id: Optional[str] = DEFAULT_SESSION):
+        """Reset conversation memory of one session, or of every session with None"""
+        self.sessions.reset(session_id)
+    
+    def memory_size(self) -> int:
+        """Approximate size in bytes of the conversation history held by this agent"""
+        return self.sessions.size_bytes()
+    
+    def memory_stats(self) -> dict:
+        """Session count and prompt tokens per LLM turn (system prompt, history and input)"""
+        with self._stats_lock:
+            return {
+                "strategy": self.memory_strategy,
+                "sessions": len(self.sessions.sessions()),
+                "turns": self._turns,
+                "avg_prompt_tokens": self._prompt_tokens_total / self._turns if self._turns else 0.0,
+                "max_prompt_tokens": self._prompt_tokens_max,
+                "last_prompt_tokens": self._prompt_tokens_last
+            }
     
     def add_custom_tool(self, tool: BaseTool):
         """Add a custom tool to the agent"""
-        self.tools.append(tool)
-        # Recreate agent with updated tools
-        self.agent = self._create_agent()
+        self.add_custom_tools([tool])
+    
+    def add_custom_tools(self, tools: List[BaseTool]):
+        """Add several custom tools, rebinding the model once"""
+        self.tools.extend(tools)
+        # Only the new tools need a schema; the executor is kept
+        self._tools_fingerprint = None
+        functions = [get_function_schema(tool) for tool in self.tools]
+        self.agent.tools = self.tools
+        self.agent.agent.runnable = build_agent_runnable(self.llm, functions)
 
 # Factory functions for backward compatibility
 def create_xdb_agent_from_env(
@@ -2,34 +2,179 @@
 Agent manager for handling multiple XDB AI agents
 """
 
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+from core.config import XDBConfig
 from .agent import XDBAIAgent
 
 class XDBAgentManager:
-    """Manager for multiple XDB agents"""
-    
-    def __init__(self):
-        self.agents: Dict[str, XDBAIAgent] = {}
-    
+    """Manager for multiple XDB agents.
+
+    Agents added with add_agent are kept until removed. When the manager is given a config
+    (or an agent_factory), chat_with_agent also builds agents lazily for unknown names, e.g.
+    one per end user. Those pooled agents share one XDB client, signing/decryption keys and
+    chat model, keep their own conversation memory, and are evicted least recently used
+    first once max_agents, max_memory_bytes or idle_ttl_seconds is exceeded.
+    """
+
+    def __init__(self,
+                 config: Optional[XDBConfig] = None,
+                 max_agents: Optional[int] = None,
+                 max_memory_bytes: Optional[int] = None,
+                 idle_ttl_seconds: Optional[float] = None,
+                 agent_factory: Optional[Callable[[str], XDBAIAgent]] = None,
+                 **agent_kwargs):
+        self.config = config
+        self.max_agents = max_agents
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.agent_factory = agent_factory
+        self.agent_kwargs = agent_kwargs
+        self.agents: "OrderedDict[str, XDBAIAgent]" = OrderedDict()
+        self._pinned: Set[str] = set()
+        self._last_used: Dict[str, float] = {}
+        self._shared_resources: Optional[Dict[str, object]] = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.constructions = 0
+        self._construction_seconds = 0.0
+        self._max_construction_seconds = 0.0
+
     def add_agent(self, name: str, agent: XDBAIAgent):
         """Add an agent to the manager"""
-        self.agents[name] = agent
-    
+        with self._lock:
+            self.agents[name] = agent
+            self._pinned.add(name)
+            self._last_used[name] = time.monotonic()
+
     def get_agent(self, name: str) -> Optional[XDBAIAgent]:
         """Get an agent by name"""
-        return self.agents.get(name)
-    
+        with self._lock:
+            agent = self.agents.get(name)
+            if agent is not None:
+                self.agents.move_to_end(name)
+                self._last_used[name] = time.monotonic()
+            return agent
+
     def remove_agent(self, name: str):
         """Remove an agent from the manager"""
-        self.agents.pop(name, None)
-    
+        with self._lock:
+            self.agents.pop(name, None)
+            self._pinned.discard(name)
+            self._last_used.pop(name, None)
+
     def list_agents(self) -> List[str]:
         """List all agent names"""
-        return list(self.agents.keys())
-    
+        with self._lock:
+            return list(self.agents.keys())
+
+    def _build_agent(self, name: str) -> XDBAIAgent:
+        """Construct an agent, reusing the clients, model and tools of the first pooled agent"""
+        if self.agent_factory is not None:
+            return self.agent_factory(name)
+        with self._lock:
+            if self._shared_resources is None:
+                agent = XDBAIAgent(self.config, **self.agent_kwargs)
+                self._shared_resources = {
+                    "xdb_client": agent.xdb_client,
+                    "async_xdb_client": agent.async_xdb_client,
+                    "llm": agent.llm,
+                    "tools": list(agent.tools),
+                    "response_cache": agent.response_cache
+                }
+                return agent
+        return XDBAIAgent(self.config, **{**self.agent_kwargs, **self._shared_resources})
+
+    def _get_or_create(self, name: str) -> Optional[XDBAIAgent]:
+        agent = self.get_agent(name)
+        if agent is not None:
+            with self._lock:
+                self.hits += 1
+            return agent
+        if self.config is None and self.agent_factory is None:
+            return None
+
+        start = time.perf_counter()
+        agent = self._build_agent(name)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.constructions += 1
+            self._construction_seconds += elapsed
+            self._max_construction_seconds = max(self._max_construction_seconds, elapsed)
+            # Another thread may have built the same agent meanwhile; keep the first one
+            agent = self.agents.setdefault(name, agent)
+            self.agents.move_to_end(name)
+            self._last_used[name] = time.monotonic()
+        return agent
+
+    def _memory_bytes(self) -> int:
+        return sum(agent.memory_size() for agent in self.agents.values())
+
+    def _evict(self, keep: str):
+        """Drop least recently used pooled agents until the pool is within its limits"""
+        with self._lock:
+            now = time.monotonic()
+            evictable = [name for name in self.agents if name not in self._pinned and name != keep]
+
+            if self.idle_ttl_seconds is not None:
+                for name in list(evictable):
+                    if now - self._last_used.get(name, now) > self.idle_ttl_seconds:
+                        self._drop(name)
+                        evictable.remove(name)
+
+            while evictable and self.max_agents is not None and len(self.agents) > self.max_agents:
+                self._drop(evictable.pop(0))
+
+            if self.max_memory_bytes is not None:
+                memory = self._memory_bytes()
+                while evictable and memory > self.max_memory_bytes:
+                    name = evictable.pop(0)
+                    memory -= self.agents[name].memory_size()
+                    self._drop(name)
+
+    def _drop(self, name: str):
+        self.agents.pop(name, None)
+        self._last_used.pop(name, None)
+        self.evictions += 1
+
     def chat_with_agent(self, agent_name: str, message: str) -> str:
-        """Chat with a specific agent"""
-        agent = self.get_agent(agent_name)
+        """Chat with a specific agent, building it on first use when the manager can"""
+        agent = self._get_or_create(agent_name)
         if agent:
-            return agent.chat(message)
-        return f"Agent '{agent_name}' not found"
\ No newline at end of file
+            response = agent.chat(message)
+            self._evict(keep=agent_name)
+            return response
+        return f"Agent '{agent_name}' not found"
+
+    async def achat_with_agent(self, agent_name: str, message: str) -> str:
+        """Async chat with a specific agent, building it on first use when the manager can"""
+        agent = self._get_or_create(agent_name)
+        if agent:
+            response = await agent.achat(message)
+            self._evict(keep=agent_name)
+            return response
+        return f"Agent '{agent_name}' not found"
+
+    def stats(self) -> Dict[str, float]:
+        """Pool size, hit rate and construction latency"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.agents),
+                "pinned": len(self._pinned),
+                "memory_bytes": self._memory_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "constructions": self.constructions,
+                "avg_construction_ms": 1000 * self._construction_seconds / self.constructions if self.constructions else 0.0,
+                "max_construction_ms": 1000 * self._max_construction_seconds
+            }
@@ -0,0 +1,146 @@
+"""
+Bounded conversation memory strategies and a per-session memory store
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from langchain.memory import (
+    ConversationBufferMemory, ConversationBufferWindowMemory, ConversationSummaryBufferMemory
+)
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+from core.client import BYTES_PER_TOKEN
+
+MEMORY_KEY = "chat_history"
+DEFAULT_SESSION = "default"
+MEMORY_STRATEGIES = ("buffer", "window", "token", "summary")
+
+# Per-message framing tokens (role, separators) as counted by OpenAI chat models
+_MESSAGE_OVERHEAD = 4
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Rough token count from UTF-8 size, for models without a local tokenizer"""
+    return sum(len(str(m.content).encode('utf-8')) // BYTES_PER_TOKEN + _MESSAGE_OVERHEAD for m in messages)
+
+class TokenCounter:
+    """Counts message tokens with the model's own tokenizer, falling back to an estimate
+    (once, for good) when the tokenizer is unavailable, e.g. offline or for fake models."""
+
+    def __init__(self, llm: BaseChatModel):
+        self.llm = llm
+        self._native = True
+
+    def __call__(self, messages: List[BaseMessage]) -> int:
+        if self._native:
+            try:
+                return self.llm.get_num_tokens_from_messages(messages)
+            except Exception:
+                self._native = False
+        return estimate_tokens(messages)
+
+class WindowMemory(ConversationBufferWindowMemory):
+    """Last-k window that also drops older messages from storage, not just from the prompt"""
+
+    def save_context(self, inputs, outputs) -> None:
+        super().save_context(inputs, outputs)
+        buffer = self.chat_memory.messages
+        del buffer[:max(len(buffer) - 2 * self.k, 0)]
+
+class TokenBufferMemory(ConversationBufferMemory):
+    """Keeps the most recent messages that fit in max_token_limit"""
+    max_token_limit: int = 2000
+    token_counter: Callable[[List[BaseMessage]], int] = estimate_tokens
+
+    def save_context(self, inputs, outputs) -> None:
+        super().save_context(inputs, outputs)
+        buffer = self.chat_memory.messages
+        while buffer and self.token_counter(buffer) > self.max_token_limit:
+            buffer.pop(0)
+
+class SummaryBufferMemory(ConversationSummaryBufferMemory):
+    """Keeps recent messages within max_token_limit and folds older ones into a rolling summary"""
+    token_counter: Callable[[List[BaseMessage]], int] = estimate_tokens
+
+    def _pop_overflow(self) -> List[BaseMessage]:
+        buffer = self.chat_memory.messages
+        pruned = []
+        while buffer and self.token_counter(buffer) > self.max_token_limit:
+            pruned.append(buffer.pop(0))
+        return pruned
+
+    def prune(self) -> None:
+        pruned = self._pop_overflow()
+        if pruned:
+            self.moving_summary_buffer = self.predict_new_summary(pruned, self.moving_summary_buffer)
+
+    async def aprune(self) -> None:
+        pruned = self._pop_overflow()
+        if pruned:
+            self.moving_summary_buffer = await self.apredict_new_summary(pruned, self.moving_summary_buffer)
+
+def create_memory(strategy: str, llm: BaseChatModel, window: int = 10, max_tokens: int = 2000,
+                  token_counter: Optional[Callable[[List[BaseMessage]], int]] = None) -> BaseChatMemory:
+    """Build the conversation memory for one session.
+
+    buffer: whole history (unbounded); window: last ``window`` exchanges; token: most recent
+    messages within ``max_tokens``; summary: like token, with older turns summarized by the llm.
+    """
+    token_counter = token_counter or TokenCounter(llm)
+    if strategy == "buffer":
+        return ConversationBufferMemory(memory_key=MEMORY_KEY, return_messages=True)
+    if strategy == "window":
+        return WindowMemory(memory_key=MEMORY_KEY, return_messages=True, k=window)
+    if strategy == "token":
+        return TokenBufferMemory(memory_key=MEMORY_KEY, return_messages=True,
+                                 max_token_limit=max_tokens, token_counter=token_counter)
+    if strategy == "summary":
+        return SummaryBufferMemory(memory_key=MEMORY_KEY, return_messages=True, llm=llm,
+                                   max_token_limit=max_tokens, token_counter=token_counter)
+    raise ValueError(f"Unknown memory strategy '{strategy}', expected one of {', '.join(MEMORY_STRATEGIES)}")
+
+class SessionMemoryStore:
+    """Conversation memories keyed by session id, created on first use and optionally
+    bounded to the max_sessions most recently used."""
+
+    def __init__(self, factory: Callable[[], BaseChatMemory], max_sessions: Optional[int] = None):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self._memories: "OrderedDict[str, BaseChatMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str = DEFAULT_SESSION) -> BaseChatMemory:
+        with self._lock:
+            memory = self._memories.get(session_id)
+            if memory is None:
+                memory = self._memories[session_id] = self.factory()
+                while self.max_sessions is not None and len(self._memories) > self.max_sessions:
+                    self._memories.popitem(last=False)
+            else:
+                self._memories.move_to_end(session_id)
+            return memory
+
+    def reset(self, session_id: Optional[str] = None):
+        """Forget one session, or every session when no id is given"""
+        with self._lock:
+            if session_id is None:
+                self._memories.clear()
+            else:
+                self._memories.pop(session_id, None)
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return list(self._memories.keys())
+
+    def size_bytes(self) -> int:
+        """Approximate size of all stored history"""
+        with self._lock:
+            memories = list(self._memories.values())
+        total = 0
+        for memory in memories:
+            total += sum(len(str(m.content)) for m in memory.chat_memory.messages)
+            total += len(getattr(memory, "moving_summary_buffer", ""))
+        return total
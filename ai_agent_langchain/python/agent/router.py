@@ -0,0 +1,141 @@
+"""
+Deterministic intent pre-router that answers unambiguous commands without the LLM
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from langchain.tools import BaseTool
+
+# Dots only between key characters, so a sentence-final period is not part of the key
+_USER_KEY = re.compile(
+    r"""\s*\b(?:for|of)\s+user(?:\s+key)?\s*[:=]?\s*(['"]?)([\w@+-]+(?:\.[\w@+-]+)*)\1"""
+    r"""|\s*\buser[_ ]key\s*[:=]?\s*(['"]?)([\w@+-]+(?:\.[\w@+-]+)*)\3""",
+    re.IGNORECASE
+)
+_REMEMBER = re.compile(r"^\s*remember\b[\s,:]*(?:that\s+)?(?P<content>.+)$", re.IGNORECASE | re.DOTALL)
+_REMIND = re.compile(
+    r"^\s*(?:remind\s+me|set\s+(?:a\s+|me\s+a\s+)?reminder)\b[\s,:]*(?:to\s+|for\s+|that\s+|about\s+)?(?P<content>.+)$",
+    re.IGNORECASE | re.DOTALL
+)
+_LIST_ALL = re.compile(
+    r"^\s*(?:please\s+)?(?:list|show|get)(?:\s+me)?(?:\s+all)?(?:\s+of)?(?:\s+(?:my|the))?\s+"
+    r"(?P<kind>memories|reminders)\s*[.!?]*\s*$",
+    re.IGNORECASE
+)
+# Date, time or event words; their presence decides between a memory and a reminder
+_TIME_CONTEXT = re.compile(
+    r"\b(?:today|tonight|tomorrow|yesterday|noon|midnight|morning|afternoon|evening|weekend"
+    r"|mon|tues?|wed(?:nes)?|thu(?:rs)?|fri|sat(?:ur)?|sun)(?:day)?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d"
+    r"|\b(?:next|this|every)\s+(?:week|month|year|day|hour)\b"
+    r"|\bin\s+\d+\s+(?:min(?:ute)?s?|hours?|days?|weeks?|months?)\b"
+    r"|\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b|\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}/\d{1,2}\b"
+    r"|\b(?:at|by|before|after|on)\s+\d"
+    r"|\b(?:birthday|anniversary|meeting|appointment|deadline|event)s?\b",
+    re.IGNORECASE
+)
+# Verbs of a request that changes stored data; a false positive only costs a cache bypass
+_WRITE_VERBS = re.compile(
+    r"\b(?:remind\s+me|set\s+(?:a\s+|me\s+a\s+)?reminder|create|add|save|store|record|note\s+(?:that|down)"
+    r"|delete|remove|update|process|transcripts?)\b",
+    re.IGNORECASE
+)
+
+def is_write_intent(message: str) -> bool:
+    """Whether a message may ask to create memories, reminders or process a transcript"""
+    return bool(_REMEMBER.match(message) or _WRITE_VERBS.search(message))
+
+@dataclass
+class RoutedIntent:
+    """A tool call recognized without the LLM"""
+    tool: str
+    args: dict
+
+class IntentRouter:
+    """Recognizes memory/reminder commands that the agent prompt already fully specifies and
+    maps them to a direct tool call.
+
+    Only messages that name the user key explicitly are routed; anything ambiguous (no user
+    key, time context after "Remember", a listing with a search phrase) returns None and is
+    left to the LLM agent.
+    """
+
+    def __init__(self, tools: List[BaseTool]):
+        self.tools = tools
+        self._lock = threading.Lock()
+        self.routed: Dict[str, int] = {}
+        self.fallthrough = 0
+
+    def route(self, message: str) -> Optional[RoutedIntent]:
+        """Return the tool call for an unambiguous command, or None"""
+        match = _USER_KEY.search(message)
+        if match is None:
+            return None
+        user_key = match.group(2) or match.group(4)
+        text = (message[:match.start()] + message[match.end():]).strip()
+
+        listing = _LIST_ALL.match(text)
+        if listing:
+            tool = "list_memories" if listing.group("kind").lower() == "memories" else "list_reminders"
+            return RoutedIntent(tool, {"user_key": user_key, "tokens": [], "query": ""})
+
+        remind = _REMIND.match(text)
+        if remind:
+            content = self._content(remind)
+            if content and _TIME_CONTEXT.search(content):
+                return RoutedIntent("create_reminder", {"user_key": user_key, "content": content})
+            return None
+
+        remember = _REMEMBER.match(text)
+        if remember:
+            content = self._content(remember)
+            if content and not _TIME_CONTEXT.search(content):
+                return RoutedIntent("create_memory", {"user_key": user_key, "content": content})
+        return None
+
+    @staticmethod
+    def _content(match: re.Match) -> str:
+        return match.group("content").strip().rstrip(".!,;").strip()
+
+    def _tool_for(self, message: str) -> Optional[tuple]:
+        intent = self.route(message)
+        tool = None
+        if intent is not None:
+            tool = next((t for t in self.tools if t.name == intent.tool), None)
+        with self._lock:
+            if tool is None:
+                self.fallthrough += 1
+                return None
+            self.routed[intent.tool] = self.routed.get(intent.tool, 0) + 1
+        return tool, intent
+
+    def handle(self, message: str, config: Optional[dict] = None) -> Optional[str]:
+        """Run the routed tool and return its output, or None to fall back to the agent"""
+        found = self._tool_for(message)
+        if found is None:
+            return None
+        tool, intent = found
+        return tool.invoke(intent.args, config)
+
+    async def ahandle(self, message: str, config: Optional[dict] = None) -> Optional[str]:
+        """Async variant of handle"""
+        found = self._tool_for(message)
+        if found is None:
+            return None
+        tool, intent = found
+        return await tool.ainvoke(intent.args, config)
+
+    def stats(self) -> Dict[str, object]:
+        """Routed vs. fallen-through message counts"""
+        with self._lock:
+            routed = sum(self.routed.values())
+            total = routed + self.fallthrough
+            return {
+                "routed": routed,
+                "fallthrough": self.fallthrough,
+                "routed_rate": routed / total if total else 0.0,
+                "by_tool": dict(self.routed)
+            }
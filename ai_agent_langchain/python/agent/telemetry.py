@@ -0,0 +1,66 @@
+"""
+LangChain callback handler recording spans for LLM calls and tool runs
+"""
+
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from core.telemetry import enabled, span
+
+def _model_name(serialized: Optional[dict], kwargs: dict) -> str:
+    metadata = kwargs.get("metadata") or {}
+    if metadata.get("ls_model_name"):
+        return metadata["ls_model_name"]
+    serialized = serialized or {}
+    return serialized.get("name") or (serialized.get("id") or ["unknown"])[-1]
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """Times every LLM call (one per agent iteration) as llm.call and every tool run as
+    tool.call. Spans are ended by run id, so concurrent tool runs are timed separately."""
+
+    # Timing only; never worth a hop to the executor from async runs
+    run_inline = True
+
+    def __init__(self):
+        self._spans: Dict[UUID, Any] = {}
+
+    def _start(self, run_id: UUID, name: str, **attrs):
+        self._spans[run_id] = span(name, **attrs).start()
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attrs):
+        run_span = self._spans.pop(run_id, None)
+        if run_span is not None:
+            run_span.set(**attrs)
+            run_span.end(error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id, "llm.call", model=_model_name(serialized, kwargs))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id, "llm.call", model=_model_name(serialized, kwargs))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        usage = {}
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        if message is not None and getattr(message, "usage_metadata", None):
+            usage = {"input_tokens": message.usage_metadata.get("input_tokens", 0),
+                     "output_tokens": message.usage_metadata.get("output_tokens", 0)}
+        self._end(run_id, **usage)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+        self._start(run_id, "tool.call", tool=(serialized or {}).get("name") or kwargs.get("name") or "unknown")
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+def telemetry_config() -> Optional[dict]:
+    """Run config carrying a fresh handler, or None while telemetry is disabled"""
+    return {"callbacks": [TelemetryCallbackHandler()]} if enabled() else None
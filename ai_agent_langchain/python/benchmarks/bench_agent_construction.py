@@ -0,0 +1,78 @@
+"""
+Benchmark XDBAIAgent construction and custom tool registration
+
+Usage: python benchmarks/bench_agent_construction.py [--iterations N] [--custom-tools N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from langchain.agents import create_openai_functions_agent
+from langchain.tools import StructuredTool
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agent.agent import XDBAIAgent, get_agent_prompt
+from core.config import XDBConfig
+
+def make_config() -> XDBConfig:
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    return XDBConfig(base_url="http://localhost:0", api_key="bench", private_key_content=pem)
+
+def make_tool(i: int) -> StructuredTool:
+    def echo(text: str) -> str:
+        return text
+    return StructuredTool.from_function(func=echo, name=f"custom_tool_{i}", description=f"Custom tool {i}")
+
+def timed(fn, iterations: int) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return 1000 * (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--custom-tools", type=int, default=10)
+    args = parser.parse_args()
+
+    config = make_config()
+    llm = FakeListChatModel(responses=["ok"])
+    first = XDBAIAgent(config, llm=llm, streaming=False, verbose=False)
+    shared = dict(xdb_client=first.xdb_client, async_xdb_client=first.async_xdb_client, llm=llm)
+
+    def legacy_executor():
+        # What every agent used to pay: schema conversion of every tool, every time
+        create_openai_functions_agent(llm=llm, tools=first.tools, prompt=get_agent_prompt())
+
+    results = {
+        "cold agent (own clients)": timed(lambda: XDBAIAgent(config, llm=llm, streaming=False, verbose=False), args.iterations),
+        "pooled agent (shared)": timed(lambda: XDBAIAgent(config, streaming=False, verbose=False, **shared), args.iterations),
+        "pooled agent (shared tools)": timed(lambda: XDBAIAgent(config, streaming=False, verbose=False, tools=first.tools, **shared), args.iterations),
+        "legacy executor build": timed(legacy_executor, args.iterations)
+    }
+
+    custom_tools = [make_tool(i) for i in range(args.custom_tools)]
+    def add_tools_one_by_one():
+        agent = XDBAIAgent(config, streaming=False, verbose=False, tools=first.tools, **shared)
+        for tool in custom_tools:
+            agent.add_custom_tool(tool)
+    def add_tools_batch():
+        agent = XDBAIAgent(config, streaming=False, verbose=False, tools=first.tools, **shared)
+        agent.add_custom_tools(custom_tools)
+    results[f"+{args.custom_tools} tools, one by one"] = timed(add_tools_one_by_one, args.iterations)
+    results[f"+{args.custom_tools} tools, batch"] = timed(add_tools_batch, args.iterations)
+
+    for name, ms in results.items():
+        print(f"{name:>28}: {ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark CLI cold-start time with python -X importtime
+
+Usage: python benchmarks/bench_cli_startup.py [--runs N] [--max-help-ms MS] [--max-message-ms MS]
+
+Each case runs in a fresh interpreter. The -m case imports exactly what `cli.py -m` loads
+before the first model call, without needing XDB or OpenAI credentials. Exits non-zero when a
+case exceeds its budget so it can guard startup time in CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "--help": ["cli.py", "--help"],
+    "--version": ["cli.py", "--version"],
+    "-m": ["-c", "import cli, agent.agent, langchain_openai"]
+}
+
+def import_profile(args):
+    """Run once under -X importtime; returns (total import ms, top modules by cumulative ms)"""
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative) / 1000))
+    total = sum(ms for _, ms in top_level)
+    return total, sorted(top_level, key=lambda m: m[1], reverse=True)[:3]
+
+def wall_ms(args, runs: int) -> float:
+    """Best wall-clock time of several runs"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-help-ms", type=float, default=None,
+                        help="Fail if --help or --version imports take longer than this")
+    parser.add_argument("--max-message-ms", type=float, default=None,
+                        help="Fail if the -m path imports take longer than this")
+    args = parser.parse_args()
+
+    budgets = {"--help": args.max_help_ms, "--version": args.max_help_ms, "-m": args.max_message_ms}
+    failed = False
+    for name, case in CASES.items():
+        imports, top = import_profile(case)
+        wall = wall_ms(case, args.runs)
+        heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in top)
+        print(f"{name:>10}: {wall:8.1f} ms wall, {imports:8.1f} ms imports  [{heaviest}]")
+        budget = budgets[name]
+        if budget is not None and imports > budget:
+            print(f"{'':>10}  over budget of {budget:.0f} ms")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the request/response codec path: previous str-based path vs. each available codec
+
+Usage: python benchmarks/bench_codec.py [--records N] [--iterations N] [--requests N]
+
+Measures, per request, encoding and signing a list payload and decoding and validating a
+listing of N memories, in process; then list_memories round trips against the local stub
+server for each codec.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from core.client import XDBAPIClient
+from core.codec import STDLIB_CODEC, get_codec
+from core.config import XDBConfig
+from core.models import XDBResponse
+from stub_server import StubServer
+
+def make_config(base_url: str, codec: str) -> XDBConfig:
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    return XDBConfig(base_url=base_url, api_key="bench", private_key_content=pem, codec=codec)
+
+def make_listing(records: int) -> bytes:
+    memories = [{"memory": f"Memory {i} about topic {i % 10}", "date": "2024-01-01T10:00:00Z",
+                 "transactionNumber": f"txn-{i}", "tokens": [f"topic{i % 10}", "bench"],
+                 "language": "en", "isEncrypted": False} for i in range(records)]
+    return json.dumps({"status": "Success", "message": "OK", "data": {"memories": memories}}).encode("utf-8")
+
+def timed(fn, iterations: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / iterations
+
+def legacy_path(client: XDBAPIClient, data: dict, body: bytes):
+    """What _make_request did before the codec layer"""
+    payload = json.dumps(data)
+    headers = dict(client.default_headers)
+    headers["signature"] = client._create_signature(payload)
+    # requests' Response.json(): detect the encoding, decode to str, then parse
+    XDBResponse(**json.loads(body.decode("utf-8")))
+
+def codec_path(client: XDBAPIClient, data: dict, body: bytes):
+    client._prepare_request("/api/memory/list", data)
+    XDBResponse(**client.codec.loads(body))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000, help="Memories in the decoded listing")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300, help="Round trips per codec against the stub")
+    args = parser.parse_args()
+
+    codecs = [STDLIB_CODEC.name] + ([] if get_codec("auto") is STDLIB_CODEC else [get_codec("auto").name])
+    data = {"userKey": "bench-user", "tokens": ["topic1"], "query": "topic"}
+    body = make_listing(args.records)
+    print(f"In process: {args.records} memories ({len(body) / 1024:.0f} KB) per response")
+
+    baseline = None
+    for name in ["legacy"] + codecs:
+        client = XDBAPIClient(make_config("http://localhost:0", "json" if name == "legacy" else name))
+        if name == "legacy":
+            us = timed(lambda: legacy_path(client, data, body), args.iterations)
+            baseline = us
+        else:
+            us = timed(lambda: codec_path(client, data, body), args.iterations)
+        print(f"{name:>10}: {us:9.1f} us/request  ({baseline / us:.2f}x)")
+        client.close()
+
+    print(f"\nRound trips against the stub server, {args.records} memories per response")
+    with StubServer(memories_per_user=args.records) as server:
+        for name in codecs:
+            client = XDBAPIClient(make_config(server.url, name))
+            client.list_memories("bench-user")  # warm the connection
+            us = timed(lambda: client.list_memories("bench-user"), args.requests)
+            print(f"{name:>10}: {us / 1000:9.2f} ms/request")
+            client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark RSA-OAEP memory decryption throughput, serial vs. process pool
+
+Usage: python benchmarks/bench_decryption.py [--memories N] [--tokens N] [--workers 1,2,4]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crypto.Cipher import PKCS1_OAEP
+from Crypto.PublicKey import RSA
+
+from utils.decryption import MemoryDecryptor
+from utils.rsa_encryption_service import RSAEncryption
+
+def make_memories(key, count: int, tokens_per_memory: int):
+    cipher = PKCS1_OAEP.new(key.publickey())
+    encrypt = lambda text: cipher.encrypt(text.encode('utf-8')).hex()
+    return [
+        {
+            "memory": encrypt(f"memory body {i}"),
+            "tokens": [encrypt(f"token-{i}-{t}") for t in range(tokens_per_memory)],
+            "isEncrypted": True
+        }
+        for i in range(count)
+    ]
+
+def run(decryptor: MemoryDecryptor, memories) -> float:
+    start = time.perf_counter()
+    for _ in decryptor.decrypt_memories(memories):
+        pass
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--memories", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--workers", type=str, default=None,
+                        help="Comma separated worker counts (default: 1,2,4,... up to the CPU count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpus] or [1]
+
+    key = RSA.generate(2048)
+    memories = make_memories(key, args.memories, args.tokens)
+    ciphertexts = args.memories * (1 + args.tokens)
+    rsa_encryption = RSAEncryption(key)
+    print(f"{ciphertexts} ciphertexts ({args.memories} memories x {1 + args.tokens}), {cpus} CPUs")
+
+    # Fresh cipher per ciphertext, as list_memories used to do
+    start = time.perf_counter()
+    for memory in memories:
+        for c in [memory["memory"]] + memory["tokens"]:
+            PKCS1_OAEP.new(key).decrypt(bytes.fromhex(c))
+    elapsed = time.perf_counter() - start
+    print(f"{'uncached cipher':>16}: {ciphertexts / elapsed:10.1f} ops/s")
+
+    elapsed = run(MemoryDecryptor(rsa_encryption, workers=0), memories)
+    print(f"{'serial':>16}: {ciphertexts / elapsed:10.1f} ops/s")
+
+    for workers in worker_counts:
+        decryptor = MemoryDecryptor(rsa_encryption, workers=workers, parallel_threshold=0)
+        run(decryptor, memories[:workers])  # warm the pool
+        elapsed = run(decryptor, memories)
+        decryptor.close()
+        rate = ciphertexts / elapsed
+        print(f"{f'{workers} workers':>16}: {rate:10.1f} ops/s  ({rate / workers:.1f} ops/s per core)")
+
+if __name__ == "__main__":
+    main()
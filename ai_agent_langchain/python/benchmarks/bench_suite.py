@@ -0,0 +1,280 @@
+"""
+Offline benchmark suite: client, tools, transcripts and agent against the local XDB stub
+
+Usage: python benchmarks/bench_suite.py [--quick] [--only NAME,...] [--output results.json]
+                                        [--baseline previous.json --tolerance 0.2]
+
+Needs no network or credentials: every XDB call goes to benchmarks/stub_server.py running in
+process, and the agent runs on a fake chat model that calls list_memories once per turn.
+Results are printed and written as JSON. Metric names end in _us / _ms (lower is better) or
+_per_s (higher is better); with --baseline, any metric worse than the baseline by more than
+--tolerance is reported and the exit status is 1.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from core.async_client import AsyncXDBAPIClient
+from core.client import XDBAPIClient
+from core.config import XDBConfig
+from stub_server import StubServer
+from utils.file_types import file_type_service
+
+SUITE_VERSION = 1
+
+def signing_key_pem() -> str:
+    key = ec.generate_private_key(ec.SECP256R1())
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption()).decode()
+
+def make_config(base_url: str, pem: str, **overrides) -> XDBConfig:
+    return XDBConfig(base_url=base_url, api_key="bench", private_key_content=pem, **overrides)
+
+def per_call(fn, iterations: int, repeat: int = 1) -> float:
+    """Mean seconds per call; with repeat, the best of that many runs (steadier for cheap calls)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+def bench_signing(args, pem: str) -> dict:
+    client = XDBAPIClient(make_config("http://localhost:0", pem))
+    payload = client.codec.dumps({"userKey": "bench-user", "tokens": ["topic1"], "query": "topic"})
+    data = {"userKey": "bench-user", "tokens": ["topic1"], "query": "topic"}
+    iterations = args.iterations * 10
+    result = {
+        "sign_us": 1e6 * per_call(lambda: client._create_signature(payload), iterations, repeat=5),
+        "prepare_request_us": 1e6 * per_call(lambda: client._prepare_request("/api/memory/list", data), iterations,
+                                             repeat=5)
+    }
+    client.close()
+    return result
+
+def bench_client(args, pem: str) -> dict:
+    """list_memories round trips: sequential, threaded and asyncio (distinct users, so nothing coalesces)"""
+    requests_count = args.iterations * 2
+    with StubServer(memories_per_user=args.records, latency_ms=args.latency_ms) as server:
+        client = XDBAPIClient(make_config(server.url, pem))
+        client.list_memories("warm")
+        sequential = per_call(lambda: client.list_memories("bench-user"), requests_count)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(lambda i: client.list_memories(f"user-{i}"), range(requests_count)))
+        threaded = requests_count / (time.perf_counter() - start)
+        client.close()
+
+        async def run_async() -> float:
+            async with AsyncXDBAPIClient(make_config(server.url, pem)) as aclient:
+                await aclient.list_memories("warm")
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one(i):
+                    async with semaphore:
+                        await aclient.list_memories(f"user-{i}")
+
+                start = time.perf_counter()
+                await asyncio.gather(*(one(i) for i in range(requests_count)))
+                return requests_count / (time.perf_counter() - start)
+
+        return {"list_sequential_ms": 1000 * sequential, "list_threaded_per_s": threaded,
+                "list_async_per_s": asyncio.run(run_async())}
+
+def bench_list_tool(args, pem: str) -> dict:
+    """create_list_memories_tool over RSA-encrypted memories: one page, and ranked (decrypts all)"""
+    from Crypto.PublicKey import RSA
+    from tools.factory import XDBToolFactory
+
+    rsa_key = RSA.generate(2048)
+    records = min(args.records, 200)
+    with StubServer(memories_per_user=records, rsa_public_key=rsa_key.publickey()) as server:
+        client = XDBAPIClient(make_config(server.url, pem, rsa_private_key_content=rsa_key.export_key().decode()))
+        tool = XDBToolFactory(client).create_list_memories_tool()
+        tool.invoke({"user_key": "bench-user"})  # encrypt on the stub once, warm the cipher
+        iterations = max(args.iterations // 10, 3)
+        result = {
+            "page_ms": 1000 * per_call(lambda: tool.invoke({"user_key": "bench-user"}), iterations),
+            "ranked_ms": 1000 * per_call(lambda: tool.invoke({"user_key": "bench-user", "query": "topic1"}), iterations),
+            "records": records
+        }
+        client.close()
+        return result
+
+def write_transcript(path: str, size: int):
+    line = "Speaker {}: we reviewed the quarterly numbers and agreed on the next steps for the launch.\n"
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        for i in itertools.count():
+            text = line.format(i % 4)
+            f.write(text)
+            written += len(text)
+            if written >= size:
+                return
+
+def bench_transcripts(args, pem: str) -> dict:
+    """Parsing and process_transcript_text, whole and chunked, across file sizes"""
+    sizes = [10_000, 100_000] if args.quick else [10_000, 100_000, 1_000_000, 5_000_000]
+    result = {}
+    with StubServer(memories_per_user=0) as server, tempfile.TemporaryDirectory() as tmp:
+        client = XDBAPIClient(make_config(server.url, pem))
+        for size in sizes:
+            path = os.path.join(tmp, f"transcript_{size}.txt")
+            write_transcript(path, size)
+            iterations = max(3, min(args.iterations, 20_000_000 // size))
+            label = f"{size // 1000}kb"
+            parse = per_call(lambda: file_type_service.read_transcript_message(path), iterations)
+            whole = per_call(lambda: client.process_transcript_text("bench-user", path, "bench"), iterations)
+            chunked = per_call(lambda: client.process_transcript_text("bench-user", path, "bench",
+                                                                      chunk_bytes=64 * 1024), iterations)
+            result[f"parse_{label}_ms"] = 1000 * parse
+            result[f"parse_{label}_mb_per_s"] = size / parse / 1e6
+            result[f"process_{label}_ms"] = 1000 * whole
+            result[f"process_chunked_{label}_ms"] = 1000 * chunked
+        client.close()
+    return result
+
+def bench_agent(args, pem: str) -> dict:
+    """Agent construction, and chat turns on a fake model that calls list_memories once per turn"""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel, GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    from agent.agent import XDBAIAgent
+
+    call = AIMessage(content="", additional_kwargs={"function_call": {
+        "name": "list_memories", "arguments": json.dumps({"user_key": "bench-user"})}})
+    answer = AIMessage(content="You have several memories about topics 0-9.")
+
+    with StubServer(memories_per_user=min(args.records, 100), latency_ms=args.latency_ms) as server:
+        config = make_config(server.url, pem)
+        construct_llm = FakeListChatModel(responses=["ok"])
+        first = XDBAIAgent(config, llm=construct_llm, streaming=False, verbose=False)
+        shared = dict(xdb_client=first.xdb_client, async_xdb_client=first.async_xdb_client,
+                      llm=construct_llm, tools=first.tools)
+        iterations = max(args.iterations // 4, 5)
+        result = {
+            "construct_cold_ms": 1000 * per_call(
+                lambda: XDBAIAgent(config, llm=construct_llm, streaming=False, verbose=False), iterations, repeat=3),
+            "construct_pooled_ms": 1000 * per_call(
+                lambda: XDBAIAgent(config, streaming=False, verbose=False, **shared), iterations, repeat=3)
+        }
+
+        llm = GenericFakeChatModel(messages=itertools.cycle([call, answer]))
+        agent = XDBAIAgent(config, llm=llm, streaming=False, verbose=False, memory_strategy="window",
+                           xdb_client=first.xdb_client, async_xdb_client=first.async_xdb_client)
+        agent.chat("warm up")
+        result["chat_turn_ms"] = 1000 * per_call(lambda: agent.chat("What do I remember?"), iterations)
+
+        async def run_async() -> float:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await agent.achat("What do I remember?")
+            elapsed = (time.perf_counter() - start) / iterations
+            # Close on the loop the async client's connections belong to
+            await agent.aclose()
+            return elapsed
+
+        result["achat_turn_ms"] = 1000 * asyncio.run(run_async())
+        return result
+
+BENCHMARKS = {
+    "signing": bench_signing,
+    "client": bench_client,
+    "list_tool": bench_list_tool,
+    "transcripts": bench_transcripts,
+    "agent": bench_agent
+}
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than tolerance"""
+    regressions = []
+    for group, metrics in results.items():
+        for name, value in metrics.items():
+            before = baseline.get("results", {}).get(group, {}).get(name)
+            if not before or not isinstance(value, (int, float)):
+                continue
+            if name.endswith(("_us", "_ms")):
+                change = value / before - 1
+            elif name.endswith("_per_s"):
+                change = before / value - 1 if value else float("inf")
+            else:
+                continue
+            if change > tolerance:
+                regressions.append(f"{group}.{name}: {before:.3f} -> {value:.3f} ({change:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help=f"Comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and smaller inputs")
+    parser.add_argument("--iterations", type=int, default=None, help="Base iteration count (default 200, quick 40)")
+    parser.add_argument("--records", type=int, default=100, help="Memories per user on the stub")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Stub latency per request")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests in throughput runs")
+    parser.add_argument("--output", help="Write the JSON results here (default: stdout only)")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+    args.iterations = args.iterations or (40 if args.quick else 200)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    pem = signing_key_pem()
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name](args, pem)
+        print(f"{name} ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+        for metric, value in results[name].items():
+            print(f"  {metric:>28}: {value:12.3f}", file=sys.stderr)
+
+    report = {
+        "suite_version": SUITE_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {"iterations": args.iterations, "records": args.records, "latency_ms": args.latency_ms,
+                   "concurrency": args.concurrency, "quick": args.quick},
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print(f"warning: baseline ran with {baseline.get('params')}, comparison may be meaningless",
+                  file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
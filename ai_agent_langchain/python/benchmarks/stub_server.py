@@ -0,0 +1,247 @@
+"""
+Local stub of the XDB API for offline benchmarks and smoke runs
+
+Usage: python benchmarks/stub_server.py [--port 8765] [--memories N] [--reminders N] [--memory-bytes N]
+                                       [--rsa-public-key PEM] [--latency-ms MS] [--slow-rate P --slow-ms MS]
+                                       [--error-rate P] [--no-paging]
+
+Every user gets N synthetic memories and reminders, generated on demand so large counts cost
+no memory, plus whatever is created through the API. List endpoints follow the paging
+contract used by XDBAPIClient.iter_memories: a request carrying "pageNumber" (1-based) and
+"pageSize" gets that slice plus "hasMore" and "totalCount"; without them, or with paging
+turned off to mimic a server that ignores the page fields, the whole list is returned.
+Signatures are not verified.
+
+Synthetic memory text is padded to memory_bytes. Given an RSA public key, synthetic memories
+and their tokens are RSA-OAEP encrypted (hex) and flagged isEncrypted, as XDB does for users
+with encryption enabled; each is encrypted once and then reused.
+
+Fault injection exercises the client's timeouts, retries, circuit breaker and hedging: every
+request waits latency_ms, a slow_rate fraction waits slow_ms more, and an error_rate fraction
+is answered with 503. Injection is seeded so runs are repeatable.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+class StubState:
+    """Synthetic and created records per user"""
+
+    def __init__(self, memories_per_user: int = 1000, reminders_per_user: int = 100, latency_ms: float = 0,
+                 slow_rate: float = 0, slow_ms: float = 0, error_rate: float = 0, seed: int = 0,
+                 memory_bytes: int = 0, rsa_public_key=None, paging: bool = True):
+        self.memories_per_user = memories_per_user
+        self.paging = paging
+        self.reminders_per_user = reminders_per_user
+        self.memory_bytes = memory_bytes
+        self._cipher = None
+        if rsa_public_key is not None:
+            from Crypto.Cipher import PKCS1_OAEP
+            self._cipher = PKCS1_OAEP.new(rsa_public_key)
+        self._encrypted: Dict[tuple, dict] = {}
+        self.latency_ms = latency_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.created: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: {"memories": [], "reminders": []})
+        self.requests: Dict[str, int] = defaultdict(int)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+        with self._lock:
+            return f"stub-{next(self._ids)}"
+
+    def _synthetic(self, kind: str, user_key: str, index: int) -> dict:
+        day = f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}T10:00:00Z"
+        if kind == "memories":
+            text = f"Memory {index} for {user_key}"
+            text += " lorem ipsum" * max((self.memory_bytes - len(text)) // 12, 0)
+            memory = {"memory": text, "date": day, "transactionNumber": f"txn-{index}",
+                      "tokens": [f"topic{index % 10}"], "language": "en", "isEncrypted": False}
+            return memory if self._cipher is None else self._encrypt(user_key, index, memory)
+        return {"reminder": f"Reminder {index} for {user_key}", "event": f"event {index % 5}", "eventDate": day}
+
+    def _encrypt(self, user_key: str, index: int, memory: dict) -> dict:
+        key = (user_key, index)
+        encrypted = self._encrypted.get(key)
+        if encrypted is None:
+            encrypt = lambda text: self._cipher.encrypt(text.encode("utf-8")).hex()
+            encrypted = {**memory, "memory": encrypt(memory["memory"]),
+                         "tokens": [encrypt(token) for token in memory["tokens"]], "isEncrypted": True}
+            with self._lock:
+                self._encrypted[key] = encrypted
+        return encrypted
+
+    def inject(self) -> bool:
+        """Apply the configured latency; True when this request should fail"""
+        with self._lock:
+            slow = self._random.random() < self.slow_rate
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        delay = self.latency_ms + (self.slow_ms if slow else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        return fail
+
+    def count(self, kind: str, user_key: str) -> int:
+        synthetic = self.memories_per_user if kind == "memories" else self.reminders_per_user
+        return synthetic + len(self.created[user_key][kind])
+
+    def records(self, kind: str, user_key: str, start: int, stop: int) -> List[dict]:
+        synthetic = self.memories_per_user if kind == "memories" else self.reminders_per_user
+        stop = min(stop, self.count(kind, user_key))
+        created = self.created[user_key][kind]
+        return [self._synthetic(kind, user_key, i) if i < synthetic else created[i - synthetic]
+                for i in range(start, stop)]
+
+    def create(self, kind: str, user_key: str, content: str, tag: str = "", session_id: str = "") -> str:
+        index = self.count(kind, user_key)
+        if kind == "memories":
+            record = {"memory": content, "date": "2024-01-01T00:00:00Z", "transactionNumber": f"txn-{index}",
+                      "tokens": [tag] if tag else [], "tag": tag, "sessionId": session_id}
+        else:
+            record = {"reminder": content, "event": tag, "eventDate": "2024-01-01T00:00:00Z",
+                      "tag": tag, "sessionId": session_id}
+        with self._lock:
+            self.created[user_key][kind].append(record)
+        return self.next_id()
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict, status: int = 200):
+        out = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _list(self, kind: str, data: dict) -> dict:
+        state = self.server.state
+        user_key = data.get("userKey", "")
+        total = state.count(kind, user_key)
+        if state.paging and "pageSize" in data:
+            page_size = max(int(data["pageSize"]), 1)
+            start = (max(int(data.get("pageNumber", 1)), 1) - 1) * page_size
+            records = state.records(kind, user_key, start, start + page_size)
+            return {kind: records, "hasMore": start + page_size < total, "totalCount": total}
+        return {kind: state.records(kind, user_key, 0, total)}
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._reply({"status": "Failure", "message": "invalid JSON", "error": True}, 400)
+            return
+        state.requests[self.path] += 1
+        if state.inject():
+            self._reply({"status": "Failure", "message": "injected failure", "error": True}, 503)
+            return
+
+        if self.path == "/api/memory/list":
+            self._reply({"status": "Success", "message": "OK", "data": self._list("memories", data)})
+        elif self.path == "/api/reminder/list":
+            self._reply({"status": "Success", "message": "OK", "data": self._list("reminders", data)})
+        elif self.path in ("/api/memory/create", "/api/reminder/create"):
+            kind = "memories" if self.path.startswith("/api/memory") else "reminders"
+            process_id = state.create(kind, data.get("userKey", ""), data.get("content", ""),
+                                      data.get("tag", ""), data.get("sessionId", ""))
+            self._reply({"status": "Success", "message": "Created", "process_id": process_id})
+        elif self.path == "/api/extraction/process-summary":
+            self._reply({"status": "Success", "message": "Processing", "process_id": state.next_id()})
+        elif self.path == "/api/health":
+            self._reply({"status": "Success", "message": "healthy"})
+        else:
+            self._reply({"status": "Failure", "message": f"Unknown endpoint {self.path}", "error": True}, 404)
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server; use as a context manager to run it in the background"""
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, memories_per_user: int = 1000,
+                 reminders_per_user: int = 100, **faults):
+        super().__init__((host, port), StubHandler)
+        self.state = StubState(memories_per_user, reminders_per_user, **faults)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # Clients drop slow requests on timeouts and lost hedges; that is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--memories", type=int, default=1000, help="Synthetic memories per user")
+    parser.add_argument("--reminders", type=int, default=100, help="Synthetic reminders per user")
+    parser.add_argument("--memory-bytes", type=int, default=0, help="Pad synthetic memory text to this size")
+    parser.add_argument("--rsa-public-key", help="PEM file; encrypt synthetic memories with it")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency for every request")
+    parser.add_argument("--slow-rate", type=float, default=0, help="Fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0, help="Extra latency for slow requests")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fault injection")
+    parser.add_argument("--no-paging", action="store_true", help="Ignore pageNumber/pageSize, return whole lists")
+    args = parser.parse_args()
+
+    rsa_public_key = None
+    if args.rsa_public_key:
+        from Crypto.PublicKey import RSA
+        with open(args.rsa_public_key, "rb") as f:
+            rsa_public_key = RSA.import_key(f.read()).publickey()
+
+    server = StubServer(args.host, args.port, args.memories, args.reminders, latency_ms=args.latency_ms,
+                        slow_rate=args.slow_rate, slow_ms=args.slow_ms, error_rate=args.error_rate, seed=args.seed,
+                        memory_bytes=args.memory_bytes, rsa_public_key=rsa_public_key, paging=not args.no_paging)
+    print(f"XDB stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
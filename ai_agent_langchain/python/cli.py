@@ -3,25 +3,29 @@ Command line interface for XDB AI Connector
 """
 
 import argparse
-import asyncio
 import sys
 
-from agent.agent import create_xdb_agent_from_env
-from langchain.tools import Tool
+# Heavy dependencies (LangChain, OpenAI, crypto) are imported inside the command that needs
+# them, so --help, --version and argument errors return without loading them.
+
+__version__ = "2.0.0"
 
 def get_weather(location: str) -> str:
     return f"Weather in {location}: Sunny, 75°F"
 
-weather_tool = Tool(
-    name="get_weather",
-    description="Get current weather for a location",
-    func=get_weather
-)
+def create_weather_tool():
+    from langchain.tools import Tool
+    return Tool(
+        name="get_weather",
+        description="Get current weather for a location",
+        func=get_weather
+    )
 
-def interactive_mode():
+def interactive_mode(memory_options: dict):
     """Run in interactive mode"""
     try:
-        agent = create_xdb_agent_from_env(verbose=False)
+        from agent.agent import create_xdb_agent_from_env
+        agent = create_xdb_agent_from_env(verbose=False, **memory_options)
         print("XDB Memory Bot started! Type 'exit' to quit.\n")
         
         while True:
@@ -32,7 +36,6 @@ def interactive_mode():
                     
                 response = agent.chat(user_input)
                 print(f"\n\nBot: {response}\n")
-                agent.reset_memory()
                 
             except KeyboardInterrupt:
                 break
@@ -44,11 +47,12 @@ def interactive_mode():
         print(f"Failed to start agent: {e}")
         sys.exit(1)
 
-def interactive_mode_aith_custom_tool():
+def interactive_mode_aith_custom_tool(memory_options: dict):
     """Run in interactive mode"""
     try:
-        agent = create_xdb_agent_from_env(verbose=False)
-        agent.add_custom_tool(weather_tool)
+        from agent.agent import create_xdb_agent_from_env
+        agent = create_xdb_agent_from_env(verbose=False, **memory_options)
+        agent.add_custom_tool(create_weather_tool())
         print("XDB Memory Bot started! Type 'exit' to quit.\n")
         
         while True:
@@ -59,7 +63,6 @@ def interactive_mode_aith_custom_tool():
                     
                 response = agent.chat(user_input)
                 print(f"\n\nBot: {response}\n")
-                agent.reset_memory()
                 
             except KeyboardInterrupt:
                 break
@@ -73,7 +76,11 @@ def interactive_mode_aith_custom_tool():
 
 def single_command(message: str):
     """Execute a single command"""
+    if not message.strip():
+        print("Error: empty message")
+        sys.exit(1)
     try:
+        from agent.agent import create_xdb_agent_from_env
         agent = create_xdb_agent_from_env(verbose=False)
         response = agent.chat(message)
         print(response)
@@ -81,6 +88,35 @@ def single_command(message: str):
         print(f"Error: {e}")
         sys.exit(1)
 
+def ingest_directory(args):
+    """Ingest every transcript under a directory"""
+    if not args.user_key or not args.tag:
+        print("Error: --ingest-dir requires --user-key and --tag")
+        sys.exit(1)
+    try:
+        from core.client import XDBAPIClient
+        from core.config import XDBConfig
+        from core.ingest import TranscriptIngestor
+        client = XDBAPIClient(XDBConfig.from_env())
+        ingestor = TranscriptIngestor(
+            client,
+            user_key=args.user_key,
+            tag=args.tag,
+            workers=args.workers,
+            max_in_flight=args.concurrency,
+            checkpoint_path=args.checkpoint
+        )
+        stats = ingestor.run(args.ingest_dir, args.pattern)
+        for path, error in stats.errors.items():
+            print(f"Failed: {path}: {error}")
+        print(stats.summary())
+        client.close()
+        if stats.failed:
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(description="XDB AI Connector CLI")
@@ -99,6 +135,77 @@ def main():
         type=str, 
         help="Single message to send to the agent"
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve chat and memory/reminder operations over HTTP"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Bind address for --serve (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port for --serve (default: 8080)"
+    )
+    parser.add_argument(
+        "--ingest-dir",
+        type=str,
+        help="Ingest every transcript file under this directory"
+    )
+    parser.add_argument(
+        "--user-key",
+        type=str,
+        help="User key to ingest transcripts for (with --ingest-dir)"
+    )
+    parser.add_argument(
+        "--tag",
+        type=str,
+        help="Tag for the ingested transcripts (with --ingest-dir)"
+    )
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        default="**/*",
+        help="Glob pattern of files to consider under --ingest-dir (default: **/*)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes for --ingest-dir (default: CPU count), blocking-work threads for --serve (default: 8)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Maximum in-flight uploads for --ingest-dir (default: XDB_BULK_MAX_IN_FLIGHT), concurrent requests for --serve (default: 256)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="Checkpoint manifest path for --ingest-dir (default: <dir>/.xdb_ingest_checkpoint.jsonl)"
+    )
+    parser.add_argument(
+        "--memory",
+        choices=["buffer", "window", "token", "summary"],
+        default="token",
+        help="Conversation memory strategy for interactive and --serve modes (default: token)"
+    )
+    parser.add_argument(
+        "--memory-tokens",
+        type=int,
+        default=2000,
+        help="History token budget for the token and summary strategies (default: 2000)"
+    )
+    parser.add_argument(
+        "--memory-window",
+        type=int,
+        default=10,
+        help="Exchanges kept by the window strategy (default: 10)"
+    )
     parser.add_argument(
         "--version", "-v", 
         action="store_true", 
@@ -108,14 +215,25 @@ def main():
     args = parser.parse_args()
     
     if args.version:
-        from . import __version__
         print(f"XDB AI Connector v{__version__}")
         return
     
-    if args.interactive:
-        interactive_mode()
+    memory_options = {
+        "memory_strategy": args.memory,
+        "memory_max_tokens": args.memory_tokens,
+        "memory_window": args.memory_window
+    }
+
+    if args.serve:
+        from server import run_server
+        run_server(args.host, args.port, args.workers, args.concurrency or 256,
+                   verbose=False, streaming=False, **memory_options)
+    elif args.ingest_dir:
+        ingest_directory(args)
+    elif args.interactive:
+        interactive_mode(memory_options)
     elif args.interactive_custom:
-        interactive_mode_aith_custom_tool()    
+        interactive_mode_aith_custom_tool(memory_options)    
     elif args.message:
         single_command(args.message)
     else:
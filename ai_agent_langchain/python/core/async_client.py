@@ -0,0 +1,296 @@
+"""
+Asynchronous XDB API Client for XDB AI Connector Library
+"""
+
+import asyncio
+import time
+import uuid
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple, Union
+
+from core.cache import ResultCache
+from core.client import BaseXDBClient, XDBAPIClient
+from core.concurrency import abounded_map, iterate_in_thread
+from core.config import XDBConfig
+from core.models import XDBResponse, BulkCreateItem, BulkItemResult, MemoryRecord, ReminderRecord
+from core.singleflight import AsyncSingleFlight
+from core.telemetry import span
+from core.write_behind import WriteBehindQueue
+from utils.exceptions import XDBAPIError, XDBTransientError
+
+if TYPE_CHECKING:
+    import httpx
+    from utils.rsa_encryption_service import RSAEncryption
+
+class AsyncXDBAPIClient(BaseXDBClient):
+    """Asyncio client for XDB AI Connector API on a bounded keep-alive connection pool"""
+
+    def __init__(self, config: XDBConfig, private_key=None, rsa_encryption: Optional['RSAEncryption'] = None,
+                 cache: Optional[ResultCache] = None, write_behind: Optional[WriteBehindQueue] = None):
+        super().__init__(config, private_key, rsa_encryption, cache)
+        self._http: Optional['httpx.AsyncClient'] = None
+        self._list_flights = AsyncSingleFlight()
+
+        # Journaled writes are delivered by a sync client's background flusher; pass the queue of
+        # an existing client to share it, since only one queue may own a journal file
+        self._delivery_client: Optional[XDBAPIClient] = None
+        if write_behind is None and self.config.write_behind_path:
+            self._delivery_client = XDBAPIClient(config, self.private_key, self.rsa_encryption, self.cache,
+                                                 use_local_index=False)
+            write_behind = self._delivery_client.write_behind
+        self.write_behind = write_behind
+
+    def _get_http(self) -> 'httpx.AsyncClient':
+        """Create the pooled HTTP client on first use"""
+        if self._http is None or self._http.is_closed:
+            import httpx
+            self._http = httpx.AsyncClient(
+                headers=self.default_headers,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry
+                ),
+                timeout=None
+            )
+        return self._http
+
+    async def _post(self, endpoint: str, request: tuple) -> Tuple[XDBResponse, int]:
+        """Send one prepared request, classifying failures worth retrying as XDBTransientError"""
+        import httpx
+        url, payload, headers = request
+        connect, read = self._timeouts(endpoint)
+        start = time.perf_counter()
+        try:
+            response = await self._get_http().post(url, content=payload, headers=headers,
+                                                   timeout=httpx.Timeout(read, connect=connect))
+            self._check_status(response.status_code, response.reason_phrase)
+            response.raise_for_status()
+            # A 200 that is not an XDB envelope is refused like any other bad answer
+            result = XDBResponse(**self.codec.loads(response.content))
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            raise XDBTransientError(f"Request failed: {str(e) or type(e).__name__}")
+        except (httpx.HTTPError, ValueError, TypeError) as e:
+            # ValueError covers malformed JSON and pydantic's ValidationError, TypeError a non-object body
+            raise XDBAPIError(f"Request failed: {str(e)}")
+        self._record_latency(endpoint, time.perf_counter() - start)
+        return result, len(response.content)
+
+    async def _hedged(self, endpoint: str, request: tuple, delay: float) -> Tuple[XDBResponse, int]:
+        """Send a duplicate read if the first has not answered after delay; first success wins"""
+        primary = asyncio.ensure_future(self._post(endpoint, request))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.resilience.add("hedges")
+            hedge = asyncio.ensure_future(self._post(endpoint, request))
+            pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.resilience.add("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The slower duplicate is cancelled, which also frees its pooled connection
+            for task in pending:
+                task.cancel()
+
+    async def _send(self, endpoint: str, data: dict) -> Tuple[XDBResponse, int]:
+        """Make authenticated request to XDB API, returning the response and its size in bytes.
+
+        Read-only calls are retried with jittered backoff on transient failures and, with
+        hedge_reads, duplicated when slow. Every call goes through the circuit breaker.
+        """
+        with span("xdb.request", endpoint=endpoint) as request_span:
+            request = self._prepare_request(endpoint, data)
+            request_span.set(bytes_out=len(request[1]))
+            attempts = self._attempts(endpoint)
+            for attempt in range(attempts):
+                self.breaker.before_call()
+                try:
+                    delay = self._hedge_delay(endpoint)
+                    if delay is None:
+                        result = await self._post(endpoint, request)
+                    else:
+                        result = await self._hedged(endpoint, request, delay)
+                except XDBTransientError:
+                    self.breaker.record_failure()
+                    if attempt + 1 >= attempts:
+                        raise
+                    self.resilience.add("retries")
+                    await asyncio.sleep(self._backoff(attempt))
+                except XDBAPIError:
+                    # The backend answered, it just refused this request
+                    self.breaker.record_success()
+                    raise
+                except Exception:
+                    # Anything unexpected still reports back, so a half-open probe never hangs
+                    self.breaker.record_failure()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    request_span.set(status=result[0].status, bytes_in=result[1])
+                    return result
+
+    async def _make_request(self, endpoint: str, data: dict) -> XDBResponse:
+        """Make authenticated request to XDB API"""
+        return (await self._send(endpoint, data))[0]
+
+    async def _list(self, endpoint: str, data: dict) -> XDBResponse:
+        """Read-through the list cache when it is enabled; identical concurrent misses share one request"""
+        key = self._cache_key(endpoint, data)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if not self.config.coalesce_requests:
+            return await self._fetch_list(endpoint, key, data)
+        return await self._list_flights.do(key, lambda: self._fetch_list(endpoint, key, data))
+
+    async def _fetch_list(self, endpoint: str, key: tuple, data: dict) -> XDBResponse:
+        result, size = await self._send(endpoint, data)
+        if self.cache is not None and result.status == "Success":
+            self.cache.put(key, data["userKey"], result, size)
+        return result
+
+    async def list_memories(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
+        """List memories for a user"""
+        return await self._list("/api/memory/list", self._list_payload(user_key, tokens, query))
+
+    async def list_reminders(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
+        """List reminders for a user"""
+        return await self._list("/api/reminder/list", self._list_payload(user_key, tokens, query))
+
+    async def _iter_pages(self, endpoint: str, key: str, user_key: str, tokens: Optional[List[str]], query: str,
+                          page_size: Optional[int]) -> AsyncIterator[List[dict]]:
+        """Yield list pages in order while the next page is fetched in the background"""
+        page_size = page_size or self.config.list_page_size
+        fetch = lambda page: self._make_request(endpoint, self._page_payload(user_key, tokens, query, page, page_size))
+        page = 1
+        pending = asyncio.ensure_future(fetch(page))
+        try:
+            while pending is not None:
+                items, has_more = self._page_items(await pending, key)
+                page += 1
+                pending = asyncio.ensure_future(fetch(page)) if has_more else None
+                yield items
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_memories(self, user_key: str, tokens: List[str] = None, query: str = "",
+                            page_size: Optional[int] = None, decrypt: bool = True) -> AsyncIterator[MemoryRecord]:
+        """Yield every memory of a user page by page; at most two pages are held at a time"""
+        async for items in self._iter_pages("/api/memory/list", "memories", user_key, tokens, query, page_size):
+            if decrypt:
+                items = await asyncio.to_thread(self.decrypt_memories, items)
+            for item in items:
+                yield MemoryRecord.model_validate(item)
+
+    async def iter_reminders(self, user_key: str, tokens: List[str] = None, query: str = "",
+                             page_size: Optional[int] = None) -> AsyncIterator[ReminderRecord]:
+        """Yield every reminder of a user page by page; at most two pages are held at a time"""
+        async for items in self._iter_pages("/api/reminder/list", "reminders", user_key, tokens, query, page_size):
+            for item in items:
+                yield ReminderRecord.model_validate(item)
+
+    async def _create(self, endpoint: str, user_key: str, data: dict) -> XDBResponse:
+        if self.write_behind is not None:
+            # A WAL insert without fsync; cheap enough to run on the loop
+            return self._after_write(user_key, self.write_behind.enqueue(endpoint, user_key, data))
+        return self._after_write(user_key, await self._make_request(endpoint, data))
+
+    async def create_memory(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
+        """Create a new memory"""
+        return await self._create("/api/memory/create", user_key, self._create_payload(user_key, content, tag, session_id))
+
+    async def create_reminder(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
+        """Create a new reminder"""
+        return await self._create("/api/reminder/create", user_key, self._create_payload(user_key, content, tag, session_id))
+
+    async def _create_many(self, endpoint: str, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                           max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Submit create requests with bounded in-flight concurrency, results in input order"""
+        async def submit(indexed):
+            index, item = indexed
+            try:
+                item = self._bulk_item(item)
+                data = self._create_payload(user_key, item.content, item.tag, item.session_id)
+                return self._bulk_result(index, await self._make_request(endpoint, data))
+            except Exception as e:
+                return self._bulk_result(index, error=e)
+
+        max_in_flight = max_in_flight or self.config.bulk_max_in_flight
+        results = [result async for result in abounded_map(submit, enumerate(items), max_in_flight)]
+        if any(r.success for r in results):
+            self._invalidate_user(user_key)
+        return results
+
+    async def create_memories(self, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                              max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Create many memories; each item is content text or a dict with content/tag/session_id"""
+        return await self._create_many("/api/memory/create", user_key, items, max_in_flight)
+
+    async def create_reminders(self, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                               max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Create many reminders; each item is content text or a dict with content/tag/session_id"""
+        return await self._create_many("/api/reminder/create", user_key, items, max_in_flight)
+
+    async def process_transcript_text(self, user_key: str, path: str, tag: str, chunk_bytes: Optional[int] = None,
+                                      chunk_tokens: Optional[int] = None, max_in_flight: Optional[int] = None,
+                                      session_id: str = "") -> XDBResponse:
+        """Process a new transcript, optionally as concurrently submitted chunks (see XDBAPIClient)"""
+        max_bytes = self.chunk_budget(chunk_bytes, chunk_tokens)
+        if not max_bytes:
+            # File reading and parsing is blocking, keep it off the event loop
+            data = await asyncio.to_thread(self._transcript_payload, user_key, path, tag)
+            return self._after_write(user_key, await self._make_request("/api/extraction/process-summary", data))
+
+        session_id = session_id or uuid.uuid4().hex
+
+        async def submit(chunk):
+            sequence, data = chunk
+            try:
+                return self._chunk_outcome(sequence, await self._make_request("/api/extraction/process-summary", data))
+            except Exception as e:
+                return self._chunk_outcome(sequence, error=e)
+
+        max_in_flight = max_in_flight or self.config.transcript_max_in_flight
+        payloads = iterate_in_thread(self._transcript_chunk_payloads(user_key, path, tag, max_bytes, session_id))
+        outcomes = [outcome async for outcome in abounded_map(submit, payloads, max_in_flight)]
+        if any(o["status"] == "Success" for o in outcomes):
+            self._invalidate_user(user_key)
+        return self._aggregate_chunks(session_id, outcomes)
+
+    async def process_transcript_message(self, user_key: str, message: str, tag: str) -> XDBResponse:
+        """Process transcript text that was already parsed"""
+        data = self._summary_payload(user_key, message, tag)
+        return self._after_write(user_key, await self._make_request("/api/extraction/process-summary", data))
+
+    async def health_check(self) -> XDBResponse:
+        """Check API health"""
+        return await self._make_request("/api/health", {})
+
+    async def aclose(self):
+        """Close pooled connections and the decryption pool"""
+        if self._delivery_client is not None:
+            await asyncio.to_thread(self._delivery_client.close)
+            self._delivery_client = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._decryptor is not None:
+            self._decryptor.close()
+
+    async def __aenter__(self) -> "AsyncXDBAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
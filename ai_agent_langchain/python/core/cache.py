@@ -0,0 +1,91 @@
+"""
+Read-through result cache for XDB list calls
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Optional, Set
+
+class ResultCache:
+    """Thread-safe TTL cache bounded by total payload bytes, evicting least recently used entries.
+
+    Entries are indexed by user key so that a successful write for a user can drop
+    every cached listing for that user.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_bytes: int = 16 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, _, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, user_key: str, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, user_key, value)
+            self._keys_by_user[user_key].add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_key: str):
+        """Drop every cached entry for a user"""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_key, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, size, user_key, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._keys_by_user.get(user_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
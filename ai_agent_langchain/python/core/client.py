@@ -3,10 +3,15 @@ XDB API Client for XDB AI Connector Library
 """
 
 import os
-import json
 import base64
+import logging
+import threading
+import uuid
+import time
 import requests
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 
 from cryptography.hazmat.primitives import hashes, serialization
@@ -14,26 +19,68 @@ from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
 
+from core.cache import ResultCache
+from core.codec import get_codec
+from core.concurrency import bounded_map
+from core.local_index import LocalMemoryIndex, derive_index_key
 from core.config import XDBConfig
-from core.models import XDBResponse
-from utils.exceptions import XDBAPIError, XDBAuthenticationError
+from core.models import XDBResponse, BulkCreateItem, BulkItemResult, MemoryRecord, ReminderRecord
+from core.resilience import (
+    IDEMPOTENT_ENDPOINTS, RETRYABLE_STATUSES, CircuitBreaker, LatencyTracker, ResilienceStats, backoff_delay
+)
+from core.singleflight import SingleFlight
+from core.telemetry import configure as configure_telemetry, span
+from core.write_behind import WriteBehindQueue
+from utils.exceptions import (
+    XDBAPIError, XDBAuthenticationError, XDBConfigurationError, XDBTransientError, XDBValidationError
+)
 from utils.file_types import file_type_service
+from utils.transcript_parser import chunk_segments
 
-class XDBAPIClient:
-    """Client for XDB AI Connector API with cryptographic authentication"""
-    
-    def __init__(self, config: XDBConfig):
+if TYPE_CHECKING:
+    # PyCryptodome is only imported when an RSA key is actually configured
+    from utils.decryption import MemoryDecryptor
+    from utils.rsa_encryption_service import RSAEncryption
+
+# Rough UTF-8 bytes per LLM token, used to turn a token budget into a byte budget
+BYTES_PER_TOKEN = 4
+
+class _PoolFullFilter(logging.Filter):
+    """Connections beyond max_keepalive_connections are closed after use on purpose; urllib3
+    would warn about each one"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().startswith("Connection pool is full")
+
+logging.getLogger("urllib3.connectionpool").addFilter(_PoolFullFilter())
+
+class BaseXDBClient:
+    """Transport-independent parts of the XDB client: key handling, signing and payloads"""
+
+    def __init__(self, config: XDBConfig, private_key=None, rsa_encryption: Optional['RSAEncryption'] = None,
+                 cache: Optional[ResultCache] = None):
         self.config = config
         self.config.validate()
-        self.session = requests.Session()
-        self.private_key = self._load_private_key()
-        
-        # Set default headers
-        self.session.headers.update({
+        self.private_key = private_key if private_key is not None else self._load_private_key()
+        self.rsa_encryption = rsa_encryption if rsa_encryption is not None else self._load_rsa_key()
+        self._decryptor: Optional['MemoryDecryptor'] = None
+        if cache is None and self.config.cache_enabled:
+            cache = ResultCache(self.config.cache_ttl_seconds, self.config.cache_max_bytes)
+        self.cache = cache
+        self.default_headers = {
             "Content-Type": "application/json",
             "apikey": self.config.api_key
-        })
-    
+        }
+        self.codec = get_codec(self.config.codec)
+        self.breaker = CircuitBreaker(self.config.breaker_failure_threshold, self.config.breaker_reset_seconds)
+        self.resilience = ResilienceStats()
+        self._latency = {endpoint: LatencyTracker() for endpoint in IDEMPOTENT_ENDPOINTS}
+        # Decryption is coalesced for sync and async callers alike, since both run it on threads
+        self._decrypt_flights = SingleFlight()
+        self._write_listeners: List[Callable[[str], None]] = []
+        if self.config.telemetry:
+            configure_telemetry(self.config.telemetry)
+
     def _load_private_key(self):
         """Load private key from file or content"""
         try:
@@ -55,132 +102,578 @@ class XDBAPIClient:
         except Exception as e:
             print(f"Warning: Could not load private key: {e}")
             return None
-    
-    def _create_signature(self, payload: str) -> str:
+
+    def _load_rsa_key(self) -> Optional['RSAEncryption']:
+        """Load the RSA private key used to decrypt encrypted memories"""
+        if not (self.config.rsa_private_key_path or self.config.rsa_private_key_content):
+            return None
+        try:
+            from utils.rsa_encryption_service import RSAEncryption
+            if self.config.rsa_private_key_path and os.path.exists(self.config.rsa_private_key_path):
+                return RSAEncryption.from_file(self.config.rsa_private_key_path)
+            elif self.config.rsa_private_key_content:
+                return RSAEncryption.from_pem(self.config.rsa_private_key_content)
+            return None
+        except Exception as e:
+            print(f"Warning: Could not load RSA private key: {e}")
+            return None
+
+    @property
+    def decryptor(self) -> 'MemoryDecryptor':
+        """Memory decryptor bound to this client's RSA key, created on first use"""
+        if self._decryptor is None:
+            if self.rsa_encryption is None:
+                raise XDBConfigurationError("An RSA private key is required to decrypt encrypted memories")
+            from utils.decryption import MemoryDecryptor
+            self._decryptor = MemoryDecryptor(
+                self.rsa_encryption,
+                workers=self.config.decrypt_workers,
+                parallel_threshold=self.config.decrypt_parallel_threshold
+            )
+        return self._decryptor
+
+    def decrypt_memories(self, memories: List[dict]) -> List[dict]:
+        """Return copies of the memories with content and tokens decrypted where needed"""
+        if not any(memory.get('isEncrypted', False) for memory in memories):
+            return memories
+        decrypted = []
+        with span("xdb.decrypt", records=len(memories)):
+            for memory, (content, tokens) in zip(memories, self.decryptor.decrypt_memories(memories)):
+                decrypted.append({**memory, 'memory': content, 'tokens': tokens})
+        return decrypted
+
+    def decrypt_shared(self, memories: List[dict], start: int = 0, stop: Optional[int] = None) -> List[dict]:
+        """decrypt_memories(memories[start:stop]) for a listing that may be shared by concurrent
+        callers (coalesced or cached responses); they wait for one decryption instead of each
+        repeating it."""
+        if not self.config.coalesce_requests:
+            return self.decrypt_memories(memories[start:stop])
+        # id() is a safe key while in flight: the leader keeps the list alive until it finishes
+        return self._decrypt_flights.do((id(memories), start, stop),
+                                        lambda: self.decrypt_memories(memories[start:stop]))
+
+    def _create_signature(self, payload: Union[str, bytes]) -> str:
         """Create ECDSA signature for the payload"""
         if not self.private_key:
             return ""
-        
+
         try:
-            signature = self.private_key.sign(
-                payload.encode('utf-8'),
-                ec.ECDSA(hashes.SHA256())
-            )
+            with span("xdb.sign"):
+                signature = self.private_key.sign(
+                    payload.encode('utf-8') if isinstance(payload, str) else payload,
+                    ec.ECDSA(hashes.SHA256())
+                )
             return base64.b64encode(signature).decode('utf-8')
         except Exception as e:
             print(f"Error creating signature: {e}")
             return ""
-    
-    def _make_request(self, endpoint: str, data: dict) -> XDBResponse:
-        """Make authenticated request to XDB API"""
+
+    def _prepare_request(self, endpoint: str, data: dict):
+        """Build URL, encoded body and per-request headers for a request.
+
+        The static headers (content type, API key) are set once on the transport, so only the
+        signature, computed over the exact body bytes sent, is added here.
+        """
         url = f"{self.config.base_url}{endpoint}"
-        payload = json.dumps(data)
-        
-        headers = dict(self.session.headers)
-        
+        payload = self.codec.dumps(data)
+
         # Add signature if we have a private key
-        if self.private_key:
-            signature = self._create_signature(payload)
-            if signature:
-                headers["signature"] = signature
-        
-        try:
-            response = self.session.post(url, data=payload, headers=headers)
-            response.raise_for_status()
-            response_data = response.json()
-            return XDBResponse(**response_data)
-        except requests.RequestException as e:
-            raise XDBAPIError(f"Request failed: {str(e)}")
-    
-    def list_memories(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
-        """List memories for a user"""
-        data = {
-            "userKey": user_key,
-            "tokens": tokens or [],
-            "query": query
-        }
-        return self._make_request("/api/memory/list", data)
-    
-    def list_reminders(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
-        """List reminders for a user"""
-        data = {
+        signature = self._create_signature(payload) if self.private_key else ""
+        return url, payload, {"signature": signature} if signature else None
+
+    def _timeouts(self, endpoint: str) -> Tuple[float, float]:
+        """Connect and read timeout for an endpoint"""
+        timeout = self.config.endpoint_timeouts.get(endpoint, self.config.read_timeout)
+        if isinstance(timeout, (tuple, list)):
+            return timeout[0], timeout[1]
+        return self.config.connect_timeout, timeout
+
+    def _attempts(self, endpoint: str) -> int:
+        """Only read-only calls are retried; a retried create could store the record twice"""
+        return 1 + self.config.max_retries if endpoint in IDEMPOTENT_ENDPOINTS else 1
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.config.retry_backoff_base, self.config.retry_backoff_max)
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """How long to wait before sending a duplicate read, None when not hedging.
+
+        A configured hedge_delay wins; otherwise the endpoint's recent p95 latency is used once
+        enough calls were seen, so only the slowest ~5% of reads are duplicated.
+        """
+        if not self.config.hedge_reads or endpoint not in IDEMPOTENT_ENDPOINTS:
+            return None
+        if self.config.hedge_delay > 0:
+            return self.config.hedge_delay
+        return self._latency[endpoint].percentile(0.95)
+
+    def _record_latency(self, endpoint: str, seconds: float):
+        tracker = self._latency.get(endpoint)
+        if tracker is not None:
+            tracker.add(seconds)
+
+    def _check_status(self, status_code: int, reason: str):
+        if status_code in RETRYABLE_STATUSES:
+            raise XDBTransientError(f"Request failed: {status_code} {reason}")
+
+    def coalescing_stats(self) -> dict:
+        """How many identical concurrent list requests and decryptions were shared"""
+        return {"requests": self._list_flights.stats(), "decryption": self._decrypt_flights.stats()}
+
+    def resilience_stats(self) -> dict:
+        """Retry and hedge counters plus the circuit breaker state"""
+        return {**self.resilience.snapshot(), "breaker": self.breaker.stats()}
+
+    def _cache_key(self, endpoint: str, data: dict) -> tuple:
+        return (endpoint, data["userKey"], tuple(data["tokens"]), data["query"])
+
+    def add_write_listener(self, listener: Callable[[str], None]):
+        """Call listener(user_key) whenever a write for that user succeeds or is journaled"""
+        if listener not in self._write_listeners:
+            self._write_listeners.append(listener)
+
+    def _invalidate_user(self, user_key: str):
+        if self.cache is not None:
+            self.cache.invalidate_user(user_key)
+        for listener in self._write_listeners:
+            listener(user_key)
+
+    def _after_write(self, user_key: str, result: XDBResponse) -> XDBResponse:
+        """Invalidate cached listings for a user once a write for them succeeds"""
+        if result.status == "Success":
+            self._invalidate_user(user_key)
+        return result
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the list cache, empty when caching is disabled"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def _list_payload(self, user_key: str, tokens: List[str] = None, query: str = "") -> dict:
+        return {
             "userKey": user_key,
             "tokens": tokens or [],
             "query": query
         }
-        return self._make_request("/api/reminder/list", data)
-    
-    
-    def create_memory(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
-        """Create a new memory"""
-        data = {
-            "userKey": user_key,
-            "content": content,
-            "tag": tag,
-            "sessionId": session_id or datetime.now().strftime("%Y%m%d%H")
-        }
-        return self._make_request("/api/memory/create", data)
-    
-    def create_reminder(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
-        """Create a new reminder"""
-        data = {
+
+    def _page_payload(self, user_key: str, tokens: Optional[List[str]], query: str, page: int, page_size: int) -> dict:
+        return {**self._list_payload(user_key, tokens, query), "pageNumber": page, "pageSize": page_size}
+
+    def _page_items(self, result: XDBResponse, key: str) -> Tuple[List[dict], bool]:
+        """Records of one list page and whether another page follows.
+
+        Only an explicit "hasMore": true continues paging; a server that ignores the page
+        fields returns everything in the first response, which is then the only page.
+        """
+        if result.status != "Success":
+            raise XDBAPIError(f"Listing failed: {result.message}")
+        data = result.data or {}
+        return data.get(key) or [], data.get("hasMore") is True
+
+    def _create_payload(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> dict:
+        return {
             "userKey": user_key,
             "content": content,
             "tag": tag,
             "sessionId": session_id or datetime.now().strftime("%Y%m%d%H")
         }
-        return self._make_request("/api/reminder/create", data)
-    
-    
-    def process_transcript_text(self, user_key: str, path: str, tag:str) -> XDBResponse:
-        """Process a new transcript"""
-        try:
-            # Check the file type
-            isJson =  file_type_service.is_json_file(path)
-            if isJson:
-                content = ''
-                isZoomFormat = file_type_service.detect_zoom_transcript_format(path)
-                if isZoomFormat != "UNKNOWN":
-                    print("Zoom format detected")
-                    with open(path, 'r', encoding='utf-8') as file:
-                        transcriptJson = json.load(file)
-                        for segment in transcriptJson["transcript"]["transcript_content"]:
-                            sentence = segment['text']
-                            speaker_name = segment['speaker_name']
-                            content += f"{speaker_name}: {sentence} "
-                        print(content)
-                else:                
-                    with open(path, 'r', encoding='utf-8') as file:
-                        transcriptJson = json.load(file)
-                        for segment in transcriptJson:
-                            sentence = segment['sentence']
-                            speaker_name = segment['speaker_name']
-                            duration = f"{segment['startTime']}-{segment['endTime']}"
-                            content += f"{speaker_name}[{duration}]: {sentence} "
-                        print(content)
-            else:
-                with open(path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    print(content)
 
+    def _bulk_item(self, item: Union[str, dict, BulkCreateItem]) -> BulkCreateItem:
+        """Normalize a bulk create item given as text, dict or BulkCreateItem"""
+        if isinstance(item, BulkCreateItem):
+            return item
+        if isinstance(item, str):
+            return BulkCreateItem(content=item)
+        return BulkCreateItem(**item)
+
+    def _bulk_result(self, index: int, result: Optional[XDBResponse] = None, error: Exception = None) -> BulkItemResult:
+        if error is not None:
+            return BulkItemResult(index=index, success=False, error=str(error))
+        if result.status == "Success":
+            return BulkItemResult(index=index, success=True, process_id=result.process_id, message=result.message)
+        return BulkItemResult(index=index, success=False, message=result.message, error=result.message)
+
+    def _transcript_message(self, path: str) -> str:
+        """Stream a transcript file into the message text without loading the whole document.
+        A file that cannot be read or parsed raises instead of being sent as an empty message."""
+        try:
+            return file_type_service.read_transcript_message(path)
         except FileNotFoundError:
-            print("File not found!")
-        except IOError:
-            print("Error reading file!")
+            raise XDBValidationError(f"Transcript file not found: {path}")
+        except IOError as e:
+            raise XDBValidationError(f"Error reading transcript file {path}: {e}")
+        except (ValueError, KeyError, TypeError) as e:
+            raise XDBValidationError(f"Error parsing transcript {path}: {e}")
 
+    def _transcript_payload(self, user_key: str, path: str, tag: str) -> dict:
+        """Read a transcript file and build the process-summary payload"""
+        return self._summary_payload(user_key, self._transcript_message(path), tag)
+
+    def _summary_payload(self, user_key: str, message: str, tag: str) -> dict:
         metadata = {
             "source":"MANUAL",
             "type":"SUMMARY",
             "tag":tag,
-            "message":content
-        }    
+            "message":message
+        }
 
-        data = {
+        return {
             "userKey": user_key,
             "metadata": metadata
         }
-        return self._make_request("/api/extraction/process-summary", data)
-    
+
+    def chunk_budget(self, chunk_bytes: Optional[int] = None, chunk_tokens: Optional[int] = None) -> int:
+        """Effective transcript chunk size in bytes, 0 when chunking is disabled"""
+        chunk_bytes = self.config.transcript_chunk_bytes if chunk_bytes is None else chunk_bytes
+        chunk_tokens = self.config.transcript_chunk_tokens if chunk_tokens is None else chunk_tokens
+        budgets = [b for b in (chunk_bytes, chunk_tokens * BYTES_PER_TOKEN) if b > 0]
+        return min(budgets) if budgets else 0
+
+    def _transcript_chunk_payloads(self, user_key: str, path: str, tag: str, max_bytes: int,
+                                   session_id: str) -> Iterator[Tuple[int, dict]]:
+        """Lazily yield (sequence, payload) for each chunk of the transcript"""
+        if not os.path.exists(path):
+            raise XDBValidationError(f"Transcript file not found: {path}")
+
+        with file_type_service.open_transcript(path) as (_, segments):
+            yield from self._chunk_payloads(user_key, chunk_segments(segments, max_bytes), tag, session_id)
+
+    def _chunk_payloads(self, user_key: str, chunks: Iterator[str], tag: str,
+                        session_id: str) -> Iterator[Tuple[int, dict]]:
+        """Lazily yield (sequence, payload) for each chunk of transcript text"""
+        sequence = 0
+        chunk = next(chunks, None)
+        while chunk is not None:
+            # Look one chunk ahead so the last one can be flagged
+            following = next(chunks, None)
+            metadata = {
+                "source":"MANUAL",
+                "type":"SUMMARY",
+                "tag":tag,
+                "message":chunk,
+                "sessionId":session_id,
+                "sequence":sequence,
+                "isLastChunk":following is None
+            }
+            yield sequence, {"userKey": user_key, "metadata": metadata}
+            chunk = following
+            sequence += 1
+
+    def _chunk_outcome(self, sequence: int, result: Optional[XDBResponse] = None, error: Exception = None) -> dict:
+        if error is not None:
+            return {"sequence": sequence, "status": "Error", "process_id": None, "message": str(error)}
+        return {"sequence": sequence, "status": result.status, "process_id": result.process_id, "message": result.message}
+
+    def _aggregate_chunks(self, session_id: str, outcomes: List[dict]) -> XDBResponse:
+        """Combine per-chunk outcomes into one response; data holds the per-chunk process_ids"""
+        data = {"sessionId": session_id, "chunks": outcomes}
+        if not outcomes:
+            return XDBResponse(status="Error", message="Transcript has no content to process", error=True, data=data)
+        failed = [o for o in outcomes if o["status"] != "Success"]
+        return XDBResponse(
+            status="Success" if not failed else "Error",
+            message=f"Processed {len(outcomes) - len(failed)} of {len(outcomes)} transcript chunks",
+            error=bool(failed),
+            data=data
+        )
+
+class XDBAPIClient(BaseXDBClient):
+    """Client for XDB AI Connector API with cryptographic authentication"""
+
+    def __init__(self, config: XDBConfig, private_key=None, rsa_encryption: Optional['RSAEncryption'] = None,
+                 cache: Optional[ResultCache] = None, write_behind: Optional[WriteBehindQueue] = None,
+                 local_index: Optional[LocalMemoryIndex] = None, use_local_index: bool = True):
+        super().__init__(config, private_key, rsa_encryption, cache)
+        self.session = requests.Session()
+
+        # One host, keeping at most max_keepalive_connections idle sockets; busier moments open
+        # extra connections that are closed after use. requests has no idle expiry, so
+        # keepalive_expiry only applies to the async client.
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.config.max_keepalive_connections or 1,
+            pool_block=False
+        )
+        # Caps open connections across all threads sharing this client
+        self._connection_slots = threading.BoundedSemaphore(self.config.max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Set default headers
+        self.session.headers.update(self.default_headers)
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._list_flights = SingleFlight()
+
+        # With a journal configured, creates are acknowledged once journaled and delivered in the background
+        self._owns_write_behind = write_behind is None and bool(self.config.write_behind_path)
+        if self._owns_write_behind:
+            write_behind = WriteBehindQueue(
+                self.config.write_behind_path, self._deliver_write,
+                batch_size=self.config.write_behind_batch_size,
+                flush_interval=self.config.write_behind_flush_interval,
+                max_in_flight=self.config.bulk_max_in_flight,
+                backoff_max=self.config.write_behind_backoff_max
+            )
+        self.write_behind = write_behind
+
+        # Keyword and token searches answered from an encrypted on-disk index, synced in the background
+        # Delivery-only clients pass use_local_index=False, or they would sync an index nobody searches
+        self._owns_local_index = use_local_index and local_index is None and bool(self.config.local_index_path)
+        if self._owns_local_index:
+            local_index = LocalMemoryIndex(
+                self.config.local_index_path,
+                derive_index_key(self.config.local_index_key, self.rsa_encryption, self.private_key),
+                lambda user_key: self._iter_pages("/api/memory/list", "memories", user_key, None, "", None),
+                self.decrypt_memories,
+                max_age_seconds=self.config.local_index_max_age_seconds,
+                max_users=self.config.local_index_max_users
+            )
+        self.local_index = local_index
+        if local_index is not None:
+            self.add_write_listener(local_index.invalidate_user)
+
+    def _post(self, endpoint: str, request: tuple) -> Tuple[XDBResponse, int]:
+        """Send one prepared request, classifying failures worth retrying as XDBTransientError"""
+        url, payload, headers = request
+        start = time.perf_counter()
+        try:
+            with self._connection_slots:
+                response = self.session.post(url, data=payload, headers=headers, timeout=self._timeouts(endpoint))
+            self._check_status(response.status_code, response.reason)
+            response.raise_for_status()
+            # A 200 that is not an XDB envelope is refused like any other bad answer
+            result = XDBResponse(**self.codec.loads(response.content))
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise XDBTransientError(f"Request failed: {str(e)}")
+        except (requests.RequestException, ValueError, TypeError) as e:
+            # ValueError covers malformed JSON and pydantic's ValidationError, TypeError a non-object body
+            raise XDBAPIError(f"Request failed: {str(e)}")
+        self._record_latency(endpoint, time.perf_counter() - start)
+        return result, len(response.content)
+
+    def _hedged(self, endpoint: str, request: tuple, delay: float) -> Tuple[XDBResponse, int]:
+        """Send a duplicate read if the first has not answered after delay; first success wins"""
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=self.config.max_connections,
+                                                  thread_name_prefix="xdb-hedge")
+        primary = self._hedge_pool.submit(self._post, endpoint, request)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        self.resilience.add("hedges")
+        hedge = self._hedge_pool.submit(self._post, endpoint, request)
+        error = None
+        for future in as_completed((primary, hedge)):
+            try:
+                result = future.result()
+            except XDBAPIError as e:
+                error = e
+                continue
+            if future is hedge:
+                self.resilience.add("hedge_wins")
+            return result
+        raise error
+
+    def _send(self, endpoint: str, data: dict) -> Tuple[XDBResponse, int]:
+        """Make authenticated request to XDB API, returning the response and its size in bytes.
+
+        Read-only calls are retried with jittered backoff on transient failures and, with
+        hedge_reads, duplicated when slow. Every call goes through the circuit breaker.
+        """
+        with span("xdb.request", endpoint=endpoint) as request_span:
+            request = self._prepare_request(endpoint, data)
+            request_span.set(bytes_out=len(request[1]))
+            attempts = self._attempts(endpoint)
+            for attempt in range(attempts):
+                self.breaker.before_call()
+                try:
+                    delay = self._hedge_delay(endpoint)
+                    result = self._post(endpoint, request) if delay is None else self._hedged(endpoint, request, delay)
+                except XDBTransientError:
+                    self.breaker.record_failure()
+                    if attempt + 1 >= attempts:
+                        raise
+                    self.resilience.add("retries")
+                    time.sleep(self._backoff(attempt))
+                except XDBAPIError:
+                    # The backend answered, it just refused this request
+                    self.breaker.record_success()
+                    raise
+                except Exception:
+                    # Anything unexpected still reports back, so a half-open probe never hangs
+                    self.breaker.record_failure()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    request_span.set(status=result[0].status, bytes_in=result[1])
+                    return result
+
+    def _make_request(self, endpoint: str, data: dict) -> XDBResponse:
+        """Make authenticated request to XDB API"""
+        return self._send(endpoint, data)[0]
+
+    def _list(self, endpoint: str, data: dict) -> XDBResponse:
+        """Read-through the list cache when it is enabled; identical concurrent misses share one request"""
+        key = self._cache_key(endpoint, data)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if not self.config.coalesce_requests:
+            return self._fetch_list(endpoint, key, data)
+        return self._list_flights.do(key, lambda: self._fetch_list(endpoint, key, data))
+
+    def _fetch_list(self, endpoint: str, key: tuple, data: dict) -> XDBResponse:
+        result, size = self._send(endpoint, data)
+        if self.cache is not None and result.status == "Success":
+            self.cache.put(key, data["userKey"], result, size)
+        return result
+
+    def list_memories(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
+        """List memories for a user"""
+        return self._list("/api/memory/list", self._list_payload(user_key, tokens, query))
+
+    def list_reminders(self, user_key: str, tokens: List[str] = None, query: str = "") -> XDBResponse:
+        """List reminders for a user"""
+        return self._list("/api/reminder/list", self._list_payload(user_key, tokens, query))
+
+
+    def _iter_pages(self, endpoint: str, key: str, user_key: str, tokens: Optional[List[str]], query: str,
+                    page_size: Optional[int]) -> Iterator[List[dict]]:
+        """Yield list pages in order while the next page is fetched in the background"""
+        page_size = page_size or self.config.list_page_size
+        fetch = lambda page: self._make_request(endpoint, self._page_payload(user_key, tokens, query, page, page_size))
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 1
+            pending = prefetcher.submit(fetch, page)
+            while pending is not None:
+                items, has_more = self._page_items(pending.result(), key)
+                page += 1
+                pending = prefetcher.submit(fetch, page) if has_more else None
+                yield items
+
+    def iter_memories(self, user_key: str, tokens: List[str] = None, query: str = "",
+                      page_size: Optional[int] = None, decrypt: bool = True) -> Iterator[MemoryRecord]:
+        """Yield every memory of a user page by page; at most two pages are held at a time"""
+        for items in self._iter_pages("/api/memory/list", "memories", user_key, tokens, query, page_size):
+            if decrypt:
+                items = self.decrypt_memories(items)
+            for item in items:
+                yield MemoryRecord.model_validate(item)
+
+    def iter_reminders(self, user_key: str, tokens: List[str] = None, query: str = "",
+                       page_size: Optional[int] = None) -> Iterator[ReminderRecord]:
+        """Yield every reminder of a user page by page; at most two pages are held at a time"""
+        for items in self._iter_pages("/api/reminder/list", "reminders", user_key, tokens, query, page_size):
+            for item in items:
+                yield ReminderRecord.model_validate(item)
+
+    def _deliver_write(self, endpoint: str, user_key: str, data: dict) -> XDBResponse:
+        return self._after_write(user_key, self._make_request(endpoint, data))
+
+    def _create(self, endpoint: str, user_key: str, data: dict) -> XDBResponse:
+        if self.write_behind is not None:
+            # Invalidated again on delivery, when the server can first return the new record
+            return self._after_write(user_key, self.write_behind.enqueue(endpoint, user_key, data))
+        return self._deliver_write(endpoint, user_key, data)
+
+    def create_memory(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
+        """Create a new memory"""
+        return self._create("/api/memory/create", user_key, self._create_payload(user_key, content, tag, session_id))
+
+    def create_reminder(self, user_key: str, content: str, tag: str = "", session_id: str = "") -> XDBResponse:
+        """Create a new reminder"""
+        return self._create("/api/reminder/create", user_key, self._create_payload(user_key, content, tag, session_id))
+
+    def _create_many(self, endpoint: str, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                     max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Submit create requests with bounded in-flight concurrency, results in input order"""
+        def submit(indexed):
+            index, item = indexed
+            try:
+                item = self._bulk_item(item)
+                data = self._create_payload(user_key, item.content, item.tag, item.session_id)
+                return self._bulk_result(index, self._make_request(endpoint, data))
+            except Exception as e:
+                return self._bulk_result(index, error=e)
+
+        max_in_flight = max_in_flight or self.config.bulk_max_in_flight
+        results = list(bounded_map(submit, enumerate(items), max_in_flight))
+        if any(r.success for r in results):
+            self._invalidate_user(user_key)
+        return results
+
+    def create_memories(self, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                        max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Create many memories; each item is content text or a dict with content/tag/session_id"""
+        return self._create_many("/api/memory/create", user_key, items, max_in_flight)
+
+    def create_reminders(self, user_key: str, items: List[Union[str, dict, BulkCreateItem]],
+                         max_in_flight: Optional[int] = None) -> List[BulkItemResult]:
+        """Create many reminders; each item is content text or a dict with content/tag/session_id"""
+        return self._create_many("/api/reminder/create", user_key, items, max_in_flight)
+
+
+    def process_transcript_text(self, user_key: str, path: str, tag:str, chunk_bytes: Optional[int] = None,
+                                chunk_tokens: Optional[int] = None, max_in_flight: Optional[int] = None,
+                                session_id: str = "") -> XDBResponse:
+        """Process a new transcript.
+
+        With a chunk budget (argument or XDBConfig.transcript_chunk_bytes/_tokens) the transcript
+        is split on segment boundaries and chunks are submitted concurrently under a shared
+        session id; the aggregated response lists each chunk's process_id in data["chunks"].
+        """
+        max_bytes = self.chunk_budget(chunk_bytes, chunk_tokens)
+        if not max_bytes:
+            data = self._transcript_payload(user_key, path, tag)
+            return self._after_write(user_key, self._make_request("/api/extraction/process-summary", data))
+
+        session_id = session_id or uuid.uuid4().hex
+        payloads = self._transcript_chunk_payloads(user_key, path, tag, max_bytes, session_id)
+        return self._submit_chunks(user_key, session_id, payloads, max_in_flight)
+
+    def process_transcript_chunks(self, user_key: str, chunks: Iterable[str], tag: str,
+                                  max_in_flight: Optional[int] = None, session_id: str = "") -> XDBResponse:
+        """Process transcript text that was already parsed and split into chunks, the way
+        process_transcript_text submits a file with a chunk budget"""
+        session_id = session_id or uuid.uuid4().hex
+        payloads = self._chunk_payloads(user_key, iter(chunks), tag, session_id)
+        return self._submit_chunks(user_key, session_id, payloads, max_in_flight)
+
+    def _submit_chunks(self, user_key: str, session_id: str, payloads: Iterator[Tuple[int, dict]],
+                       max_in_flight: Optional[int]) -> XDBResponse:
+        def submit(chunk):
+            sequence, data = chunk
+            try:
+                return self._chunk_outcome(sequence, self._make_request("/api/extraction/process-summary", data))
+            except Exception as e:
+                return self._chunk_outcome(sequence, error=e)
+
+        max_in_flight = max_in_flight or self.config.transcript_max_in_flight
+        outcomes = list(bounded_map(submit, payloads, max_in_flight))
+        if any(o["status"] == "Success" for o in outcomes):
+            self._invalidate_user(user_key)
+        return self._aggregate_chunks(session_id, outcomes)
+
+    def process_transcript_message(self, user_key: str, message: str, tag: str) -> XDBResponse:
+        """Process transcript text that was already parsed"""
+        data = self._summary_payload(user_key, message, tag)
+        return self._after_write(user_key, self._make_request("/api/extraction/process-summary", data))
+
     def health_check(self) -> XDBResponse:
         """Check API health"""
-        return self._make_request("/api/health", {})
\ No newline at end of file
+        return self._make_request("/api/health", {})
+
+    def close(self):
+        """Deliver due journaled writes, then close pooled connections, the hedging pool and the decryption pool"""
+        if self._owns_write_behind and self.write_behind is not None:
+            self.write_behind.close()
+        if self._owns_local_index and self.local_index is not None:
+            self.local_index.close()
+        self.session.close()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+            self._hedge_pool = None
+        if self._decryptor is not None:
+            self._decryptor.close()
@@ -0,0 +1,71 @@
+"""
+Bounded concurrency helpers for XDB AI Connector Library
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def bounded_map(fn: Callable[[T], R], items: Iterable[T], max_in_flight: int,
+                executor: Optional[Executor] = None) -> Iterator[R]:
+    """Run fn over items on a thread pool with at most max_in_flight calls running.
+
+    Items are pulled from the iterable lazily and results are yielded in input order.
+    An existing executor (e.g. a process pool) can be passed instead; it is not shut down.
+    """
+    # Keep a little more queued than running so a slow head item doesn't idle the pool
+    window = max_in_flight * 2
+    with (ThreadPoolExecutor(max_workers=max_in_flight) if executor is None else nullcontext(executor)) as pool:
+        pending = deque()
+        for item in items:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(pool.submit(fn, item))
+        while pending:
+            yield pending.popleft().result()
+
+_DONE = object()
+
+async def iterate_in_thread(items: Iterable[T]) -> AsyncIterator[T]:
+    """Drive a blocking iterator (e.g. a file parser) from worker threads, one item at a time"""
+    iterator = iter(items)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+async def _as_async_iterable(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def abounded_map(fn: Callable[[T], Awaitable[R]], items: Union[Iterable[T], AsyncIterable[T]],
+                       max_in_flight: int) -> AsyncIterator[R]:
+    """Await fn over items with at most max_in_flight coroutines running, yielding results in input order"""
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def run(item):
+        async with semaphore:
+            return await fn(item)
+
+    window = max_in_flight * 2
+    pending = deque()
+    try:
+        async for item in _as_async_iterable(items):
+            if len(pending) >= window:
+                yield await pending.popleft()
+            pending.append(asyncio.ensure_future(run(item)))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
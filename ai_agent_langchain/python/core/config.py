@@ -4,10 +4,29 @@ Configuration management for XDB AI Connector Library
 
 import os
 import json
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+from core.codec import CODECS
+from core.telemetry import TELEMETRY_EXPORTERS
 from utils.exceptions import XDBValidationError
 
+# A read timeout, or a (connect, read) pair
+EndpointTimeout = Union[float, Tuple[float, float]]
+
+# Transcript summarization runs an LLM server-side and routinely outlives the default read timeout
+DEFAULT_ENDPOINT_TIMEOUTS: Dict[str, EndpointTimeout] = {"/api/extraction/process-summary": 120.0}
+
+def parse_endpoint_timeouts(value: str) -> Dict[str, EndpointTimeout]:
+    """Parse "path=read,path=connect:read" into per-endpoint timeouts"""
+    timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        endpoint, sep, seconds = item.partition("=")
+        if not sep:
+            raise XDBValidationError(f"Invalid endpoint timeout '{item}', expected path=seconds")
+        connect, sep, read = seconds.partition(":")
+        timeouts[endpoint.strip()] = (float(connect), float(read)) if sep else float(seconds)
+    return timeouts
+
 @dataclass
 class XDBConfig:
     """Configuration for XDB AI Connector"""
@@ -15,6 +34,48 @@ class XDBConfig:
     api_key: str
     private_key_path: Optional[str] = None
     private_key_content: Optional[str] = None
+    rsa_private_key_path: Optional[str] = None
+    rsa_private_key_content: Optional[str] = None
+    decrypt_workers: int = 0
+    decrypt_parallel_threshold: int = 64
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    bulk_max_in_flight: int = 8
+    transcript_chunk_bytes: int = 0
+    transcript_chunk_tokens: int = 0
+    transcript_max_in_flight: int = 4
+    cache_enabled: bool = False
+    cache_ttl_seconds: float = 30.0
+    cache_max_bytes: int = 16 * 1024 * 1024
+    tool_page_size: int = 20
+    tool_output_tokens: int = 1500
+    list_page_size: int = 100
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    endpoint_timeouts: Dict[str, EndpointTimeout] = field(default_factory=lambda: dict(DEFAULT_ENDPOINT_TIMEOUTS))
+    max_retries: int = 3
+    retry_backoff_base: float = 0.1
+    retry_backoff_max: float = 2.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    hedge_reads: bool = False
+    hedge_delay: float = 0.0
+    coalesce_requests: bool = True
+    write_behind_path: Optional[str] = None
+    write_behind_batch_size: int = 50
+    write_behind_flush_interval: float = 1.0
+    write_behind_backoff_max: float = 60.0
+    codec: str = "auto"
+    telemetry: str = ""
+    response_cache_path: Optional[str] = None
+    response_cache_ttl_seconds: float = 300.0
+    response_cache_max_bytes: int = 16 * 1024 * 1024
+    response_cache_context_turns: int = 1
+    local_index_path: Optional[str] = None
+    local_index_key: Optional[str] = None
+    local_index_max_age_seconds: float = 60.0
+    local_index_max_users: int = 64
     
     @classmethod
     def from_env(cls) -> 'XDBConfig':
@@ -23,7 +84,49 @@ class XDBConfig:
             base_url=os.getenv("XDB_BASE_URL", "http://localhost:5000"),
             api_key=os.getenv("XDB_API_KEY", ""),
             private_key_path=os.getenv("XDB_PRIVATE_KEY_PATH"),
-            private_key_content=os.getenv("XDB_PRIVATE_KEY_CONTENT")
+            private_key_content=os.getenv("XDB_PRIVATE_KEY_CONTENT"),
+            rsa_private_key_path=os.getenv("XDB_RSA_PRIVATE_KEY_PATH"),
+            rsa_private_key_content=os.getenv("XDB_RSA_PRIVATE_KEY_CONTENT"),
+            decrypt_workers=int(os.getenv("XDB_DECRYPT_WORKERS", "0")),
+            decrypt_parallel_threshold=int(os.getenv("XDB_DECRYPT_PARALLEL_THRESHOLD", "64")),
+            max_connections=int(os.getenv("XDB_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("XDB_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("XDB_KEEPALIVE_EXPIRY", "30")),
+            bulk_max_in_flight=int(os.getenv("XDB_BULK_MAX_IN_FLIGHT", "8")),
+            transcript_chunk_bytes=int(os.getenv("XDB_TRANSCRIPT_CHUNK_BYTES", "0")),
+            transcript_chunk_tokens=int(os.getenv("XDB_TRANSCRIPT_CHUNK_TOKENS", "0")),
+            transcript_max_in_flight=int(os.getenv("XDB_TRANSCRIPT_MAX_IN_FLIGHT", "4")),
+            cache_enabled=os.getenv("XDB_CACHE_ENABLED", "").lower() in ("1", "true", "yes"),
+            cache_ttl_seconds=float(os.getenv("XDB_CACHE_TTL_SECONDS", "30")),
+            cache_max_bytes=int(os.getenv("XDB_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            tool_page_size=int(os.getenv("XDB_TOOL_PAGE_SIZE", "20")),
+            tool_output_tokens=int(os.getenv("XDB_TOOL_OUTPUT_TOKENS", "1500")),
+            list_page_size=int(os.getenv("XDB_LIST_PAGE_SIZE", "100")),
+            connect_timeout=float(os.getenv("XDB_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("XDB_READ_TIMEOUT", "30")),
+            endpoint_timeouts=parse_endpoint_timeouts(os.getenv("XDB_ENDPOINT_TIMEOUTS", "")),
+            max_retries=int(os.getenv("XDB_MAX_RETRIES", "3")),
+            retry_backoff_base=float(os.getenv("XDB_RETRY_BACKOFF_BASE", "0.1")),
+            retry_backoff_max=float(os.getenv("XDB_RETRY_BACKOFF_MAX", "2")),
+            breaker_failure_threshold=int(os.getenv("XDB_BREAKER_FAILURE_THRESHOLD", "5")),
+            breaker_reset_seconds=float(os.getenv("XDB_BREAKER_RESET_SECONDS", "30")),
+            hedge_reads=os.getenv("XDB_HEDGE_READS", "").lower() in ("1", "true", "yes"),
+            hedge_delay=float(os.getenv("XDB_HEDGE_DELAY", "0")),
+            coalesce_requests=os.getenv("XDB_COALESCE_REQUESTS", "1").lower() in ("1", "true", "yes"),
+            write_behind_path=os.getenv("XDB_WRITE_BEHIND_PATH"),
+            write_behind_batch_size=int(os.getenv("XDB_WRITE_BEHIND_BATCH_SIZE", "50")),
+            write_behind_flush_interval=float(os.getenv("XDB_WRITE_BEHIND_FLUSH_INTERVAL", "1")),
+            write_behind_backoff_max=float(os.getenv("XDB_WRITE_BEHIND_BACKOFF_MAX", "60")),
+            codec=os.getenv("XDB_CODEC", "auto"),
+            telemetry=os.getenv("XDB_TELEMETRY", ""),
+            response_cache_path=os.getenv("XDB_RESPONSE_CACHE_PATH"),
+            response_cache_ttl_seconds=float(os.getenv("XDB_RESPONSE_CACHE_TTL_SECONDS", "300")),
+            response_cache_max_bytes=int(os.getenv("XDB_RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            response_cache_context_turns=int(os.getenv("XDB_RESPONSE_CACHE_CONTEXT_TURNS", "1")),
+            local_index_path=os.getenv("XDB_LOCAL_INDEX_PATH"),
+            local_index_key=os.getenv("XDB_LOCAL_INDEX_KEY"),
+            local_index_max_age_seconds=float(os.getenv("XDB_LOCAL_INDEX_MAX_AGE_SECONDS", "60")),
+            local_index_max_users=int(os.getenv("XDB_LOCAL_INDEX_MAX_USERS", "64"))
         )
     
     @classmethod
@@ -42,4 +145,43 @@ class XDBConfig:
             raise XDBValidationError("API key is required")
         if not self.private_key_path and not self.private_key_content:
             raise XDBValidationError("Either private_key_path or private_key_content must be provided")
+        if self.max_connections < 1:
+            raise XDBValidationError("max_connections must be at least 1")
+        if self.max_keepalive_connections < 0 or self.max_keepalive_connections > self.max_connections:
+            raise XDBValidationError("max_keepalive_connections must be between 0 and max_connections")
+        if self.decrypt_workers < 0:
+            raise XDBValidationError("decrypt_workers must be 0 (serial) or a positive worker count")
+        if self.transcript_chunk_bytes < 0 or self.transcript_chunk_tokens < 0:
+            raise XDBValidationError("transcript chunk budgets must be 0 (disabled) or positive")
+        if self.transcript_max_in_flight < 1:
+            raise XDBValidationError("transcript_max_in_flight must be at least 1")
+        if self.bulk_max_in_flight < 1:
+            raise XDBValidationError("bulk_max_in_flight must be at least 1")
+        if self.tool_page_size < 1 or self.tool_output_tokens < 1:
+            raise XDBValidationError("tool_page_size and tool_output_tokens must be at least 1")
+        if self.list_page_size < 1:
+            raise XDBValidationError("list_page_size must be at least 1")
+        endpoint_timeouts = [t if isinstance(t, (tuple, list)) else (t,) for t in self.endpoint_timeouts.values()]
+        if any(len(t) not in (1, 2) for t in endpoint_timeouts):
+            raise XDBValidationError("endpoint_timeouts values must be seconds or a (connect, read) pair")
+        if self.connect_timeout <= 0 or self.read_timeout <= 0 or any(s <= 0 for t in endpoint_timeouts for s in t):
+            raise XDBValidationError("timeouts must be positive")
+        if self.max_retries < 0:
+            raise XDBValidationError("max_retries must be 0 (disabled) or positive")
+        if self.retry_backoff_base < 0 or self.retry_backoff_max < 0 or self.hedge_delay < 0:
+            raise XDBValidationError("retry backoff and hedge delay must not be negative")
+        if self.breaker_failure_threshold < 0 or self.breaker_reset_seconds < 0:
+            raise XDBValidationError("breaker_failure_threshold must be 0 (disabled) or positive")
+        if self.codec not in CODECS:
+            raise XDBValidationError(f"codec must be one of {', '.join(CODECS)}")
+        if any(name.strip() not in TELEMETRY_EXPORTERS for name in self.telemetry.split(",") if name.strip()):
+            raise XDBValidationError(f"telemetry must list exporters from {', '.join(TELEMETRY_EXPORTERS)}")
+        if self.write_behind_batch_size < 1 or self.write_behind_flush_interval <= 0:
+            raise XDBValidationError("write_behind_batch_size and write_behind_flush_interval must be positive")
+        if self.response_cache_ttl_seconds <= 0 or self.response_cache_max_bytes < 1:
+            raise XDBValidationError("response_cache_ttl_seconds and response_cache_max_bytes must be positive")
+        if self.response_cache_context_turns < 0:
+            raise XDBValidationError("response_cache_context_turns must be 0 (message only) or positive")
+        if self.local_index_max_age_seconds <= 0 or self.local_index_max_users < 1:
+            raise XDBValidationError("local_index_max_age_seconds and local_index_max_users must be positive")
         return True
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Bulk transcript ingestion with process-pool parsing and resumable checkpoints
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from core.client import XDBAPIClient
+from core.concurrency import bounded_map
+from utils.file_types import file_type_service
+from utils.transcript_parser import chunk_segments
+
+CHECKPOINT_FILENAME = ".xdb_ingest_checkpoint.jsonl"
+
+def _parse_file(path: str, max_bytes: int = 0) -> Tuple[str, Optional[List[str]], Optional[str]]:
+    """Process-pool worker: returns (path, messages, error), one message per chunk of at most
+    max_bytes, or the whole transcript as one message when max_bytes is 0"""
+    try:
+        if not max_bytes:
+            return path, [file_type_service.read_transcript_message(path)], None
+        with file_type_service.open_transcript(path) as (_, segments):
+            return path, list(chunk_segments(segments, max_bytes)), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+@dataclass
+class IngestStats:
+    """Counters for one ingestion run"""
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"Ingested {self.files} files ({self.bytes / 1e6:.1f} MB) in {self.elapsed:.1f}s: "
+                f"{self.files_per_second:.1f} files/s, {self.bytes_per_second / 1e6:.2f} MB/s; "
+                f"skipped {self.skipped}, failed {self.failed}")
+
+class IngestCheckpoint:
+    """Append-only JSONL manifest of files already ingested.
+
+    Each completed file is appended and flushed immediately, so a crashed run loses at most
+    the line being written; a torn last line is ignored on load. A file is considered done
+    only while its size and mtime match the recorded ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, dict] = {}
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.done[entry["path"]] = entry
+
+    def is_done(self, path: str, stat: os.stat_result) -> bool:
+        entry = self.done.get(path)
+        return entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def record(self, path: str, stat: os.stat_result, process_ids: List[Optional[str]]):
+        entry = {"path": path, "size": stat.st_size, "mtime": stat.st_mtime, "process_ids": process_ids}
+        self.done[path] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+class TranscriptIngestor:
+    """Discovers transcripts under a directory, parses them in a process pool and submits them
+    through the client with bounded concurrency.
+
+    Transcripts are split on the client's chunk budget (transcript_chunk_bytes/_tokens) like
+    process_transcript_text splits them, and every chunk's process id is checkpointed.
+    """
+
+    def __init__(self, client: XDBAPIClient, user_key: str, tag: str, workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, checkpoint_path: Optional[str] = None):
+        self.client = client
+        self.user_key = user_key
+        self.tag = tag
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or client.config.bulk_max_in_flight
+        self.checkpoint_path = checkpoint_path
+
+    def discover(self, root: str, pattern: str = "**/*") -> Iterator[str]:
+        """Yield transcript files under root matching the glob pattern, in a stable order"""
+        for path in sorted(Path(root).glob(pattern)):
+            if path.is_file() and file_type_service.is_transcript_file(str(path)):
+                yield str(path.resolve())
+
+    def run(self, root: str, pattern: str = "**/*") -> IngestStats:
+        stats = IngestStats()
+        checkpoint = IngestCheckpoint(self.checkpoint_path or os.path.join(root, CHECKPOINT_FILENAME))
+        stats_by_path: Dict[str, os.stat_result] = {}
+        checkpoint_file = os.path.realpath(checkpoint.path)
+
+        def pending_files() -> Iterator[str]:
+            # A symlink and its target resolve to the same path; ingest the file once
+            seen: Set[str] = set()
+            for path in self.discover(root, pattern):
+                if path == checkpoint_file or path in seen:
+                    continue
+                seen.add(path)
+                try:
+                    stat = os.stat(path)
+                except OSError as e:
+                    # Removed or renamed since discovery, as files in a drop directory may be
+                    stats.failed += 1
+                    stats.errors[path] = f"{type(e).__name__}: {e}"
+                    continue
+                if checkpoint.is_done(path, stat):
+                    stats.skipped += 1
+                    continue
+                stats_by_path[path] = stat
+                yield path
+
+        def submit(parsed: Tuple[str, Optional[List[str]], Optional[str]]
+                   ) -> Tuple[str, Optional[List[Optional[str]]], Optional[str]]:
+            path, messages, error = parsed
+            if error is not None:
+                return path, None, error
+            try:
+                if len(messages) == 1:
+                    result = self.client.process_transcript_message(self.user_key, messages[0], self.tag)
+                    process_ids = [result.process_id]
+                else:
+                    result = self.client.process_transcript_chunks(self.user_key, messages, self.tag)
+                    process_ids = [chunk["process_id"] for chunk in (result.data or {}).get("chunks", [])]
+            except Exception as e:
+                return path, None, str(e)
+            if result.status != "Success":
+                return path, None, result.message
+            return path, process_ids, None
+
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parse = partial(_parse_file, max_bytes=self.client.chunk_budget())
+                parsed = bounded_map(parse, pending_files(), self.workers, executor=pool)
+                for path, process_ids, error in bounded_map(submit, parsed, self.max_in_flight):
+                    stat = stats_by_path.pop(path)
+                    if error is not None:
+                        stats.failed += 1
+                        stats.errors[path] = error
+                        continue
+                    checkpoint.record(path, stat, process_ids)
+                    stats.files += 1
+                    stats.bytes += stat.st_size
+        finally:
+            checkpoint.close()
+            stats.elapsed = time.perf_counter() - start
+
+        return stats
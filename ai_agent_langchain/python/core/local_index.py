@@ -0,0 +1,354 @@
+"""
+Encrypted, incrementally synced local inverted index over decrypted memories
+"""
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from core.codec import get_codec
+from core.models import MemoryRecord
+from core.terms import TOKEN_WEIGHT, query_terms, terms, token_terms
+from core.telemetry import span
+from utils.exceptions import XDBConfigurationError
+
+_MAGIC = b"XDBLIX1\n"
+_NONCE_BYTES = 12
+# Row layout of a persisted record; the postings are rebuilt on load instead of stored
+_FIELDS = ("transactionNumber", "date", "memory", "tokens", "language", "tag", "sessionId")
+
+def _weights(record: dict) -> Dict[str, int]:
+    """Score each term of a record contributes, as tools.output.rank scores it"""
+    weights = dict.fromkeys(terms(record.get("memory") or ""), 1)
+    for token in token_terms(record.get("tokens")):
+        weights[token] = weights.get(token, 0) + TOKEN_WEIGHT
+    return weights
+
+def derive_index_key(secret: Optional[str] = None, rsa_encryption=None, private_key=None) -> bytes:
+    """AES-256 key for the index files: from an explicit secret, else from the RSA memory key,
+    else from the request signing key. Whoever can read those keys can read the memories anyway."""
+    if secret:
+        material = secret.encode("utf-8")
+    elif rsa_encryption is not None:
+        material = rsa_encryption.export_pem()
+    elif private_key is not None:
+        material = private_key.private_bytes(serialization.Encoding.DER, serialization.PrivateFormat.PKCS8,
+                                             serialization.NoEncryption())
+    else:
+        raise XDBConfigurationError("The local index needs local_index_key or a private key to encrypt its files")
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"xdb-local-index-v1").derive(material)
+
+class _UserIndex:
+    """Records of one user keyed by transaction number, with term postings"""
+
+    __slots__ = ("records", "order", "postings", "watermark", "synced_at")
+
+    def __init__(self):
+        self.records: Dict[str, dict] = {}
+        self.order: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.watermark = ""
+        self.synced_at = 0.0
+
+    def add(self, key: str, record: dict, position: int):
+        self.records[key] = record
+        self.order[key] = position
+        for term, weight in _weights(record).items():
+            self.postings.setdefault(term, {})[key] = weight
+
+    def remove(self, key: str):
+        record = self.records.pop(key)
+        self.order.pop(key, None)
+        for term in _weights(record):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[term]
+
+class LocalMemoryIndex:
+    """Per-user inverted index over decrypted memory text and tokens, answering keyword and
+    token searches without a request or a decryption.
+
+    A sync pages through the user's listing without decrypting it and decrypts only records
+    whose transaction number is new or whose date changed; records gone from the listing are
+    dropped. The newest record date indexed is the user's watermark. The index of a user is
+    fresh for max_age_seconds after a sync, until a write for that user is reported through
+    invalidate_user, and until a server listing passed to observe holds a record newer than the
+    watermark (written by another client, for example). search returns None for a user that is
+    stale or not indexed yet, and for a search with no match, so the caller asks the server;
+    a stale user is synced again in the background.
+
+    Each user's index is persisted as one zlib-compressed file encrypted with AES-GCM, named by
+    a hash of the user key. Files that fail to decrypt are ignored and rebuilt.
+    """
+
+    def __init__(self, directory: str, key: bytes, fetch_pages: Callable[[str], Iterator[List[dict]]],
+                 decrypt: Callable[[List[dict]], List[dict]], max_age_seconds: float = 60.0, max_users: int = 64):
+        self.directory = directory
+        self.fetch_pages = fetch_pages
+        self.decrypt = decrypt
+        self.max_age_seconds = max_age_seconds
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        self.stale_lookups = 0
+        self.watermark_misses = 0
+        self.syncs = 0
+        self.decrypted = 0
+        self.sync_errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._aead = AESGCM(key)
+        self._codec = get_codec()
+        self._users: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._pending: Set[str] = set()
+        # Change count per user written to, or seen past the watermark, since their last sync;
+        # survives eviction from memory
+        self._changed: Dict[str, int] = {}
+        self._syncer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xdb-local-index")
+
+    def _user_id(self, user_key: str) -> str:
+        return hashlib.sha256(user_key.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, user_key: str) -> str:
+        return os.path.join(self.directory, f"{self._user_id(user_key)}.idx")
+
+    def resident(self, user_key: str) -> bool:
+        """Whether a user's index is in memory, so a search reads no file"""
+        return user_key in self._users
+
+    def _user(self, user_key: str) -> _UserIndex:
+        """The in-memory index of a user, loaded from disk on first use.
+
+        The file is read and decrypted without holding the lock, so a cold user does not hold
+        up searches of the others; if two threads load the same user, the first one wins.
+        """
+        with self._lock:
+            index = self._users.get(user_key)
+            if index is not None:
+                self._users.move_to_end(user_key)
+                return index
+        loaded = self._load(user_key)
+        with self._lock:
+            index = self._users.get(user_key)
+            if index is None:
+                index = self._users[user_key] = loaded
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            return index
+
+    def search(self, user_key: str, query: str = "", tokens: Optional[List[str]] = None) -> Optional[List[dict]]:
+        """Matching memories best first, decrypted and in the server's field names; None when
+        the server has to be asked instead"""
+        wanted = query_terms(query, tokens)
+        if not wanted:
+            return None
+        index = self._user(user_key)
+        with self._lock:
+            if user_key in self._changed or time.time() - index.synced_at > self.max_age_seconds:
+                self.stale_lookups += 1
+                fresh = False
+            else:
+                fresh = True
+                scores: Dict[str, int] = {}
+                for term in wanted:
+                    for key, weight in index.postings.get(term, {}).items():
+                        scores[key] = scores.get(key, 0) + weight
+                if scores:
+                    self.hits += 1
+                    # Listing order, then best score first; both sorts are stable
+                    ranked = sorted(scores, key=index.order.__getitem__)
+                    ranked.sort(key=scores.__getitem__, reverse=True)
+                    return [index.records[key] for key in ranked]
+                self.misses += 1
+        if not fresh:
+            self._schedule(user_key)
+        return None
+
+    def invalidate_user(self, user_key: str):
+        """Mark a user stale after a write; the next search resyncs instead of answering"""
+        with self._lock:
+            if user_key in self._users or os.path.exists(self._path(user_key)):
+                self._changed[user_key] = self._changed.get(user_key, 0) + 1
+
+    def observe(self, user_key: str, memories: List[dict]):
+        """Compare a server listing of the user with the watermark; a newer record makes the
+        index stale and schedules a sync. Dates are compared as the server's ISO strings."""
+        newest = max((memory.get("date") or "" for memory in memories), default="")
+        with self._lock:
+            index = self._users.get(user_key)
+            if index is None or newest <= index.watermark:
+                return
+            self._changed[user_key] = self._changed.get(user_key, 0) + 1
+            self.watermark_misses += 1
+        self._schedule(user_key)
+
+    def _schedule(self, user_key: str):
+        with self._lock:
+            if user_key in self._pending:
+                return
+            self._pending.add(user_key)
+        try:
+            self._syncer.submit(self._background_sync, user_key)
+        except RuntimeError:
+            # Closed
+            with self._lock:
+                self._pending.discard(user_key)
+
+    def _background_sync(self, user_key: str):
+        try:
+            self.sync(user_key)
+        except Exception as e:
+            self.sync_errors += 1
+            print(f"Warning: Local index sync failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(user_key)
+
+    def sync(self, user_key: str) -> int:
+        """Bring a user's index up to date with the server; returns how many records were decrypted"""
+        with self._sync_lock, span("index.sync") as sync_span:
+            index = self._user(user_key)
+            with self._lock:
+                generation = self._changed.get(user_key)
+                known = {key: record.get("date") for key, record in index.records.items()}
+
+            listed: List[str] = []
+            changed: List[dict] = []
+            for page in self.fetch_pages(user_key):
+                fresh = []
+                for item in page:
+                    key = item.get("transactionNumber")
+                    if not key:
+                        continue
+                    listed.append(key)
+                    if key not in known or known[key] != item.get("date"):
+                        fresh.append(item)
+                if fresh:
+                    changed.extend(self._record(item) for item in self.decrypt(fresh))
+
+            with self._lock:
+                positions = {key: position for position, key in enumerate(listed)}
+                for key in [key for key in index.records if key not in positions]:
+                    index.remove(key)
+                for record in changed:
+                    key = record["transactionNumber"]
+                    if key in index.records:
+                        index.remove(key)
+                    index.add(key, record, positions[key])
+                index.order = {key: positions[key] for key in index.records}
+                index.watermark = max((record.get("date") or "" for record in index.records.values()), default="")
+                index.synced_at = time.time()
+                # A write reported while syncing may not be in the listing yet
+                if self._changed.get(user_key) == generation:
+                    self._changed.pop(user_key, None)
+                self.syncs += 1
+                self.decrypted += len(changed)
+                data = self._dump(user_key, index)
+            self._save(user_key, data)
+            sync_span.set(records=len(listed), decrypted=len(changed))
+            return len(changed)
+
+    def _record(self, item: dict) -> dict:
+        """Decrypted listing item as a MemoryRecord, kept in the server's field names"""
+        record = MemoryRecord.model_validate(item)
+        return {"memory": record.memory, "date": record.date, "transactionNumber": record.transaction_number,
+                "tokens": record.tokens, "language": record.language, "tag": record.tag,
+                "sessionId": record.session_id, "isEncrypted": False}
+
+    def _dump(self, user_key: str, index: _UserIndex) -> bytes:
+        return self._codec.dumps({
+            "user": user_key,
+            "watermark": index.watermark,
+            "synced_at": index.synced_at,
+            "records": [[index.records[key].get(field) for field in _FIELDS]
+                        for key in sorted(index.records, key=index.order.__getitem__)]
+        })
+
+    def _save(self, user_key: str, data: bytes):
+        nonce = os.urandom(_NONCE_BYTES)
+        sealed = self._aead.encrypt(nonce, zlib.compress(data, 6), _MAGIC + self._user_id(user_key).encode())
+        path = self._path(user_key)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(_MAGIC + nonce + sealed)
+        os.replace(temp, path)
+
+    def _load(self, user_key: str) -> _UserIndex:
+        index = _UserIndex()
+        try:
+            with open(self._path(user_key), "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return index
+        try:
+            if not blob.startswith(_MAGIC):
+                raise ValueError("not a local index file")
+            nonce = blob[len(_MAGIC):len(_MAGIC) + _NONCE_BYTES]
+            sealed = blob[len(_MAGIC) + _NONCE_BYTES:]
+            data = self._codec.loads(zlib.decompress(
+                self._aead.decrypt(nonce, sealed, _MAGIC + self._user_id(user_key).encode())))
+        except (InvalidTag, ValueError, zlib.error) as e:
+            print(f"Warning: Ignoring unreadable local index file: {type(e).__name__}")
+            return index
+        for position, row in enumerate(data["records"]):
+            record = {**dict(zip(_FIELDS, row)), "isEncrypted": False}
+            index.add(record["transactionNumber"], record, position)
+        index.watermark = data["watermark"]
+        index.synced_at = data["synced_at"]
+        return index
+
+    def clear(self, user_keys: Optional[Iterable[str]] = None):
+        """Forget the given users, or every user, in memory and on disk"""
+        with self._lock:
+            if user_keys is None:
+                self._users.clear()
+                self._changed.clear()
+                paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                         if name.endswith(".idx")]
+            else:
+                paths = []
+                for user_key in user_keys:
+                    self._users.pop(user_key, None)
+                    self._changed.pop(user_key, None)
+                    paths.append(self._path(user_key))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale_lookups
+            return {
+                "users": len(self._users),
+                "records": sum(len(index.records) for index in self._users.values()),
+                "terms": sum(len(index.postings) for index in self._users.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale_lookups,
+                "watermark_misses": self.watermark_misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "syncs": self.syncs,
+                "decrypted": self.decrypted,
+                "sync_errors": self.sync_errors,
+                "pending_syncs": len(self._pending)
+            }
+
+    def close(self):
+        """Finish a running sync and stop the background syncer"""
+        self._syncer.shutdown(wait=True, cancel_futures=True)
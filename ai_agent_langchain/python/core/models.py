@@ -3,17 +3,29 @@ Data models for XDB AI Connector Library
 """
 
 from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class MemoryRecord(BaseModel):
     """Represents a memory record from XDB"""
+    model_config = ConfigDict(populate_by_name=True)
     memory: str
     date: str
-    transaction_number: str
+    transaction_number: str = Field(alias="transactionNumber")
     tokens: List[str] = []
     language: Optional[str] = None
     tag: Optional[str] = None
-    session_id: Optional[str] = None
+    session_id: Optional[str] = Field(default=None, alias="sessionId")
+    is_encrypted: bool = Field(default=False, alias="isEncrypted")
+
+class ReminderRecord(BaseModel):
+    """Represents a reminder record from XDB"""
+    model_config = ConfigDict(populate_by_name=True)
+    reminder: str
+    event: Optional[str] = None
+    event_date: Optional[str] = Field(default=None, alias="eventDate")
+    tokens: List[str] = []
+    tag: Optional[str] = None
+    session_id: Optional[str] = Field(default=None, alias="sessionId")
 
 class XDBResponse(BaseModel):
     """Standard XDB API response"""
@@ -23,11 +35,27 @@ class XDBResponse(BaseModel):
     error: bool = False
     process_id: Optional[str] = None
 
+class BulkCreateItem(BaseModel):
+    """A single memory or reminder in a bulk create call"""
+    content: str
+    tag: str = ""
+    session_id: str = ""
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a bulk create call, reported in input order"""
+    index: int
+    success: bool
+    process_id: Optional[str] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+
 class ListMemoriesInput(BaseModel):
     """Input schema for listing memories"""
     user_key: str = Field(description="The user key to list memories for")
     tokens: Optional[List[str]] = Field(default=None, description="Optional list of tokens to filter memories")
     query: Optional[str] = Field(default="", description="Optional query string to search memories")
+    limit: Optional[int] = Field(default=None, description="Optional maximum number of results to return")
+    offset: Optional[int] = Field(default=0, description="Number of results to skip, taken from the previous page's 'more results' hint")
 
 class CreateMemoryInput(BaseModel):
     """Input schema for creating memories"""
@@ -49,4 +77,18 @@ class ProcessTranscriptInput(BaseModel):
     user_key: str = Field(description="The user key to create memory for")
     path: str = Field(description="The content/text of the transcript to process")
     tag: str = Field(description="Need to provide a tag for the transcripts")
-    session_id: Optional[str] = Field(default="", description="Optional session ID for grouping memories")
\ No newline at end of file
+    session_id: Optional[str] = Field(default="", description="Optional session ID for grouping memories")
+
+class CreateMemoriesBatchInput(BaseModel):
+    """Input schema for creating many memories at once"""
+    user_key: str = Field(description="The user key to create memories for")
+    contents: List[str] = Field(description="The list of memory contents to store, one entry per memory")
+    tag: Optional[str] = Field(default="", description="Optional tag applied to every memory")
+    session_id: Optional[str] = Field(default="", description="Optional session ID applied to every memory")
+
+class CreateRemindersBatchInput(BaseModel):
+    """Input schema for creating many reminders at once"""
+    user_key: str = Field(description="The user key to create reminders for")
+    contents: List[str] = Field(description="The list of reminder contents to store, one entry per reminder")
+    tag: Optional[str] = Field(default="", description="Optional tag applied to every reminder")
+    session_id: Optional[str] = Field(default="", description="Optional session ID applied to every reminder")
@@ -0,0 +1,122 @@
+"""
+Retry, circuit breaker and hedging primitives for XDB API calls
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from utils.exceptions import XDBCircuitOpenError
+
+# Read-only endpoints: safe to retry and to send twice
+IDEMPOTENT_ENDPOINTS = frozenset({"/api/memory/list", "/api/reminder/list", "/api/health"})
+
+# HTTP statuses worth retrying: the request may succeed on another attempt or node
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class CircuitBreaker:
+    """Fails fast after consecutive backend failures.
+
+    closed: calls pass; failure_threshold consecutive failures open the circuit.
+    open: calls raise XDBCircuitOpenError until reset_timeout has passed.
+    half-open: one probe call is let through; its success closes the circuit, its failure
+    opens it again. A probe that never reports back (e.g. a cancelled task) is replaced after
+    another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise XDBCircuitOpenError if the call must not be attempted"""
+        if self.failure_threshold <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "open":
+                if now - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise XDBCircuitOpenError("XDB backend unavailable, circuit breaker is open")
+                self.state = "half-open"
+                self._probing = False
+            if self.state == "half-open":
+                if self._probing and now - self._probe_started < self.reset_timeout:
+                    self.rejected += 1
+                    raise XDBCircuitOpenError("XDB backend unavailable, circuit breaker is probing")
+                self._probing = True
+                self._probe_started = now
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+            self._probing = False
+
+    def record_failure(self):
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures,
+                    "opened": self.opened, "rejected": self.rejected}
+
+class LatencyTracker:
+    """Recent successful-call latencies, used to pick the hedging delay"""
+
+    def __init__(self, size: int = 256, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-quantile of the recent samples, None until min_samples were seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+class ResilienceStats:
+    """Counters shared by the sync and async request paths"""
+
+    def __init__(self):
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"retries": self.retries, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
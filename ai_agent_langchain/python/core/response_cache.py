@@ -0,0 +1,157 @@
+"""
+Persistent cache of final agent answers for repeated read-only questions
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    answer TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+CREATE TABLE IF NOT EXISTS response_users (
+    user_key TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (user_key, key)
+);
+CREATE INDEX IF NOT EXISTS response_users_key ON response_users (key);
+"""
+
+class ResponseCache:
+    """SQLite-backed TTL cache of agent answers, bounded by total bytes with least recently
+    used eviction.
+
+    Each entry keeps the tool calls that produced it (the plan) and is indexed by every user
+    key those calls read, so a write for a user drops all answers built from that user's data.
+    The file may be shared by several processes; invalidations made by one are seen by all.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 300.0, max_bytes: int = 16 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached answer for key, None when missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT answer, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._delete([key])
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, answer: str, plan: List[Dict[str, Any]], user_keys: Iterable[str]):
+        """Store an answer with the tool calls behind it and the user keys it depends on"""
+        plan_json = json.dumps(plan)
+        size = len(key) + len(answer.encode("utf-8")) + len(plan_json)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM response_users WHERE key = ?", (key,))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, answer, plan, created_at, expires_at, last_used, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, answer, plan_json, now, now + self.ttl_seconds, now, size))
+                self._db.executemany("INSERT OR IGNORE INTO response_users (user_key, key) VALUES (?, ?)",
+                                     [(user_key, key) for user_key in set(user_keys)])
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.stores += 1
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until within max_bytes"""
+        expired = [row[0] for row in self._db.execute("SELECT key FROM responses WHERE expires_at <= ?",
+                                                      (time.time(),))]
+        self._delete(expired)
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            victims.append(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._delete(victims)
+        self.evictions += len(victims)
+
+    def _delete(self, keys: List[str]):
+        self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+        self._db.executemany("DELETE FROM response_users WHERE key = ?", [(key,) for key in keys])
+
+    def plan(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Tool calls recorded with an entry, for inspection"""
+        with self._lock:
+            row = self._db.execute("SELECT plan FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def invalidate_user(self, user_key: str):
+        """Drop every answer that read data of this user"""
+        with self._lock:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM response_users WHERE user_key = ?",
+                                                       (user_key,))]
+            if keys:
+                self._delete(keys)
+                self.invalidations += len(keys)
+
+    def bypass(self):
+        """Count a turn that was not looked up or stored because it writes"""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.execute("DELETE FROM response_users")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
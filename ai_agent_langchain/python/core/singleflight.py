@@ -0,0 +1,94 @@
+"""
+Single-flight coalescing: identical concurrent calls share one execution and its result
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _Counters:
+    def __init__(self):
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "executed": self.executed, "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / self.calls if self.calls else 0.0}
+
+class SingleFlight(_Counters):
+    """Thread-safe: while fn runs for a key, other callers with that key wait for its outcome.
+
+    Nothing is kept once the call finishes; a later call with the same key runs fn again.
+    The leader's exception is raised in every waiter.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class AsyncSingleFlight(_Counters):
+    """Asyncio counterpart of SingleFlight, for callers on one event loop.
+
+    The shared work runs in its own task, so cancelling any one caller, the first included,
+    does not cancel it for the others.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            self.executed += 1
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception retrieved in case every caller was cancelled before it finished
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,274 @@
+"""
+Timed spans and metrics for the hot paths: XDB requests, signing, decryption, tool calls and LLM turns
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.exceptions import XDBConfigurationError
+
+TELEMETRY_EXPORTERS = ("metrics", "otel")
+
+# Upper bounds in seconds; wide enough for a 30µs signature and a 30s LLM turn
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Replaced, never mutated, so a span can read it without a lock
+_exporters: tuple = ()
+_configure_lock = threading.Lock()
+
+class Span:
+    """One timed operation. str and bool attributes become metric labels, numeric ones are
+    added to counters (for example bytes_in); a failure adds an error=<exception type> label."""
+
+    __slots__ = ("name", "attrs", "_exporters", "_handles", "_start", "_activate")
+
+    def __init__(self, name: str, attrs: dict, exporters: tuple):
+        self.name = name
+        self.attrs = attrs
+        self._exporters = exporters
+        self._handles: list = []
+        self._start = 0.0
+        self._activate = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def start(self) -> "Span":
+        self._handles = [exporter.start(self, self._activate) for exporter in self._exporters]
+        self._start = time.perf_counter()
+        return self
+
+    def end(self, error: Optional[BaseException] = None):
+        seconds = time.perf_counter() - self._start
+        if error is not None:
+            self.attrs["error"] = type(error).__name__
+        for exporter, handle in zip(self._exporters, self._handles):
+            exporter.end(self, seconds, handle, error)
+
+    def __enter__(self) -> "Span":
+        # Only spans that start and end in the same context may become the current span
+        self._activate = True
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(exc)
+        return False
+
+class _NoopSpan:
+    """Returned while telemetry is disabled, so instrumented code pays one function call"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def start(self) -> "_NoopSpan":
+        return self
+
+    def end(self, error: Optional[BaseException] = None):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+def span(name: str, **attrs) -> Union[Span, _NoopSpan]:
+    """A span for a with block, or to start() and end() from callbacks"""
+    exporters = _exporters
+    if not exporters:
+        return NOOP_SPAN
+    return Span(name, attrs, exporters)
+
+def enabled() -> bool:
+    return bool(_exporters)
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum", "totals")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.totals: Dict[str, float] = {}
+
+def _labels(attrs: dict) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, float]]:
+    labels, values = [], {}
+    for key, value in attrs.items():
+        if isinstance(value, bool) or isinstance(value, str):
+            labels.append((key, str(value).lower() if isinstance(value, bool) else value))
+        elif isinstance(value, (int, float)):
+            values[key] = value
+    return tuple(sorted(labels)), values
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(labels: Iterable[Tuple[str, str]], le: Optional[str] = None) -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class MetricsRegistry:
+    """In-process exporter: a duration histogram per span name and label set, plus counters
+    for numeric span attributes"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, tuple], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def start(self, span: Span, activate: bool):
+        return None
+
+    def end(self, span: Span, seconds: float, handle, error: Optional[BaseException]):
+        labels, values = _labels(span.attrs)
+        index = bisect.bisect_left(self.buckets, seconds)
+        key = (span.name, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Histogram(len(self.buckets))
+            series.counts[index] += 1
+            series.count += 1
+            series.sum += seconds
+            for name, value in values.items():
+                series.totals[name] = series.totals.get(name, 0) + value
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        """Linear interpolation inside the bucket holding the q-th observation"""
+        rank = q * count
+        seen = 0
+        for i, in_bucket in enumerate(counts):
+            if in_bucket and seen + in_bucket >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / in_bucket
+            seen += in_bucket
+        return 0.0
+
+    def _copy(self) -> List[tuple]:
+        with self._lock:
+            return sorted((name, labels, list(s.counts), s.count, s.sum, dict(s.totals))
+                          for (name, labels), s in self._series.items())
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        """Count, mean and approximate p50/p95/p99 in milliseconds per span name and label set,
+        with the totals of numeric attributes"""
+        result: Dict[str, List[dict]] = {}
+        for name, labels, counts, count, total, totals in self._copy():
+            result.setdefault(name, []).append({
+                "labels": dict(labels),
+                "count": count,
+                "mean_ms": 1000 * total / count,
+                "p50_ms": 1000 * self._quantile(counts, count, 0.5),
+                "p95_ms": 1000 * self._quantile(counts, count, 0.95),
+                "p99_ms": 1000 * self._quantile(counts, count, 0.99),
+                **totals
+            })
+        return result
+
+    def prometheus_text(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        lines = []
+        histograms = set()
+        counters: Dict[str, List[str]] = {}
+        for name, labels, counts, count, total, totals in self._copy():
+            metric = f"{_metric_name(name)}_duration_seconds"
+            if metric not in histograms:
+                histograms.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, in_bucket in zip(self.buckets, counts):
+                cumulative += in_bucket
+                lines.append(f"{metric}_bucket{_label_text(labels, f'{bound:g}')} {cumulative}")
+            lines.append(f"{metric}_bucket{_label_text(labels, '+Inf')} {count}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {total:.9g}")
+            lines.append(f"{metric}_count{_label_text(labels)} {count}")
+            for attr, value in totals.items():
+                counters.setdefault(f"{_metric_name(name)}_{_metric_name(attr)}_total", []).append(
+                    f"{_label_text(labels)} {value:.15g}")
+        for metric, samples in counters.items():
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{sample}" for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+class OpenTelemetryExporter:
+    """Forwards spans to OpenTelemetry; with-block spans become the current span, so XDB
+    requests nest under the operation that made them"""
+
+    def __init__(self, tracer_provider=None):
+        try:
+            from opentelemetry import context, trace
+            from opentelemetry.trace import Status, StatusCode
+        except ImportError:
+            raise XDBConfigurationError("telemetry 'otel' requested but opentelemetry-api is not installed")
+        self._context = context
+        self._trace = trace
+        self._error_status = lambda e: Status(StatusCode.ERROR, str(e))
+        self._tracer = trace.get_tracer("xdb_ai_connector", tracer_provider=tracer_provider)
+
+    def start(self, span: Span, activate: bool):
+        otel_span = self._tracer.start_span(span.name)
+        token = self._context.attach(self._trace.set_span_in_context(otel_span)) if activate else None
+        return otel_span, token
+
+    def end(self, span: Span, seconds: float, handle, error: Optional[BaseException]):
+        otel_span, token = handle
+        if token is not None:
+            self._context.detach(token)
+        otel_span.set_attributes({key: value for key, value in span.attrs.items()
+                                  if isinstance(value, (str, bool, int, float))})
+        if error is not None:
+            otel_span.record_exception(error)
+            otel_span.set_status(self._error_status(error))
+        otel_span.end()
+
+_registry = MetricsRegistry()
+
+def get_registry() -> MetricsRegistry:
+    """The process-wide registry used by the "metrics" exporter"""
+    return _registry
+
+def add_exporter(exporter):
+    """Send spans to an exporter: any object with start(span, activate) -> handle and
+    end(span, seconds, handle, error)"""
+    global _exporters
+    with _configure_lock:
+        if exporter not in _exporters:
+            _exporters = _exporters + (exporter,)
+
+def configure(names: str):
+    """Enable exporters by name from a comma separated list such as "metrics,otel".
+
+    Telemetry is process-wide; enabling an exporter twice has no effect.
+    """
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name == "metrics":
+            add_exporter(_registry)
+        elif name == "otel":
+            if not any(isinstance(e, OpenTelemetryExporter) for e in _exporters):
+                add_exporter(OpenTelemetryExporter())
+        else:
+            raise XDBConfigurationError(
+                f"Unknown telemetry exporter '{name}', expected one of {', '.join(TELEMETRY_EXPORTERS)}")
+
+def disable():
+    """Remove every exporter; spans become no-ops again"""
+    global _exporters
+    with _configure_lock:
+        _exporters = ()
@@ -0,0 +1,23 @@
+"""
+Search terms shared by server-side result ranking and the local memory index
+"""
+
+import re
+from typing import Iterable, List, Optional, Set
+
+_WORD = re.compile(r"\w+")
+
+# Tokens are explicit tags, so a token match weighs double a word of the text
+TOKEN_WEIGHT = 2
+
+def terms(text: str) -> Set[str]:
+    """Lowercased words of a text"""
+    return {word.lower() for word in _WORD.findall(text)}
+
+def query_terms(query: Optional[str] = "", tokens: Optional[Iterable[str]] = None) -> Set[str]:
+    """Terms a search for query and filter tokens looks for"""
+    return terms(query or "") | {token.lower() for token in tokens or []}
+
+def token_terms(tokens: Optional[List[str]]) -> Set[str]:
+    """Lowercased tokens of a record"""
+    return {str(token).lower() for token in tokens or []}
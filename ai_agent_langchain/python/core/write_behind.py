@@ -0,0 +1,197 @@
+"""
+Durable write-behind journal for memory and reminder creation
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from core.concurrency import bounded_map
+from core.models import XDBResponse
+from core.resilience import backoff_delay
+from utils.exceptions import XDBCircuitOpenError, XDBTransientError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    local_id TEXT NOT NULL UNIQUE,
+    endpoint TEXT NOT NULL,
+    user_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    process_id TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_pending ON journal (status, seq);
+CREATE INDEX IF NOT EXISTS journal_user ON journal (user_key, status, seq);
+"""
+
+class WriteBehindQueue:
+    """Creates are journaled to SQLite and acknowledged at once; a background thread
+    delivers them to XDB.
+
+    The journal runs in WAL mode, so an acknowledged write survives a process crash and is
+    replayed on the next start. Delivery is at-least-once: a crash or timeout after the
+    server stored a record but before it was marked delivered sends it again.
+
+    Writes of one user are delivered strictly in journal order; a user whose oldest write is
+    waiting to be retried holds back their later writes. Different users are delivered in
+    parallel. Transient failures (timeouts, 5xx, open circuit) back off and retry without
+    limit; writes the server rejects are kept with status 'failed' for inspection.
+
+    Only one queue may own a journal file at a time.
+    """
+
+    def __init__(self, path: str, deliver: Callable[[str, str, dict], XDBResponse], batch_size: int = 50,
+                 flush_interval: float = 1.0, max_in_flight: int = 8, backoff_base: float = 0.5,
+                 backoff_max: float = 60.0):
+        self.path = path
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_in_flight = max_in_flight
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="xdb-write-behind", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, endpoint: str, user_key: str, payload: dict) -> XDBResponse:
+        """Journal a create call and acknowledge it with a local id"""
+        local_id = f"local-{uuid.uuid4().hex}"
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO journal (local_id, endpoint, user_key, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (local_id, endpoint, user_key, json.dumps(payload), time.time())
+            )
+        self._wake.set()
+        return XDBResponse(status="Success", message="Queued for delivery", process_id=local_id,
+                           data={"queued": True, "localId": local_id})
+
+    def _due_batches(self) -> List[List[tuple]]:
+        """Oldest pending writes grouped per user in journal order, leaving out every write
+        queued behind one that is still backing off"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, local_id, endpoint, user_key, payload, attempts FROM journal AS j "
+                "WHERE status = 'pending' AND NOT EXISTS ("
+                "  SELECT 1 FROM journal AS h WHERE h.user_key = j.user_key AND h.status = 'pending'"
+                "  AND h.seq <= j.seq AND h.next_attempt_at > ?) "
+                "ORDER BY seq LIMIT ?", (time.time(), self.batch_size)
+            ).fetchall()
+        users: "OrderedDict[str, List[tuple]]" = OrderedDict()
+        for row in rows:
+            users.setdefault(row[3], []).append(row)
+        return list(users.values())
+
+    def _deliver_user(self, rows: List[tuple]) -> int:
+        """Deliver one user's writes in order, stopping at the first that must be retried"""
+        sent = 0
+        for seq, _, endpoint, user_key, payload, attempts in rows:
+            try:
+                result = self.deliver(endpoint, user_key, json.loads(payload))
+            except (XDBTransientError, XDBCircuitOpenError) as e:
+                self._retry_later(seq, attempts, str(e))
+                return sent
+            except Exception as e:
+                self._finish(seq, "failed", error=str(e))
+                continue
+            if result.status == "Success":
+                self._finish(seq, "delivered", process_id=result.process_id)
+                sent += 1
+            else:
+                self._finish(seq, "failed", error=result.message)
+        return sent
+
+    def _retry_later(self, seq: int, attempts: int, error: str):
+        # At least backoff_base, so a down backend is not hammered by near-zero jitter draws
+        retry_at = time.time() + max(backoff_delay(attempts, self.backoff_base, self.backoff_max), self.backoff_base)
+        with self._lock:
+            self.retried += 1
+            self._db.execute("UPDATE journal SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE seq = ?",
+                             (attempts + 1, retry_at, error, seq))
+
+    def _finish(self, seq: int, status: str, process_id: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            if status == "delivered":
+                # Delivered rows carry nothing worth keeping
+                self.delivered += 1
+                self._db.execute("DELETE FROM journal WHERE seq = ?", (seq,))
+            else:
+                self.failed += 1
+                self._db.execute("UPDATE journal SET status = ?, last_error = ?, process_id = ? WHERE seq = ?",
+                                 (status, error, process_id, seq))
+
+    def flush(self) -> int:
+        """Deliver every write that is due now; returns how many were delivered"""
+        sent = 0
+        with self._flush_lock:
+            # Each round finishes its rows or puts them back into backoff, so this terminates
+            while True:
+                batches = self._due_batches()
+                if not batches:
+                    return sent
+                sent += sum(bounded_map(self._deliver_user, batches, self.max_in_flight))
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        """Queue depth, age of the oldest pending write (lag) and delivery counters"""
+        with self._lock:
+            depth, oldest = self._db.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM journal WHERE status = 'pending'").fetchone()
+            failed_rows = self._db.execute("SELECT COUNT(*) FROM journal WHERE status = 'failed'").fetchone()[0]
+            return {"depth": depth, "lag_seconds": time.time() - oldest if oldest else 0.0,
+                    "delivered": self.delivered, "retried": self.retried, "failed": self.failed,
+                    "failed_in_journal": failed_rows}
+
+    def failed_writes(self) -> List[dict]:
+        """Writes the server rejected, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT local_id, endpoint, user_key, payload, last_error FROM journal "
+                "WHERE status = 'failed' ORDER BY seq").fetchall()
+        return [{"local_id": r[0], "endpoint": r[1], "user_key": r[2], "payload": json.loads(r[3]), "error": r[4]}
+                for r in rows]
+
+    def close(self, flush: bool = True):
+        """Stop the flusher, delivering what is due first unless flush is False"""
+        if self._stopping:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        if flush:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed: {e}")
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,433 @@
+"""
+Load generator for XDB AI Connector: replays chat and client traffic at a set concurrency or rate
+
+Usage: python loadgen.py [--trace trace.jsonl] [--mode threads|async]
+                         [--concurrency N | --rate R] [--duration S | --requests N]
+                         [--sweep 1,2,4,8,...] [--output report.json]
+
+By default the XDB backend is the local stub (benchmarks/stub_server.py) started in process and
+the agent runs on a fake function-calling model, so no network or credentials are needed; with
+--env the client uses the XDB_* environment configuration instead (the model stays fake).
+
+A trace is JSON lines, one operation each, replayed in order and repeated until the run ends:
+
+    {"op": "chat", "message": "What do I remember about the launch for user alice?", "session_id": "s1"}
+    {"op": "list_memories", "user_key": "alice", "query": "launch"}
+    {"op": "create_reminder", "user_key": "alice", "content": "Call Bob tomorrow at 9am"}
+
+"chat" goes through XDBAIAgent.chat / achat; the other ops are XDBAPIClient / AsyncXDBAPIClient
+methods called with the remaining fields. Without --trace a synthetic mix is generated.
+
+--concurrency runs a closed loop of that many workers. --rate runs an open loop: operations
+start on a fixed schedule and latency is measured from the scheduled start, so a saturated
+system shows queueing instead of hiding it. --sweep repeats the run for each concurrency and
+reports where throughput stops growing.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Like cli.py, heavy dependencies are imported by the functions that need them
+
+CLIENT_OPS = ("list_memories", "list_reminders", "create_memory", "create_reminder", "health_check")
+OPS = ("chat",) + CLIENT_OPS
+CHAT_ERROR_PREFIX = "Sorry, I encountered an error"
+
+_USER_IN_MESSAGE = re.compile(r"\buser(?:\s+key)?\s*[:=]?\s*['\"]?([\w.@+-]+)", re.IGNORECASE)
+
+def load_trace(path: str) -> List[dict]:
+    """Read a JSONL trace, rejecting unknown operations up front"""
+    trace = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item.get("op") not in OPS:
+                raise ValueError(f"{path}:{number}: unknown op {item.get('op')!r}, expected one of {', '.join(OPS)}")
+            trace.append(item)
+    if not trace:
+        raise ValueError(f"{path}: empty trace")
+    return trace
+
+def synthetic_trace(users: int, chat_ratio: float, write_ratio: float, length: int = 1000, seed: int = 0) -> List[dict]:
+    """A repeatable mix of chat turns, reads and writes spread over users"""
+    rng = random.Random(seed)
+    topics = ["launch", "budget", "hiring", "travel", "roadmap"]
+    trace = []
+    for i in range(length):
+        user = f"user-{rng.randrange(users)}"
+        topic = rng.choice(topics)
+        if rng.random() < chat_ratio:
+            if rng.random() < write_ratio:
+                message = f"Remember that the {topic} review went well for user {user}"
+            else:
+                message = f"What do I remember about the {topic} for user {user}?"
+            trace.append({"op": "chat", "message": message, "session_id": f"{user}-session"})
+        elif rng.random() < write_ratio:
+            trace.append({"op": "create_memory", "user_key": user, "content": f"Note {i} about the {topic}"})
+        else:
+            op = "list_memories" if rng.random() < 0.8 else "list_reminders"
+            trace.append({"op": op, "user_key": user, "query": topic})
+    return trace
+
+def make_fake_llm(latency_ms: float):
+    """Function-calling chat model without a network: it calls one XDB tool per user message,
+    chosen from the message, then answers once the tool result is back"""
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import AIMessage, FunctionMessage, HumanMessage, ToolMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class LoadgenChatModel(BaseChatModel):
+        latency_ms: float = 0.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "loadgen-fake"
+
+        def _reply(self, messages) -> ChatResult:
+            last = messages[-1]
+            if isinstance(last, (FunctionMessage, ToolMessage)):
+                message = AIMessage(content=f"Here is what I found: {str(last.content)[:200]}")
+            else:
+                text = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+                match = _USER_IN_MESSAGE.search(text)
+                user_key = match.group(1) if match else "loadgen"
+                lowered = text.lower()
+                if lowered.startswith("remember"):
+                    name, args = "create_memory", {"user_key": user_key, "content": text}
+                elif lowered.startswith("remind"):
+                    name, args = "create_reminder", {"user_key": user_key, "content": text}
+                elif "reminder" in lowered:
+                    name, args = "list_reminders", {"user_key": user_key}
+                else:
+                    name, args = "list_memories", {"user_key": user_key}
+                message = AIMessage(content="", additional_kwargs={
+                    "function_call": {"name": name, "arguments": json.dumps(args)}})
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            return self._reply(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+            return self._reply(messages)
+
+    return LoadgenChatModel(latency_ms=latency_ms)
+
+class Recorder:
+    """Latencies and errors per operation, shared by all workers"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_types: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, op: str, seconds: float, error: Optional[str] = None):
+        with self._lock:
+            self.latencies.setdefault(op, []).append(seconds)
+            if error is not None:
+                self.errors[op] = self.errors.get(op, 0) + 1
+                self.error_types[error] = self.error_types.get(error, 0) + 1
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    """Throughput, error rate and latency percentiles per operation and in total"""
+    def stats(latencies: List[float], errors: int) -> dict:
+        ordered = sorted(latencies)
+        return {
+            "count": len(ordered),
+            "errors": errors,
+            "error_rate": errors / len(ordered) if ordered else 0.0,
+            "throughput_per_s": len(ordered) / elapsed if elapsed else 0.0,
+            "p50_ms": 1000 * percentile(ordered, 0.50),
+            "p95_ms": 1000 * percentile(ordered, 0.95),
+            "p99_ms": 1000 * percentile(ordered, 0.99),
+            "max_ms": 1000 * ordered[-1] if ordered else 0.0
+        }
+
+    operations = {op: stats(latencies, recorder.errors.get(op, 0)) for op, latencies in sorted(recorder.latencies.items())}
+    total = stats([s for latencies in recorder.latencies.values() for s in latencies], sum(recorder.errors.values()))
+    return {"elapsed_s": elapsed, "total": total, "operations": operations, "error_types": dict(recorder.error_types)}
+
+class Target:
+    """Runs one trace item against the agent or a client and classifies the outcome"""
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    @staticmethod
+    def _split(item: dict):
+        return item["op"], {k: v for k, v in item.items() if k != "op"}
+
+    @staticmethod
+    def _error(op: str, result) -> Optional[str]:
+        if op == "chat":
+            return "ChatError" if result.startswith(CHAT_ERROR_PREFIX) else None
+        return None if result.status == "Success" else f"Status{result.status}"
+
+    def call(self, item: dict) -> Optional[str]:
+        op, args = self._split(item)
+        if op == "chat":
+            result = self.agent.chat(args["message"], args.get("session_id", "default"))
+        else:
+            result = getattr(self.agent.xdb_client, op)(**args)
+        return self._error(op, result)
+
+    async def acall(self, item: dict) -> Optional[str]:
+        op, args = self._split(item)
+        if op == "chat":
+            result = await self.agent.achat(args["message"], args.get("session_id", "default"))
+        else:
+            result = await getattr(self.agent.async_xdb_client, op)(**args)
+        return self._error(op, result)
+
+class _Feed:
+    """Thread-safe cyclic iterator over the trace, bounded by a request count and a deadline"""
+
+    def __init__(self, trace: List[dict], requests: Optional[int], deadline: float):
+        self._items = itertools.cycle(trace)
+        self._left = requests
+        self._deadline = deadline
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[dict]:
+        with self._lock:
+            if time.perf_counter() >= self._deadline or self._left == 0:
+                return None
+            if self._left is not None:
+                self._left -= 1
+            return next(self._items)
+
+def _timed(target: Target, recorder: Recorder, item: dict, scheduled: Optional[float] = None):
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        error = target.call(item)
+    except Exception as e:
+        error = type(e).__name__
+    recorder.record(item["op"], time.perf_counter() - start, error)
+
+async def _atimed(target: Target, recorder: Recorder, item: dict, scheduled: Optional[float] = None):
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        error = await target.acall(item)
+    except Exception as e:
+        error = type(e).__name__
+    recorder.record(item["op"], time.perf_counter() - start, error)
+
+def run_threads(target: Target, feed: _Feed, recorder: Recorder, concurrency: int, rate: Optional[float]):
+    if rate is None:
+        def worker():
+            item = feed.next()
+            while item is not None:
+                _timed(target, recorder, item)
+                item = feed.next()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen") as pool:
+        start = time.perf_counter()
+        for n in itertools.count():
+            scheduled = start + n / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            item = feed.next()
+            if item is None:
+                break
+            pool.submit(_timed, target, recorder, item, scheduled)
+
+async def run_async(target: Target, feed: _Feed, recorder: Recorder, concurrency: int, rate: Optional[float]):
+    if rate is None:
+        async def worker():
+            item = feed.next()
+            while item is not None:
+                await _atimed(target, recorder, item)
+                item = feed.next()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(item: dict, scheduled: float):
+        async with slots:
+            await _atimed(target, recorder, item, scheduled)
+
+    tasks = []
+    start = time.perf_counter()
+    for n in itertools.count():
+        scheduled = start + n / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        item = feed.next()
+        if item is None:
+            break
+        tasks.append(asyncio.ensure_future(bounded(item, scheduled)))
+    await asyncio.gather(*tasks)
+
+def _run_step(args, target: Target, trace: List[dict], concurrency: int,
+              runner: Callable[[Target, _Feed, Recorder, int, Optional[float]], Any]) -> Dict[str, Any]:
+    """One measured run after a short warm-up that is not recorded"""
+    if args.warmup:
+        runner(target, _Feed(trace, args.warmup, float("inf")), Recorder(), concurrency, None)
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + args.duration if args.requests is None else float("inf")
+    runner(target, _Feed(trace, args.requests, deadline), recorder, concurrency, args.rate)
+    return summarize(recorder, time.perf_counter() - start)
+
+def print_step(concurrency: int, summary: Dict[str, Any]):
+    total = summary["total"]
+    print(f"concurrency {concurrency}: {total['count']} ops in {summary['elapsed_s']:.1f}s, "
+          f"{total['throughput_per_s']:.1f} ops/s, p50 {total['p50_ms']:.1f} ms, p95 {total['p95_ms']:.1f} ms, "
+          f"p99 {total['p99_ms']:.1f} ms, errors {total['error_rate']:.1%}")
+    for op, stats in summary["operations"].items():
+        print(f"  {op:>16}: {stats['count']:7d} ops {stats['throughput_per_s']:9.1f}/s  p50 {stats['p50_ms']:8.1f}  "
+              f"p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f}  max {stats['max_ms']:8.1f} ms  "
+              f"errors {stats['error_rate']:.1%}")
+    if summary["error_types"]:
+        print(f"  error types: {summary['error_types']}")
+
+def saturation_point(steps: List[Dict[str, Any]], gain: float = 0.1) -> Optional[int]:
+    """Last concurrency level before the next one adds less than gain to throughput"""
+    for before, after in zip(steps, steps[1:]):
+        if after["total"]["throughput_per_s"] < before["total"]["throughput_per_s"] * (1 + gain):
+            return before["concurrency"]
+    return None
+
+def build_agent(args, base_url: Optional[str]):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    from agent.agent import XDBAIAgent
+    from core.config import XDBConfig
+
+    if base_url is None:
+        config = XDBConfig.from_env()
+    else:
+        key = ec.generate_private_key(ec.SECP256R1())
+        pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption()).decode()
+        config = XDBConfig(base_url=base_url, api_key="loadgen", private_key_content=pem,
+                           max_connections=max(100, max(args.levels)))
+    return XDBAIAgent(config, llm=make_fake_llm(args.llm_latency_ms), streaming=False, verbose=False,
+                      memory_strategy=args.memory, fast_path=args.fast_path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trace", help="JSONL trace to replay (default: a synthetic mix)")
+    parser.add_argument("--mode", choices=["threads", "async"], default="threads",
+                        help="Sync agent/client on threads, or async agent/client on one event loop (default: threads)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Closed-loop workers, or the in-flight cap with --rate (default: 8)")
+    parser.add_argument("--rate", type=float, help="Open loop: start this many operations per second")
+    parser.add_argument("--sweep", help="Comma separated concurrency levels to run one after another")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run (default: 10)")
+    parser.add_argument("--requests", type=int, help="Operations per run instead of --duration")
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded operations before each run (default: 20)")
+    parser.add_argument("--users", type=int, default=50, help="Users in the synthetic trace (default: 50)")
+    parser.add_argument("--chat-ratio", type=float, default=0.5, help="Share of chat turns in the synthetic trace")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Share of writes in the synthetic trace")
+    parser.add_argument("--records", type=int, default=100, help="Memories per user on the stub (default: 100)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Stub latency per request")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of stub requests answered with 503")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated model latency per LLM call")
+    parser.add_argument("--memory", choices=["buffer", "window", "token", "summary"], default="window",
+                        help="Conversation memory strategy of the agent (default: window)")
+    parser.add_argument("--fast-path", action="store_true", help="Enable the agent's fast-path router")
+    parser.add_argument("--env", action="store_true", help="Use the XDB_* environment config instead of the stub")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    args.levels = [int(level) for level in args.sweep.split(",")] if args.sweep else [args.concurrency]
+    if any(level < 1 for level in args.levels):
+        parser.error("concurrency levels must be at least 1")
+
+    try:
+        trace = load_trace(args.trace) if args.trace else synthetic_trace(args.users, args.chat_ratio, args.write_ratio)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    stub = None
+    if not args.env:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+        from stub_server import StubServer
+        stub = StubServer(memories_per_user=args.records, latency_ms=args.latency_ms,
+                          error_rate=args.error_rate).start()
+
+    steps = []
+    try:
+        agent = build_agent(args, stub.url if stub else None)
+        target = Target(agent)
+        if args.mode == "threads":
+            for level in args.levels:
+                steps.append({"concurrency": level, **_run_step(args, target, trace, level, run_threads)})
+                print_step(level, steps[-1])
+            agent.xdb_client.close()
+        else:
+            def runner(*run_args):
+                return loop.run_until_complete(run_async(*run_args))
+
+            loop = asyncio.new_event_loop()
+            try:
+                for level in args.levels:
+                    steps.append({"concurrency": level, **_run_step(args, target, trace, level, runner)})
+                    print_step(level, steps[-1])
+                loop.run_until_complete(agent.aclose())
+            finally:
+                loop.close()
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    if len(steps) > 1:
+        best = max(steps, key=lambda step: step["total"]["throughput_per_s"])
+        knee = saturation_point(steps)
+        print(f"peak throughput {best['total']['throughput_per_s']:.1f} ops/s at concurrency {best['concurrency']}"
+              + (f"; saturates near concurrency {knee}" if knee is not None else ""))
+
+    if args.output:
+        report = {
+            "mode": args.mode,
+            "rate": args.rate,
+            "trace": args.trace or "synthetic",
+            "params": {"duration": args.duration, "requests": args.requests, "records": args.records,
+                       "latency_ms": args.latency_ms, "error_rate": args.error_rate,
+                       "llm_latency_ms": args.llm_latency_ms, "memory": args.memory, "fast_path": args.fast_path},
+            "steps": steps
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+if __name__ == "__main__":
+    main()
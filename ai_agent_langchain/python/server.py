@@ -0,0 +1,365 @@
+"""
+HTTP serving mode for XDB AI Connector
+
+A small HTTP/1.1 server on asyncio (standard library only) exposing the agent and the direct
+memory/reminder operations. Requests run concurrently on one event loop; blocking work
+(decryption, transcript parsing) goes to a bounded thread pool.
+
+    POST /chat                {"message", "session_id"?, "stream"?}
+    POST /memories/list       {"user_key", "tokens"?, "query"?, "limit"?, "offset"?}
+    POST /reminders/list      {"user_key", "tokens"?, "query"?, "limit"?, "offset"?}
+    POST /memories            {"user_key", "content", "tag"?, "session_id"?}
+    POST /reminders           {"user_key", "content", "tag"?, "session_id"?}
+    GET  /memories/export?user_key=...   all memories as streamed NDJSON
+    GET  /health
+    GET  /metrics             request rate and latency percentiles per route
+    GET  /metrics/prometheus  telemetry histograms in the Prometheus text format (XDB_TELEMETRY=metrics)
+
+Streamed responses use chunked transfer encoding with one JSON object per line.
+"""
+
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from agent.agent import XDBAIAgent
+from agent.memory import DEFAULT_SESSION
+from core.async_client import AsyncXDBAPIClient
+from core.telemetry import get_registry
+from utils.exceptions import XDBError
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class ServerMetrics:
+    """Per-route request counts, request rate and latency percentiles over a sliding sample"""
+
+    def __init__(self, sample_size: int = 10000):
+        self.started = time.monotonic()
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=sample_size))
+        self._recent: deque = deque()
+        self.in_flight = 0
+
+    def record(self, route: str, seconds: float, status: int):
+        now = time.monotonic()
+        self.counts[route] += 1
+        if status >= 400:
+            self.errors[route] += 1
+        self.latencies[route].append(seconds)
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+
+    @staticmethod
+    def _percentile(ordered, q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000 if ordered else 0.0
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started
+        routes = {}
+        for route, samples in self.latencies.items():
+            ordered = sorted(samples)
+            routes[route] = {
+                "requests": self.counts[route],
+                "errors": self.errors[route],
+                "p50_ms": self._percentile(ordered, 0.50),
+                "p90_ms": self._percentile(ordered, 0.90),
+                "p99_ms": self._percentile(ordered, 0.99),
+                "max_ms": ordered[-1] * 1000 if ordered else 0.0
+            }
+        total = sum(self.counts.values())
+        return {
+            "uptime_seconds": uptime,
+            "requests": total,
+            "in_flight": self.in_flight,
+            "requests_per_second": total / uptime if uptime else 0.0,
+            "requests_per_second_1m": len(self._recent) / min(max(uptime, 1e-9), 60),
+            "routes": routes
+        }
+
+class XDBServer:
+    """Serves one agent (sessions keyed by session_id) and its async XDB client over HTTP"""
+
+    def __init__(self, agent: XDBAIAgent, host: str = "127.0.0.1", port: int = 8080,
+                 workers: Optional[int] = None, max_concurrency: int = 256):
+        self.agent = agent
+        self.client: AsyncXDBAPIClient = agent.async_xdb_client
+        self.host = host
+        self.port = port
+        self.workers = workers or 8
+        self.max_concurrency = max_concurrency
+        self.metrics = ServerMetrics()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def start(self) -> "XDBServer":
+        loop = asyncio.get_running_loop()
+        # asyncio.to_thread (decryption, transcript parsing) runs on the default executor
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="xdb-blocking")
+        loop.set_default_executor(self._executor)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.agent.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    # HTTP plumbing
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, dict, bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        headers[":version"] = version
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _head(status: int, extra: str) -> bytes:
+        return (f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n{extra}"
+                "Server: xdb-ai-connector\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool):
+        await self._send_body(writer, status, "application/json", json.dumps(body).encode("utf-8"), keep_alive)
+
+    async def _send_body(self, writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes,
+                         keep_alive: bool):
+        connection = "keep-alive" if keep_alive else "close"
+        writer.write(self._head(status, f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+                                        f"Connection: {connection}\r\n") + payload)
+        await writer.drain()
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, lines: AsyncIterator[dict], keep_alive: bool) -> bool:
+        """Send NDJSON lines as chunks; a failure after the headers went out ends the stream
+        with an {"error": ...} line. Returns False in that case."""
+        connection = "keep-alive" if keep_alive else "close"
+        writer.write(self._head(200, "Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+                                     f"Connection: {connection}\r\n"))
+        ok = True
+        try:
+            async for line in lines:
+                self._write_chunk(writer, line)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            self._write_chunk(writer, {"error": str(e)})
+            ok = False
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return ok
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, line: dict):
+        data = (json.dumps(line) + "\n").encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close" and headers[":version"] != "HTTP/1.0"
+                async with self._slots:
+                    await self._dispatch(writer, method, target, body, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, target: str, body: bytes, keep_alive: bool):
+        url = urlsplit(target)
+        handler = self._routes().get((method, url.path))
+        # Unknown paths share one metrics bucket so scanners cannot grow the route table
+        route = f"{method} {url.path}" if handler is not None else "unmatched"
+        start = time.perf_counter()
+        status = 200
+        self.metrics.in_flight += 1
+        try:
+            if handler is None:
+                known = {path for _, path in self._routes()}
+                raise HTTPError(405 if url.path in known else 404, f"No route for {method} {url.path}")
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            request.update({k: v[-1] for k, v in parse_qs(url.query).items()})
+            result = await handler(request)
+            if isinstance(result, dict):
+                await self._send_json(writer, status, result, keep_alive)
+            elif isinstance(result, str):
+                await self._send_body(writer, status, "text/plain; version=0.0.4; charset=utf-8",
+                                      result.encode("utf-8"), keep_alive)
+            elif not await self._send_stream(writer, result, keep_alive):
+                status = 500
+        except HTTPError as e:
+            status = e.status
+            await self._send_json(writer, status, {"error": str(e)}, keep_alive)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            status = 400
+            await self._send_json(writer, status, {"error": f"Invalid request: {e}"}, keep_alive)
+        except XDBError as e:
+            status = 502
+            await self._send_json(writer, status, {"error": str(e)}, keep_alive)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            status = 500
+            await self._send_json(writer, status, {"error": str(e)}, keep_alive)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.record(route, time.perf_counter() - start, status)
+
+    # Routes
+
+    def _routes(self) -> dict:
+        return {
+            ("POST", "/chat"): self.chat,
+            ("POST", "/memories/list"): self.list_memories,
+            ("POST", "/reminders/list"): self.list_reminders,
+            ("POST", "/memories"): self.create_memory,
+            ("POST", "/reminders"): self.create_reminder,
+            ("GET", "/memories/export"): self.export_memories,
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics_snapshot,
+            ("GET", "/metrics/prometheus"): self.metrics_prometheus
+        }
+
+    async def chat(self, request: dict):
+        message = request["message"]
+        session_id = request.get("session_id") or DEFAULT_SESSION
+        if str(request.get("stream", "")).lower() in ("1", "true"):
+            async def lines():
+                async for delta in self.agent.astream(message, session_id):
+                    yield {"delta": delta}
+                yield {"done": True}
+            return lines()
+        return {"response": await self.agent.achat(message, session_id)}
+
+    @staticmethod
+    def _page(request: dict) -> Tuple[int, Optional[int]]:
+        offset = max(int(request.get("offset") or 0), 0)
+        limit = request.get("limit")
+        return offset, None if limit is None else offset + int(limit)
+
+    async def list_memories(self, request: dict) -> dict:
+        result = await self.client.list_memories(request["user_key"], request.get("tokens"), request.get("query") or "")
+        if result.status != "Success":
+            return result.model_dump()
+        memories = (result.data or {}).get("memories", [])
+        start, stop = self._page(request)
+        page = await asyncio.to_thread(self.client.decrypt_shared, memories, start, stop)
+        return {"status": result.status, "total": len(memories), "offset": start, "memories": page}
+
+    async def list_reminders(self, request: dict) -> dict:
+        result = await self.client.list_reminders(request["user_key"], request.get("tokens"), request.get("query") or "")
+        if result.status != "Success":
+            return result.model_dump()
+        reminders = (result.data or {}).get("reminders", [])
+        start, stop = self._page(request)
+        return {"status": result.status, "total": len(reminders), "offset": start, "reminders": reminders[start:stop]}
+
+    async def create_memory(self, request: dict) -> dict:
+        result = await self.client.create_memory(request["user_key"], request["content"],
+                                                 request.get("tag", ""), request.get("session_id", ""))
+        return result.model_dump()
+
+    async def create_reminder(self, request: dict) -> dict:
+        result = await self.client.create_reminder(request["user_key"], request["content"],
+                                                   request.get("tag", ""), request.get("session_id", ""))
+        return result.model_dump()
+
+    async def export_memories(self, request: dict):
+        records = self.client.iter_memories(request["user_key"], page_size=int(request.get("page_size") or 0) or None)
+        async def lines():
+            async for record in records:
+                yield record.model_dump(by_alias=True)
+        return lines()
+
+    async def health(self, request: dict) -> dict:
+        return {"status": "ok", "sessions": len(self.agent.sessions.sessions())}
+
+    async def metrics_snapshot(self, request: dict) -> dict:
+        xdb = {**self.client.resilience_stats(), "coalescing": self.client.coalescing_stats()}
+        if self.client.write_behind is not None:
+            xdb["write_behind"] = self.client.write_behind.stats()
+        if self.agent.xdb_client.local_index is not None:
+            xdb["local_index"] = self.agent.xdb_client.local_index.stats()
+        agent = self.agent.memory_stats()
+        if self.agent.response_cache is not None:
+            agent["response_cache"] = self.agent.response_cache.stats()
+        return {**self.metrics.snapshot(), "agent": agent, "xdb": xdb,
+                "telemetry": get_registry().snapshot()}
+
+    async def metrics_prometheus(self, request: dict) -> str:
+        return get_registry().prometheus_text()
+
+def run_server(host: str = "127.0.0.1", port: int = 8080, workers: Optional[int] = None,
+               max_concurrency: int = 256, **agent_kwargs):
+    """Build an agent from the environment and serve it until interrupted"""
+    from agent.agent import create_xdb_agent_from_env
+
+    async def main():
+        agent = create_xdb_agent_from_env(**agent_kwargs)
+        server = await XDBServer(agent, host, port, workers, max_concurrency).start()
+        print(f"XDB AI Connector serving on http://{host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,65 @@
+"""
+Shared fixtures: an in-process XDB stub (benchmarks/stub_server.py) and clients pointed at it
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from core.client import XDBAPIClient
+from core.config import XDBConfig
+from stub_server import StubServer
+
+@pytest.fixture(scope="session")
+def signing_pem() -> str:
+    key = ec.generate_private_key(ec.SECP256R1())
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption()).decode()
+
+@pytest.fixture
+def make_stub():
+    """Start stub servers with the given StubServer arguments; all are stopped after the test"""
+    servers = []
+
+    def make(**kwargs) -> StubServer:
+        kwargs.setdefault("memories_per_user", 10)
+        server = StubServer(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop()
+
+@pytest.fixture
+def stub(make_stub) -> StubServer:
+    return make_stub()
+
+@pytest.fixture
+def make_config(signing_pem):
+    def make(server: StubServer, **overrides) -> XDBConfig:
+        overrides.setdefault("retry_backoff_base", 0.001)
+        overrides.setdefault("retry_backoff_max", 0.005)
+        return XDBConfig(base_url=server.url, api_key="test", private_key_content=signing_pem, **overrides)
+    return make
+
+@pytest.fixture
+def make_client(make_config):
+    """XDBAPIClient against a stub; closed after the test"""
+    clients = []
+
+    def make(server: StubServer, **overrides) -> XDBAPIClient:
+        client = XDBAPIClient(make_config(server, **overrides))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
@@ -0,0 +1,68 @@
+"""
+Request coalescing, paged iteration and transcript submission against the stub
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from core.async_client import AsyncXDBAPIClient
+from utils.exceptions import XDBValidationError
+
+def test_concurrent_identical_lists_share_one_request(make_stub, make_client):
+    stub = make_stub(latency_ms=200)
+    client = make_client(stub)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def list_same():
+        barrier.wait()
+        results.append(client.list_memories("u", query="topic"))
+
+    threads = [threading.Thread(target=list_same) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.status for r in results] == ["Success"] * 8
+    assert stub.state.requests["/api/memory/list"] == 1
+    stats = client.coalescing_stats()["requests"]
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 7
+
+def test_iter_memories_follows_has_more(make_stub, make_client):
+    stub = make_stub(memories_per_user=25)
+    client = make_client(stub)
+    records = list(client.iter_memories("u", page_size=10))
+    assert [r.transaction_number for r in records] == [f"txn-{i}" for i in range(25)]
+    assert stub.state.requests["/api/memory/list"] == 3
+
+def test_iter_memories_without_has_more_is_one_page(make_stub, make_client):
+    stub = make_stub(memories_per_user=25, paging=False)
+    client = make_client(stub)
+    records = list(client.iter_memories("u", page_size=10))
+    assert len(records) == 25
+    assert stub.state.requests["/api/memory/list"] == 1
+
+@pytest.mark.parametrize("chunk_bytes", [0, 4096])
+def test_missing_transcript_is_refused_before_any_request(stub, make_client, make_config, tmp_path, chunk_bytes):
+    missing = str(tmp_path / "missing.json")
+    client = make_client(stub)
+    with pytest.raises(XDBValidationError, match="not found"):
+        client.process_transcript_text("u", missing, "t", chunk_bytes=chunk_bytes)
+
+    async def submit():
+        async with AsyncXDBAPIClient(make_config(stub)) as async_client:
+            await async_client.process_transcript_text("u", missing, "t", chunk_bytes=chunk_bytes)
+    with pytest.raises(XDBValidationError, match="not found"):
+        asyncio.run(submit())
+    assert stub.state.requests["/api/extraction/process-summary"] == 0
+
+def test_unparseable_transcript_is_refused(stub, make_client, tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"transcript": {"transcript_content": [{"speaker_name": "Ana"}]}}', encoding="utf-8")
+    with pytest.raises(XDBValidationError, match="parsing"):
+        make_client(stub).process_transcript_text("u", str(path), "t")
+    assert stub.state.requests["/api/extraction/process-summary"] == 0
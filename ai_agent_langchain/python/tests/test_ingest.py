@@ -0,0 +1,103 @@
+"""
+Bulk transcript ingestion: discovery, chunking, the resumable checkpoint and vanished files
+"""
+
+import json
+import os
+
+from core.ingest import IngestCheckpoint, TranscriptIngestor
+
+def write_transcripts(directory, lines_per_file):
+    for i, lines in enumerate(lines_per_file):
+        with open(directory / f"t{i}.txt", "w", encoding="utf-8") as f:
+            for j in range(lines):
+                f.write(f"Speaker {j % 3}: line {j} of the meeting notes here.\n")
+
+def checkpointed(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return {entry["path"]: entry for entry in map(json.loads, f)}
+
+def test_checkpoint_survives_a_torn_last_line(tmp_path):
+    transcript = tmp_path / "t.txt"
+    transcript.write_text("Ana: hello\n", encoding="utf-8")
+    path = str(tmp_path / "checkpoint.jsonl")
+
+    checkpoint = IngestCheckpoint(path)
+    checkpoint.record(str(transcript), os.stat(transcript), ["stub-1"])
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"path": "half')
+
+    reloaded = IngestCheckpoint(path)
+    assert reloaded.is_done(str(transcript), os.stat(transcript))
+    assert list(reloaded.done) == [str(transcript)]
+    reloaded.close()
+
+def test_checkpoint_forgets_a_changed_file(tmp_path):
+    transcript = tmp_path / "t.txt"
+    transcript.write_text("Ana: hello\n", encoding="utf-8")
+    checkpoint = IngestCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    checkpoint.record(str(transcript), os.stat(transcript), ["stub-1"])
+
+    transcript.write_text("Ana: hello again\n", encoding="utf-8")
+    assert not checkpoint.is_done(str(transcript), os.stat(transcript))
+    checkpoint.close()
+
+def test_discover_keeps_transcripts_in_a_stable_order(tmp_path):
+    for name in ("b.txt", "a.json", "c.mp4", "nested/d.vtt"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("x", encoding="utf-8")
+    ingestor = TranscriptIngestor(client=None, user_key="u", tag="t", max_in_flight=1)
+    names = [os.path.relpath(path, tmp_path) for path in ingestor.discover(str(tmp_path))]
+    assert names == ["a.json", "b.txt", os.path.join("nested", "d.vtt")]
+
+def test_every_chunk_is_checkpointed(make_stub, make_client, tmp_path):
+    transcripts = tmp_path / "in"
+    transcripts.mkdir()
+    write_transcripts(transcripts, [10, 400])
+    stub = make_stub(memories_per_user=0)
+    client = make_client(stub, transcript_chunk_bytes=4096)
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+
+    stats = TranscriptIngestor(client, "u", "t", workers=2, checkpoint_path=checkpoint).run(str(transcripts), "*.txt")
+    assert (stats.files, stats.failed) == (2, 0)
+    entries = checkpointed(checkpoint)
+    chunks = sorted(len(entry["process_ids"]) for entry in entries.values())
+    assert chunks[0] == 1 and chunks[1] > 1
+    assert all(process_id for entry in entries.values() for process_id in entry["process_ids"])
+    assert sum(chunks) == stub.state.requests["/api/extraction/process-summary"]
+
+    again = TranscriptIngestor(client, "u", "t", workers=2, checkpoint_path=checkpoint).run(str(transcripts), "*.txt")
+    assert (again.files, again.skipped) == (0, 2)
+
+def test_symlinked_file_is_ingested_once(stub, make_client, tmp_path):
+    transcripts = tmp_path / "in"
+    transcripts.mkdir()
+    write_transcripts(transcripts, [5, 5])
+    (transcripts / "z-link.txt").symlink_to(transcripts / "t0.txt")
+    client = make_client(stub, transcript_chunk_bytes=4096)
+    assert client.chunk_budget() == 4096
+
+    stats = TranscriptIngestor(client, "u", "t", workers=1, checkpoint_path=str(tmp_path / "checkpoint.jsonl")
+                               ).run(str(transcripts), "*.txt")
+    assert (stats.files, stats.failed) == (2, 0)
+    assert stub.state.requests["/api/extraction/process-summary"] == 2
+
+class VanishingIngestor(TranscriptIngestor):
+    """Discovers one file that is gone before it is looked at"""
+
+    def discover(self, root, pattern="**/*"):
+        yield str(self.vanished)
+        yield from super().discover(root, pattern)
+
+def test_file_removed_after_discovery_counts_as_failed(stub, make_client, tmp_path):
+    transcripts = tmp_path / "in"
+    transcripts.mkdir()
+    write_transcripts(transcripts, [5])
+    ingestor = VanishingIngestor(make_client(stub), "u", "t", workers=1,
+                                 checkpoint_path=str(tmp_path / "checkpoint.jsonl"))
+    ingestor.vanished = transcripts / "gone.txt"
+
+    stats = ingestor.run(str(transcripts), "*.txt")
+    assert (stats.files, stats.failed) == (1, 1)
+    assert "FileNotFoundError" in stats.errors[str(ingestor.vanished)]
@@ -0,0 +1,85 @@
+"""
+Encrypted local memory index: incremental sync, staleness and encryption at rest
+"""
+
+import os
+import time
+
+import pytest
+from Crypto.PublicKey import RSA
+
+def settle(index, timeout: float = 5.0):
+    """Wait for the background syncs a stale lookup scheduled"""
+    deadline = time.monotonic() + timeout
+    while index.stats()["pending_syncs"]:
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return RSA.generate(2048)
+
+@pytest.fixture
+def encrypted_stub(make_stub, rsa_key):
+    return make_stub(memories_per_user=30, rsa_public_key=rsa_key.publickey())
+
+@pytest.fixture
+def index_config(rsa_key, tmp_path):
+    return dict(rsa_private_key_content=rsa_key.export_key().decode(), local_index_path=str(tmp_path / "index"))
+
+def test_search_before_sync_falls_back(encrypted_stub, make_client, index_config):
+    index = make_client(encrypted_stub, **index_config).local_index
+    assert index.search("u", "memory") is None
+    settle(index)
+    assert index.stats()["syncs"] == 1
+
+def test_sync_decrypts_only_new_records(encrypted_stub, make_client, index_config):
+    client = make_client(encrypted_stub, **index_config)
+    index = client.local_index
+    assert index.sync("u") == 30
+
+    hits = index.search("u", "", ["topic3"])
+    assert [hit["transactionNumber"] for hit in hits] == ["txn-3", "txn-13", "txn-23"]
+    assert hits[0]["memory"] == "Memory 3 for u"
+    # A query word and a token, ranked like tools.output.rank: the token match weighs double
+    assert index.search("u", "memory 7", ["topic7"])[0]["transactionNumber"] == "txn-7"
+    assert index.search("u", "nothing-like-this") is None
+
+    client.create_memory("u", "bought zebra stripes", tag="zebra")
+    assert index.search("u", "zebra") is None  # written since the sync; resyncs in the background
+    settle(index)
+    assert index.stats()["decrypted"] == 31
+    assert index.search("u", "zebra")[0]["memory"] == "bought zebra stripes"
+
+def test_server_listing_past_the_watermark_marks_stale(stub, make_client, tmp_path):
+    client = make_client(stub, local_index_path=str(tmp_path / "index"))
+    index = client.local_index
+    index.sync("u")
+    newer = {"memory": "kiwi", "date": "2030-01-01T00:00:00Z", "transactionNumber": "txn-new", "tokens": []}
+    stub.state.created["u"]["memories"].append(newer)
+
+    index.observe("u", [newer])
+    assert index.stats()["watermark_misses"] == 1
+    assert index.search("u", "memory") is None
+    settle(index)
+    assert index.search("u", "kiwi")[0]["transactionNumber"] == "txn-new"
+
+def test_index_file_is_encrypted_and_reloads(encrypted_stub, make_client, index_config):
+    make_client(encrypted_stub, **index_config).local_index.sync("u")
+    files = os.listdir(index_config["local_index_path"])
+    assert len(files) == 1 and files[0].endswith(".idx")
+    with open(os.path.join(index_config["local_index_path"], files[0]), "rb") as f:
+        blob = f.read()
+    assert b"Memory" not in blob and b"topic" not in blob
+
+    reloaded = make_client(encrypted_stub, **index_config).local_index
+    assert reloaded.search("u", "memory 5")[0]["transactionNumber"] == "txn-5"
+    assert reloaded.sync("u") == 0
+
+def test_file_from_another_key_is_ignored(encrypted_stub, make_client, index_config):
+    make_client(encrypted_stub, **index_config).local_index.sync("u")
+    other = make_client(encrypted_stub, **index_config, local_index_key="another secret").local_index
+    assert not other.resident("u")
+    assert other.search("u", "memory") is None
+    assert other.resident("u")
+    settle(other)
@@ -0,0 +1,129 @@
+"""
+Circuit breaker, retries, hedged reads and malformed responses against the stub
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.config import parse_endpoint_timeouts
+from stub_server import StubState
+from utils.exceptions import XDBAPIError, XDBCircuitOpenError, XDBTransientError, XDBValidationError
+
+LIST = "/api/memory/list"
+CREATE = "/api/memory/create"
+
+def test_breaker_opens_half_opens_and_closes(stub, make_client):
+    client = make_client(stub, max_retries=0, breaker_failure_threshold=2, breaker_reset_seconds=0.1)
+    stub.state.error_rate = 1.0
+    for _ in range(2):
+        with pytest.raises(XDBTransientError):
+            client.list_memories("u")
+    assert client.breaker.state == "open"
+
+    # Open: fails fast without a request
+    with pytest.raises(XDBCircuitOpenError):
+        client.list_memories("u")
+    assert stub.state.requests[LIST] == 2
+
+    # Half-open: a failed probe opens the circuit again
+    time.sleep(0.15)
+    with pytest.raises(XDBTransientError):
+        client.list_memories("u")
+    assert client.breaker.state == "open"
+
+    # A successful probe closes it
+    time.sleep(0.15)
+    stub.state.error_rate = 0.0
+    assert client.list_memories("u").status == "Success"
+    assert client.breaker.state == "closed"
+    assert client.resilience_stats()["breaker"]["opened"] == 2
+
+def test_list_is_retried_on_503(stub, make_client):
+    client = make_client(stub, max_retries=2, breaker_failure_threshold=0)
+    stub.state.error_rate = 1.0
+    with pytest.raises(XDBTransientError):
+        client.list_memories("u")
+    assert stub.state.requests[LIST] == 3
+    assert client.resilience_stats()["retries"] == 2
+
+def test_create_is_not_retried(stub, make_client):
+    client = make_client(stub, max_retries=2, breaker_failure_threshold=0)
+    stub.state.error_rate = 1.0
+    with pytest.raises(XDBTransientError):
+        client.create_memory("u", "once")
+    assert stub.state.requests[CREATE] == 1
+
+def test_endpoint_timeouts_set_connect_and_read(stub, make_client, make_config):
+    timeouts = parse_endpoint_timeouts("/api/health=1.5:2, /api/memory/list=7")
+    client = make_client(stub, endpoint_timeouts=timeouts)
+    assert client._timeouts("/api/health") == (1.5, 2.0)
+    assert client._timeouts(LIST) == (5.0, 7.0)
+    assert client._timeouts("/api/extraction/process-summary") == (5.0, 120.0)
+    assert client._timeouts(CREATE) == (5.0, 30.0)
+    assert client.health_check().status == "Success"
+
+    for bad in ({"/api/health": (1, 2, 3)}, {"/api/health": (0, 2)}):
+        with pytest.raises(XDBValidationError):
+            make_config(stub, endpoint_timeouts=bad).validate()
+
+class FirstSlowState(StubState):
+    """Delays only the first request, so a hedge sent after it is the one to answer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def inject(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            time.sleep(0.5)
+        return False
+
+def test_hedge_wins_over_slow_primary(stub, make_client):
+    stub.state = FirstSlowState(memories_per_user=10)
+    client = make_client(stub, hedge_reads=True, hedge_delay=0.05)
+    start = time.perf_counter()
+    assert client.list_memories("u").status == "Success"
+    assert time.perf_counter() - start < 0.4
+    stats = client.resilience_stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+class EnvelopeHandler(BaseHTTPRequestHandler):
+    """Answers 200 with JSON that is not an XDB response envelope"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"[1]" if self.path == LIST else b'{"message": "no status"}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def envelope_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EnvelopeHandler)
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_malformed_envelope_reports_the_probe(envelope_server, make_client):
+    client = make_client(envelope_server, max_retries=0, breaker_reset_seconds=30)
+    client.breaker.state = "half-open"
+    for call in (client.list_memories, client.list_reminders):
+        with pytest.raises(XDBAPIError) as raised:
+            call("u")
+        assert not isinstance(raised.value, XDBCircuitOpenError)
+        assert client.breaker.state == "closed"
@@ -0,0 +1,39 @@
+"""
+Intent pre-router: which messages bypass the LLM and with what arguments
+"""
+
+import pytest
+
+from agent.router import IntentRouter
+
+@pytest.fixture
+def router():
+    return IntentRouter([])
+
+@pytest.mark.parametrize("message, content", [
+    ("Remember that I don't like mushrooms for user dan.", "I don't like mushrooms"),
+    ("Remember for user dan, that I like tea", "I like tea"),
+    ("Remember that my badge is 42 for user dan!", "my badge is 42")
+])
+def test_punctuation_after_the_key_is_not_part_of_it(router, message, content):
+    intent = router.route(message)
+    assert (intent.tool, intent.args) == ("create_memory", {"user_key": "dan", "content": content})
+
+def test_question_mark_after_the_key(router):
+    intent = router.route("Show all memories for user dan?")
+    assert (intent.tool, intent.args["user_key"]) == ("list_memories", "dan")
+
+@pytest.mark.parametrize("message, user_key", [
+    ("List my reminders for user dan.smith@example.com.", "dan.smith@example.com"),
+    ("List my reminders user_key: 'a.b-c+d'", "a.b-c+d")
+])
+def test_dots_inside_the_key_are_kept(router, message, user_key):
+    assert router.route(message).args["user_key"] == user_key
+
+@pytest.mark.parametrize("message", [
+    "Remember that I like tea",
+    "Remind me to call Ana for user dan",
+    "Remember that the meeting is tomorrow for user dan"
+])
+def test_ambiguous_messages_fall_through(router, message):
+    assert router.route(message) is None
@@ -0,0 +1,74 @@
+"""
+HTTP serving mode: request parsing and status codes, with the agent's client pointed at the stub
+"""
+
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agent.agent import XDBAIAgent
+from server import XDBServer
+
+@pytest.fixture
+def serve(stub, make_config):
+    """Run coroutine(server) against a started XDBServer; closes it afterwards"""
+    def run(coroutine):
+        async def main():
+            agent = XDBAIAgent(make_config(stub), llm=FakeListChatModel(responses=["ok"]), streaming=False,
+                               verbose=False)
+            server = await XDBServer(agent, port=0).start()
+            try:
+                return await coroutine(server)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+    return run
+
+async def exchange(server: XDBServer, head: bytes, body: bytes = b""):
+    """Send one raw request; returns the status code and the decoded JSON body"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    writer.write(head + b"Connection: close\r\n\r\n" + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), json.loads(payload)
+
+def post(path: str, body: bytes) -> tuple:
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n".encode(), body
+
+def test_list_memories(serve):
+    body = json.dumps({"user_key": "u", "limit": 3}).encode()
+    status, reply = serve(lambda server: exchange(server, *post("/memories/list", body)))
+    assert status == 200
+    assert (reply["total"], reply["offset"]) == (10, 0)
+    assert [memory["transactionNumber"] for memory in reply["memories"]] == ["txn-0", "txn-1", "txn-2"]
+
+def test_invalid_json_and_missing_fields_are_400(serve):
+    async def both(server):
+        return (await exchange(server, *post("/chat", b"{")),
+                await exchange(server, *post("/memories/list", b"{}")))
+    (invalid, _), (missing, reply) = serve(both)
+    assert (invalid, missing) == (400, 400)
+    assert "user_key" in reply["error"]
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_is_400(serve, length):
+    head = b"POST /chat HTTP/1.1\r\nContent-Length: " + length + b"\r\n"
+    status, reply = serve(lambda server: exchange(server, head))
+    assert status == 400
+    assert "Content-Length" in reply["error"]
+
+@pytest.mark.parametrize("body", [b"[1]", b'"x"', b"null"])
+def test_body_that_is_not_a_json_object_is_400(serve, body):
+    status, _ = serve(lambda server: exchange(server, *post("/chat", body)))
+    assert status == 400
+
+def test_unknown_route_and_wrong_method(serve):
+    async def both(server):
+        return (await exchange(server, b"GET /nope HTTP/1.1\r\n"),
+                await exchange(server, b"GET /chat HTTP/1.1\r\n"))
+    (missing, _), (wrong_method, _) = serve(both)
+    assert (missing, wrong_method) == (404, 405)
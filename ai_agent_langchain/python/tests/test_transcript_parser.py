@@ -0,0 +1,142 @@
+"""
+Streaming JSON transcripts and WebVTT/SubRip cues
+"""
+
+import io
+import json
+
+import pytest
+
+from utils.file_types import file_type_service
+from utils.transcript_parser import (
+    JSONStream, iter_sentence_segments, iter_srt_segments, iter_vtt_segments, iter_zoom_segments
+)
+
+ZOOM = {
+    "meeting": {"id": 1, "topic": "Launch [draft] {v2}", "tags": ["a", {"b": "c\\\"}"}]},
+    "transcript": {
+        "language": "en",
+        "transcript_content": [
+            {"speaker_name": "Ana", "text": "Café at ten", "start_time": 0},
+            {"speaker_name": "Bo", "text": "Agreed 👍", "start_time": 5}
+        ]
+    }
+}
+ZOOM_SEGMENTS = ["Ana: Café at ten ", "Bo: Agreed 👍 "]
+
+SENTENCES = [
+    {"speaker_name": "Ana", "sentence": "Hello", "startTime": "00:00", "endTime": "00:02"},
+    {"speaker_name": "Bo", "sentence": "Hi there", "startTime": "00:02", "endTime": "00:04"}
+]
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+def test_json_stream_skips_to_nested_array_across_chunks(chunk_size):
+    stream = JSONStream(io.StringIO(json.dumps(ZOOM, ensure_ascii=False)), chunk_size=chunk_size)
+    assert stream.find_key("transcript")
+    assert stream.find_key("transcript_content")
+    assert [item["speaker_name"] for item in stream.iter_array()] == ["Ana", "Bo"]
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+def test_json_stream_numbers_split_across_chunks(chunk_size):
+    # Sibling metadata is skipped value by value; a number cut after '.', 'e' or the sign must not end early
+    doc = {"a": 12.5, "b": -3.25e10, "c": 1e+20, "d": 7, "transcript": {"transcript_content": SENTENCES}}
+    stream = JSONStream(io.StringIO(json.dumps(doc)), chunk_size=chunk_size)
+    assert stream.find_key("transcript")
+    assert stream.find_key("transcript_content")
+    assert list(stream.iter_array()) == SENTENCES
+
+    numbers = JSONStream(io.StringIO("[12.5, -3.25e10, 1E+2, 0.001, 42]"), chunk_size=chunk_size)
+    assert list(numbers.iter_array()) == [12.5, -3.25e10, 100.0, 0.001, 42]
+    assert JSONStream(io.StringIO("-3.25e10"), chunk_size=chunk_size).read_value() == -3.25e10
+
+def test_json_stream_missing_key():
+    stream = JSONStream(io.StringIO('{"a": [1, 2], "b": {"c": null}}'))
+    assert not stream.find_key("transcript")
+
+def test_zoom_segments():
+    assert list(iter_zoom_segments(io.StringIO(json.dumps(ZOOM)))) == ZOOM_SEGMENTS
+
+def test_sentence_array_segments():
+    assert list(iter_sentence_segments(io.StringIO(json.dumps(SENTENCES)))) == [
+        "Ana[00:00-00:02]: Hello ", "Bo[00:02-00:04]: Hi there "]
+
+def test_empty_array():
+    assert list(iter_sentence_segments(io.StringIO("  [ ] "))) == []
+
+def test_bom_is_skipped_when_sniffing_and_parsing(tmp_path):
+    path = tmp_path / "meeting.json"
+    path.write_bytes(b"\xef\xbb\xbf" + json.dumps(ZOOM).encode("utf-8"))
+    with file_type_service.open_transcript(str(path)) as (name, segments):
+        assert name == "ZOOM_JSON"
+        assert list(segments) == ZOOM_SEGMENTS
+
+def test_utf8_split_across_read_buffers(tmp_path):
+    # Pad so multi-byte characters straddle the 64 KiB file buffer boundary
+    padding = "x" * (64 * 1024 - 40)
+    doc = {"transcript": {"transcript_content": [
+        {"speaker_name": "Ana", "text": padding + "é€👍" * 20}]}}
+    path = tmp_path / "big.json"
+    path.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+    assert file_type_service.read_transcript_message(str(path)) == f"Ana: {padding}{'é€👍' * 20} "
+
+def test_utf8_split_one_byte_at_a_time():
+    data = json.dumps(ZOOM, ensure_ascii=False).encode("utf-8")
+    text = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data), buffer_size=1), encoding="utf-8")
+    text._CHUNK_SIZE = 1
+    assert list(iter_zoom_segments(text)) == ZOOM_SEGMENTS
+
+VTT = """WEBVTT
+Kind: captions
+
+NOTE This block is a comment
+spanning two lines
+
+STYLE
+::cue { color: white }
+
+intro
+00:00:01.000 --> 00:00:03.500 align:start position:10%
+<v.loud Ana Lee>Welcome <b>everyone</b></v>
+
+00:00:04.000 --> 00:00:06.000
+Bo: Thanks for
+joining
+
+00:00:07.000 --> 00:00:08.000
+No speaker here
+"""
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+Ana: First line
+
+2
+00:00:03,000 --> 00:00:05,000
+<i>Second</i>
+line
+"""
+
+def test_vtt_cues():
+    assert list(iter_vtt_segments(io.StringIO(VTT))) == [
+        "Ana Lee[00:00:01.000-00:00:03.500]: Welcome everyone ",
+        "Bo[00:00:04.000-00:00:06.000]: Thanks for joining ",
+        "[00:00:07.000-00:00:08.000]: No speaker here "
+    ]
+
+def test_srt_cues():
+    assert list(iter_srt_segments(io.StringIO(SRT))) == [
+        "Ana[00:00:01,000-00:00:02,500]: First line ",
+        "[00:00:03,000-00:00:05,000]: Second line "
+    ]
+
+@pytest.mark.parametrize("name, content, expected", [
+    ("a.vtt", VTT, "VTT"),
+    ("a.srt", SRT, "SRT"),
+    ("a.txt", SRT, "SRT"),
+    ("a.json", json.dumps(SENTENCES), "JSON"),
+    ("a.txt", "Ana: hello\n", "TXT")
+])
+def test_format_detection(tmp_path, name, content, expected):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    assert file_type_service.detect_transcript_format(str(path)) == expected
@@ -0,0 +1,55 @@
+"""
+Write-behind journal: replay after a restart and per-user delivery order
+"""
+
+import asyncio
+import time
+
+from core.async_client import AsyncXDBAPIClient
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+def test_journal_is_replayed_in_per_user_order(stub, make_client, tmp_path):
+    journal = str(tmp_path / "journal.db")
+    options = dict(write_behind_path=journal, write_behind_flush_interval=0.05, breaker_failure_threshold=0)
+    stub.state.error_rate = 1.0
+
+    client = make_client(stub, **options)
+    for i in range(3):
+        for user_key in ("alice", "bob"):
+            result = client.create_memory(user_key, f"{user_key}-{i}")
+            assert result.status == "Success"
+            assert result.process_id.startswith("local-")
+    # Closing with the backend down keeps every write in the journal
+    client.close()
+    assert not stub.state.created["alice"]["memories"]
+
+    stub.state.error_rate = 0.0
+    restarted = make_client(stub, **options)
+    wait_for(lambda: restarted.write_behind.stats()["depth"] == 0)
+
+    for user_key in ("alice", "bob"):
+        delivered = [record["memory"] for record in stub.state.created[user_key]["memories"]]
+        assert delivered == [f"{user_key}-{i}" for i in range(3)]
+    assert restarted.write_behind.stats()["failed"] == 0
+
+def test_async_client_delivers_without_a_second_local_index(stub, make_config, tmp_path):
+    config = make_config(stub, write_behind_path=str(tmp_path / "journal.db"), write_behind_flush_interval=0.05,
+                         local_index_path=str(tmp_path / "index"))
+
+    async def write():
+        client = AsyncXDBAPIClient(config)
+        try:
+            assert client._delivery_client.local_index is None
+            result = await client.create_memory("alice", "hello")
+            assert result.process_id.startswith("local-")
+            await asyncio.to_thread(wait_for, lambda: client.write_behind.stats()["depth"] == 0)
+        finally:
+            await client.aclose()
+
+    asyncio.run(write())
+    assert [record["memory"] for record in stub.state.created["alice"]["memories"]] == ["hello"]
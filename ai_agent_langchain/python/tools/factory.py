@@ -2,173 +2,308 @@
 Tool factory for creating LangChain tools from XDB API client
 """
 
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
+import asyncio
 from langchain.tools import StructuredTool
-from Crypto.PublicKey import RSA
 
 from core.client import XDBAPIClient
-from core.models import ListMemoriesInput, CreateMemoryInput, ProcessTranscriptInput, CreateReminderInput
-from utils.rsa_encryption_service import RSAEncryption
+from core.models import (
+    XDBResponse, BulkItemResult, ListMemoriesInput, CreateMemoryInput, ProcessTranscriptInput,
+    CreateReminderInput, CreateMemoriesBatchInput, CreateRemindersBatchInput
+)
+from tools.output import compact_memory, compact_reminder, rank, render_page
+
+if TYPE_CHECKING:
+    from core.async_client import AsyncXDBAPIClient
 
 class XDBToolFactory:
     """Factory for creating LangChain tools from XDB API client"""
-    
-    def __init__(self, xdb_client: XDBAPIClient):
+
+    def __init__(self, xdb_client: XDBAPIClient, async_client: Optional['AsyncXDBAPIClient'] = None):
         self.xdb_client = xdb_client
-    
+        self.async_client = async_client
+
+    def _page(self, limit: Optional[int], offset: Optional[int]):
+        limit = limit if limit and limit > 0 else self.xdb_client.config.tool_page_size
+        return limit, max(offset or 0, 0)
+
+    def _format_memories(self, result: XDBResponse, query: str = "", tokens: List[str] = None,
+                         limit: Optional[int] = None, offset: Optional[int] = 0) -> str:
+        """Format one ranked, token-budgeted page of a list_memories response for the LLM,
+        decrypting encrypted memories"""
+        if result.status == "Success":
+            memories = result.data.get("memories", []) if result.data else []
+            if not memories:
+                return "No memories found for this user."
+
+            limit, offset = self._page(limit, offset)
+            if query or tokens:
+                # Ranking needs plaintext, so decrypt everything before picking the page
+                ranked = rank(self.xdb_client.decrypt_shared(memories),
+                              lambda m: m.get('memory', ''), lambda m: m.get('tokens', []), query, tokens)
+                page = ranked[offset:offset + limit]
+            else:
+                page = self.xdb_client.decrypt_shared(memories, offset, offset + limit)
+            return self._render_memories(page, len(memories), offset)
+        else:
+            return f"Error: {result.message}"
+
+    def _render_memories(self, page: List[dict], total: int, offset: int) -> str:
+        lines = [compact_memory(i, memory) for i, memory in enumerate(page, offset + 1)]
+        return render_page("memories", lines, total, offset, self.xdb_client.config.tool_output_tokens)
+
+    def _observe_local(self, user_key: str, result: XDBResponse):
+        """Let the local index check a server listing against its watermark"""
+        index = getattr(self.xdb_client, "local_index", None)
+        if index is not None and result.status == "Success" and result.data:
+            index.observe(user_key, result.data.get("memories") or [])
+
+    def _local_index_cold(self, user_key: str) -> bool:
+        index = getattr(self.xdb_client, "local_index", None)
+        return index is not None and not index.resident(user_key)
+
+    def _search_local(self, user_key: str, query: str, tokens: Optional[List[str]],
+                      limit: Optional[int], offset: Optional[int]) -> Optional[str]:
+        """A page of memories from the client's local index, None when the server has to be asked"""
+        index = getattr(self.xdb_client, "local_index", None)
+        if index is None or not (query or tokens):
+            return None
+        ranked = index.search(user_key, query, tokens)
+        if ranked is None:
+            return None
+        limit, offset = self._page(limit, offset)
+        return self._render_memories(ranked[offset:offset + limit], len(ranked), offset)
+
+    def _format_reminders(self, result: XDBResponse, query: str = "", tokens: List[str] = None,
+                          limit: Optional[int] = None, offset: Optional[int] = 0) -> str:
+        """Format one ranked, token-budgeted page of a list_reminders response for the LLM"""
+        if result.status == "Success":
+            reminders = result.data.get("reminders", []) if result.data else []
+            if not reminders:
+                return "No reminders found for this user."
+
+            limit, offset = self._page(limit, offset)
+            ranked = rank(reminders, lambda r: f"{r.get('reminder', '')} {r.get('event', '')}",
+                          lambda r: r.get('tokens', []), query, tokens)
+            lines = [compact_reminder(i, reminder) for i, reminder in enumerate(ranked[offset:offset + limit], offset + 1)]
+            return render_page("reminders", lines, len(reminders), offset, self.xdb_client.config.tool_output_tokens)
+        else:
+            return f"Error: {result.message}"
+
+    def _format_memory_created(self, result: XDBResponse) -> str:
+        if result.status == "Success":
+            return f"Memory created successfully!\nMessage: {result.message}\nProcess ID: {result.process_id or 'N/A'}"
+        else:
+            return f"Failed to create memory: {result.message}"
+
+    def _format_batch_created(self, kind: str, results: List[BulkItemResult]) -> str:
+        created = [r for r in results if r.success]
+        failed = [r for r in results if not r.success]
+        lines = [f"Created {len(created)} of {len(results)} {kind}."]
+        if created:
+            lines.append("Process IDs: " + ", ".join(r.process_id or 'N/A' for r in created))
+        for r in failed:
+            lines.append(f"Item {r.index + 1} failed: {r.error}")
+        return "\n".join(lines)
+
+    def _format_transcript_processed(self, result: XDBResponse) -> str:
+        chunks = result.data.get("chunks") if result.data else None
+        if chunks is not None:
+            process_ids = ", ".join(c["process_id"] or 'N/A' for c in chunks)
+            if result.status == "Success":
+                return f"Transcript text processed successfully!\nMessage: {result.message}\nSession ID: {result.data['sessionId']}\nProcess IDs: {process_ids}"
+            failures = "\n".join(f"Chunk {c['sequence']} failed: {c['message']}" for c in chunks if c["status"] != "Success")
+            return f"Failed to process transcript text: {result.message}\n{failures}"
+        if result.status == "Success":
+            return f"Transcript text processed successfully!\nMessage: {result.message}\nProcess ID: {result.process_id or 'N/A'}"
+        else:
+            return f"Failed to process transcript text: {result.message}"
+
     def create_list_memories_tool(self) -> StructuredTool:
         """Create tool for listing memories"""
-        def list_memories_tool(user_key: str, tokens: List[str] = None, query: str = "") -> str:
+        def list_memories_tool(user_key: str, tokens: List[str] = None, query: str = "",
+                               limit: Optional[int] = None, offset: int = 0) -> str:
             try:
+                local = self._search_local(user_key, query, tokens, limit, offset)
+                if local is not None:
+                    return local
                 result = self.xdb_client.list_memories(user_key, tokens, query)
-                
-                if result.status == "Success":
-                    memories = result.data.get("memories", []) if result.data else []
-                    if not memories:
-                        return "No memories found for this user."
-                    
-                    private_key = """"""
-                    
-                    rsaEncryption = RSAEncryption()
-                    rsaEncryption.private_key = RSA.import_key(private_key)  
-
-                    print("Decrypting memories..., Private Key loaded")  
-
-                    formatted_memories = []
-                    for i, memory in enumerate(memories, 1):
-                        memoryDecrypted = memory.get('memory', 'N/A')
-                        tokensDecrypted = []
-                        isEncrypted = memory.get('isEncrypted', False)
-                        if isEncrypted:
-                            memoryEnc = bytes.fromhex(memoryDecrypted)
-                            memoryDecrypted = rsaEncryption.rsa_decrypt_oaep(memoryEnc).decode('utf-8')
-
-                            for token in memory.get('tokens', []):
-                                tokenEnc = bytes.fromhex(token)
-                                tokenDecrypted = rsaEncryption.rsa_decrypt_oaep(tokenEnc).decode('utf-8')
-                                tokensDecrypted.append(tokenDecrypted)
-                        else:
-                            memoryDecrypted = memoryDecrypted    
-                            tokensDecrypted = memory.get('tokens', [])
-
-                        formatted_memory = f"""Memory {i}:
-                            - Content: {memoryDecrypted}
-                            - Date: {memory.get('date', 'N/A')}
-                            - Transaction: {memory.get('transactionNumber', 'N/A')}
-                            - Tokens: {', '.join(tokensDecrypted)}
-                            - Language: {memory.get('language') or 'Not specified'}
-                            - Encrypted: {memory.get('isEncrypted')} """
-                        formatted_memories.append(formatted_memory)
-                    
-                    return f"Found {len(memories)} memories:\n\n" + "\n\n".join(formatted_memories)
+                self._observe_local(user_key, result)
+                return self._format_memories(result, query, tokens, limit, offset)
+            except Exception as e:
+                return f"Error listing memories: {str(e)}"
+
+        async def alist_memories_tool(user_key: str, tokens: List[str] = None, query: str = "",
+                                      limit: Optional[int] = None, offset: int = 0) -> str:
+            try:
+                if self._local_index_cold(user_key):
+                    # Reading and decrypting the user's index file would stall the event loop
+                    local = await asyncio.to_thread(self._search_local, user_key, query, tokens, limit, offset)
                 else:
-                    return f"Error: {result.message}"
-                    
+                    local = self._search_local(user_key, query, tokens, limit, offset)
+                if local is not None:
+                    return local
+                result = await self.async_client.list_memories(user_key, tokens, query)
+                self._observe_local(user_key, result)
+                # Decryption is CPU bound, keep it off the event loop
+                return await asyncio.to_thread(self._format_memories, result, query, tokens, limit, offset)
             except Exception as e:
                 return f"Error listing memories: {str(e)}"
-        
+
         return StructuredTool.from_function(
             func=list_memories_tool,
+            coroutine=alist_memories_tool if self.async_client else None,
             name="list_memories",
-            description="List all memories for a user. You can optionally filter by tokens or search with a query string.",
+            description="List memories for a user, most relevant first. You can optionally filter by tokens or search with a query string. Results are paged: pass offset to get the next page.",
             args_schema=ListMemoriesInput
         )
 
     def create_list_reminders_tool(self) -> StructuredTool:
         """Create tool for listing reminders"""
-        def list_reminders_tool(user_key: str, tokens: List[str] = None, query: str = "") -> str:
+        def list_reminders_tool(user_key: str, tokens: List[str] = None, query: str = "",
+                                limit: Optional[int] = None, offset: int = 0) -> str:
             try:
                 result = self.xdb_client.list_reminders(user_key, tokens, query)
-                
-                if result.status == "Success":
-                    reminders = result.data.get("reminders", []) if result.data else []
-                    if not reminders:
-                        return "No memories found for this user."
-                    
-                    formatted_reminders = []
-                    for i, reminder in enumerate(reminders, 1):
-                        formatted_memory = f"""Reminder {i}:
-                            - Content: {reminder.get('reminder', 'N/A')}
-                            - Event Date: {reminder.get('eventDate', 'N/A')}
-                            - Event: {reminder.get('event', 'N/A')}"""
-                        formatted_reminders.append(formatted_memory)
-                    
-                    return f"Found {len(reminders)} reminders:\n\n" + "\n\n".join(formatted_reminders)
-                else:
-                    return f"Error: {result.message}"
-                    
+                return self._format_reminders(result, query, tokens, limit, offset)
+            except Exception as e:
+                return f"Error listing memories: {str(e)}"
+
+        async def alist_reminders_tool(user_key: str, tokens: List[str] = None, query: str = "",
+                                       limit: Optional[int] = None, offset: int = 0) -> str:
+            try:
+                result = await self.async_client.list_reminders(user_key, tokens, query)
+                return self._format_reminders(result, query, tokens, limit, offset)
             except Exception as e:
                 return f"Error listing memories: {str(e)}"
-        
+
         return StructuredTool.from_function(
             func=list_reminders_tool,
+            coroutine=alist_reminders_tool if self.async_client else None,
             name="list_reminders",
-            description="List all reminders for a user. You can optionally filter by tokens or search with a query string.",
+            description="List reminders for a user, most relevant first. You can optionally filter by tokens or search with a query string. Results are paged: pass offset to get the next page.",
             args_schema=ListMemoriesInput
-        )    
-    
+        )
+
     def create_create_memory_tool(self) -> StructuredTool:
         """Create tool for creating memories"""
         def create_memory_tool(user_key: str, content: str, tag: str = "", session_id: str = "") -> str:
             try:
                 result = self.xdb_client.create_memory(user_key, content, tag, session_id)
-                
-                if result.status == "Success":
-                    return f"Memory created successfully!\nMessage: {result.message}\nProcess ID: {result.process_id or 'N/A'}"
-                else:
-                    return f"Failed to create memory: {result.message}"
-                    
+                return self._format_memory_created(result)
+            except Exception as e:
+                return f"Error creating memory: {str(e)}"
+
+        async def acreate_memory_tool(user_key: str, content: str, tag: str = "", session_id: str = "") -> str:
+            try:
+                result = await self.async_client.create_memory(user_key, content, tag, session_id)
+                return self._format_memory_created(result)
             except Exception as e:
                 return f"Error creating memory: {str(e)}"
-        
+
         return StructuredTool.from_function(
             func=create_memory_tool,
+            coroutine=acreate_memory_tool if self.async_client else None,
             name="create_memory",
             description="Create a new memory for a user. Requires user key and content. Optional tag and session ID can be provided.",
             args_schema=CreateMemoryInput
         )
-    
+
     def create_create_reminder_tool(self) -> StructuredTool:
         """Create tool for creating memories"""
         def create_reminder_tool(user_key: str, content: str, tag: str = "", session_id: str = "") -> str:
             try:
                 result = self.xdb_client.create_reminder(user_key, content, tag, session_id)
-                
-                if result.status == "Success":
-                    return f"Memory created successfully!\nMessage: {result.message}\nProcess ID: {result.process_id or 'N/A'}"
-                else:
-                    return f"Failed to create memory: {result.message}"
-                    
+                return self._format_memory_created(result)
+            except Exception as e:
+                return f"Error creating memory: {str(e)}"
+
+        async def acreate_reminder_tool(user_key: str, content: str, tag: str = "", session_id: str = "") -> str:
+            try:
+                result = await self.async_client.create_reminder(user_key, content, tag, session_id)
+                return self._format_memory_created(result)
             except Exception as e:
                 return f"Error creating memory: {str(e)}"
-        
+
         return StructuredTool.from_function(
             func=create_reminder_tool,
+            coroutine=acreate_reminder_tool if self.async_client else None,
             name="create_reminder",
             description="Create a new reminder for a user. Requires user key and content. Optional tag and session ID can be provided.",
             args_schema=CreateReminderInput
         )
 
+    def create_create_memories_batch_tool(self) -> StructuredTool:
+        """Create tool for creating many memories in one call"""
+        def create_memories_batch_tool(user_key: str, contents: List[str], tag: str = "", session_id: str = "") -> str:
+            try:
+                items = [{"content": c, "tag": tag, "session_id": session_id} for c in contents]
+                return self._format_batch_created("memories", self.xdb_client.create_memories(user_key, items))
+            except Exception as e:
+                return f"Error creating memories: {str(e)}"
+
+        async def acreate_memories_batch_tool(user_key: str, contents: List[str], tag: str = "", session_id: str = "") -> str:
+            try:
+                items = [{"content": c, "tag": tag, "session_id": session_id} for c in contents]
+                return self._format_batch_created("memories", await self.async_client.create_memories(user_key, items))
+            except Exception as e:
+                return f"Error creating memories: {str(e)}"
+
+        return StructuredTool.from_function(
+            func=create_memories_batch_tool,
+            coroutine=acreate_memories_batch_tool if self.async_client else None,
+            name="create_memories_batch",
+            description="Create several memories for a user at once. Requires user key and a list of contents. Optional tag and session ID apply to all of them.",
+            args_schema=CreateMemoriesBatchInput
+        )
+
+    def create_create_reminders_batch_tool(self) -> StructuredTool:
+        """Create tool for creating many reminders in one call"""
+        def create_reminders_batch_tool(user_key: str, contents: List[str], tag: str = "", session_id: str = "") -> str:
+            try:
+                items = [{"content": c, "tag": tag, "session_id": session_id} for c in contents]
+                return self._format_batch_created("reminders", self.xdb_client.create_reminders(user_key, items))
+            except Exception as e:
+                return f"Error creating reminders: {str(e)}"
+
+        async def acreate_reminders_batch_tool(user_key: str, contents: List[str], tag: str = "", session_id: str = "") -> str:
+            try:
+                items = [{"content": c, "tag": tag, "session_id": session_id} for c in contents]
+                return self._format_batch_created("reminders", await self.async_client.create_reminders(user_key, items))
+            except Exception as e:
+                return f"Error creating reminders: {str(e)}"
+
+        return StructuredTool.from_function(
+            func=create_reminders_batch_tool,
+            coroutine=acreate_reminders_batch_tool if self.async_client else None,
+            name="create_reminders_batch",
+            description="Create several reminders for a user at once. Requires user key and a list of contents, each with its own time/date/event context.",
+            args_schema=CreateRemindersBatchInput
+        )
+
     def create_process_transcript_text_tool(self) -> StructuredTool:
         """Create tool for processing transcript text"""
         def process_transcript_text_tool(user_key:str, path: str, tag:str) -> str:
             try:
                 result = self.xdb_client.process_transcript_text(user_key, path, tag)
+                return self._format_transcript_processed(result)
+            except Exception as e:
+                return f"Error processing transcript text: {str(e)}"
 
-                if result.status == "Success":
-                    return f"Transcript text processed successfully!\nMessage: {result.message}\nProcess ID: {result.process_id or 'N/A'}"
-                else:
-                    return f"Failed to process transcript text: {result.message}"
+        async def aprocess_transcript_text_tool(user_key: str, path: str, tag: str) -> str:
+            try:
+                result = await self.async_client.process_transcript_text(user_key, path, tag)
+                return self._format_transcript_processed(result)
             except Exception as e:
                 return f"Error processing transcript text: {str(e)}"
 
         return StructuredTool.from_function(
             func=process_transcript_text_tool,
+            coroutine=aprocess_transcript_text_tool if self.async_client else None,
             name="process_transcript_text",
             description="Process transcript text for a user. Requires user key and content.",
             args_schema=ProcessTranscriptInput
-        )    
-    
+        )
+
     def create_all_tools(self) -> List[StructuredTool]:
         """Create all available XDB tools"""
         return [
@@ -176,5 +311,7 @@ class XDBToolFactory:
             self.create_create_memory_tool(),
             self.create_process_transcript_text_tool(),
             self.create_create_reminder_tool(),
-            self.create_list_reminders_tool()
-        ]
\ No newline at end of file
+            self.create_list_reminders_tool(),
+            self.create_create_memories_batch_tool(),
+            self.create_create_reminders_batch_tool()
+        ]
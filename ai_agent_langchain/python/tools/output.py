@@ -0,0 +1,73 @@
+"""
+Ranking and token-budgeted, paged rendering of list results for the LLM
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+from core.client import BYTES_PER_TOKEN
+from core.terms import TOKEN_WEIGHT, query_terms, terms, token_terms
+
+def rank(records: List[dict], text_of: Callable[[dict], str], tokens_of: Callable[[dict], Iterable[str]],
+         query: Optional[str] = "", tokens: Optional[List[str]] = None) -> List[dict]:
+    """Order records by overlap with the query words and filter tokens, best first.
+
+    Token matches weigh double since they are explicit tags. The sort is stable, so ties and
+    calls without a query keep the order the server returned.
+    """
+    wanted = query_terms(query, tokens)
+    if not wanted:
+        return list(records)
+
+    def score(record: dict) -> int:
+        return len(wanted & terms(text_of(record))) + TOKEN_WEIGHT * len(wanted & token_terms(tokens_of(record)))
+
+    return sorted(records, key=score, reverse=True)
+
+def compact_memory(number: int, memory: dict) -> str:
+    parts = [f"{number}. {memory.get('memory', 'N/A')}"]
+    if memory.get('date'):
+        parts.append(memory['date'])
+    if memory.get('tokens'):
+        parts.append("tags: " + ", ".join(memory['tokens']))
+    if memory.get('language'):
+        parts.append(f"lang: {memory['language']}")
+    if memory.get('transactionNumber'):
+        parts.append(f"txn: {memory['transactionNumber']}")
+    return " | ".join(parts)
+
+def compact_reminder(number: int, reminder: dict) -> str:
+    parts = [f"{number}. {reminder.get('reminder', 'N/A')}"]
+    if reminder.get('event'):
+        parts.append(f"event: {reminder['event']}")
+    if reminder.get('eventDate'):
+        parts.append(reminder['eventDate'])
+    return " | ".join(parts)
+
+def _estimate_tokens(text: str) -> int:
+    return -(-len(text.encode('utf-8')) // BYTES_PER_TOKEN)
+
+def render_page(kind: str, lines: List[str], total: int, offset: int, max_tokens: int) -> str:
+    """Join result lines until the token budget is spent and point at the next page.
+
+    At least one result is always shown, cut to the budget if it alone exceeds it.
+    """
+    shown: List[str] = []
+    used = 0
+    for line in lines:
+        cost = _estimate_tokens(line) + 1
+        if shown and used + cost > max_tokens:
+            break
+        if not shown and cost > max_tokens:
+            line = line[:max(max_tokens * BYTES_PER_TOKEN - 3, 1)] + "..."
+            cost = max_tokens
+        shown.append(line)
+        used += cost
+
+    if shown:
+        header = f"Found {total} {kind}, showing {offset + 1}-{offset + len(shown)}:"
+    else:
+        header = f"Found {total} {kind}, none at offset {offset}."
+    remaining = total - offset - len(shown)
+    if remaining > 0:
+        shown.append(f"... {remaining} more results; call again with offset={offset + len(shown)} to see them.")
+    return "\n".join([header] + shown)
@@ -0,0 +1,83 @@
+"""
+Parallel RSA-OAEP decryption of memory bodies and tokens
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.rsa_encryption_service import RSAEncryption
+
+# Per-process key, imported once by the pool initializer
+_worker_rsa: Optional[RSAEncryption] = None
+
+def _init_worker(pem: bytes):
+    global _worker_rsa
+    _worker_rsa = RSAEncryption.from_pem(pem)
+
+def _decrypt_batch(hex_ciphertexts: List[str]) -> List[str]:
+    return [_worker_rsa.rsa_decrypt_oaep(bytes.fromhex(c)).decode('utf-8') for c in hex_ciphertexts]
+
+class MemoryDecryptor:
+    """Decrypts hex-encoded RSA-OAEP ciphertexts, fanning large batches out to a process pool.
+
+    Results are always returned in input order. Small batches (below parallel_threshold)
+    or workers=0 decrypt serially in-process with a reused cipher.
+    """
+
+    def __init__(self, rsa_encryption: RSAEncryption, workers: int = 0,
+                 parallel_threshold: int = 64, chunk_size: int = 16):
+        self.rsa_encryption = rsa_encryption
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.rsa_encryption.export_pem(),)
+                )
+            return self._pool
+
+    def _decrypt_serial(self, ciphertexts: Iterable[str]) -> Iterator[str]:
+        for c in ciphertexts:
+            yield self.rsa_encryption.rsa_decrypt_oaep(bytes.fromhex(c)).decode('utf-8')
+
+    def decrypt_all(self, ciphertexts: List[str]) -> Iterator[str]:
+        """Decrypt hex ciphertexts, yielding plaintexts in input order as they become available"""
+        if self.workers <= 0 or len(ciphertexts) < self.parallel_threshold:
+            yield from self._decrypt_serial(ciphertexts)
+            return
+
+        chunks = [ciphertexts[i:i + self.chunk_size] for i in range(0, len(ciphertexts), self.chunk_size)]
+        for plaintexts in self._get_pool().map(_decrypt_batch, chunks):
+            yield from plaintexts
+
+    def decrypt_memories(self, memories: List[Dict]) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (content, tokens) per memory in order, decrypting the encrypted ones"""
+        # Flatten every ciphertext of every encrypted memory into one batch
+        ciphertexts = []
+        for memory in memories:
+            if memory.get('isEncrypted', False):
+                ciphertexts.append(memory.get('memory', ''))
+                ciphertexts.extend(memory.get('tokens', []))
+
+        plaintexts = self.decrypt_all(ciphertexts)
+        for memory in memories:
+            if memory.get('isEncrypted', False):
+                content = next(plaintexts)
+                tokens = [next(plaintexts) for _ in memory.get('tokens', [])]
+                yield content, tokens
+            else:
+                yield memory.get('memory', 'N/A'), memory.get('tokens', [])
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -20,4 +20,12 @@ class XDBAPIError(XDBError):
 
 class XDBConfigurationError(XDBError):
     """Raised when configuration is invalid"""
-    pass
\ No newline at end of file
+    pass
+
+class XDBTransientError(XDBAPIError):
+    """Raised when a request failed in a way worth retrying (timeout, connection error, 5xx, 429)"""
+    pass
+
+class XDBCircuitOpenError(XDBAPIError):
+    """Raised without calling the API while the circuit breaker is open"""
+    pass
@@ -1,8 +1,121 @@
+import io
 import os
+import re
 import mimetypes
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator, List, TextIO, Tuple
+
+from utils import transcript_parser
+
+_SRT_CUE = re.compile(r'^\s*\d+\s*\r?\n\s*\d{1,2}:\d{2}:\d{2}[,.]\d{1,3}\s*-->')
+_JSON_OBJECT = re.compile(r'^\s*\{\s*("|\})')
+_JSON_ARRAY = re.compile(r'^\s*\[\s*(\{|\])')
+
+@dataclass
+class TranscriptFormat:
+    """A transcript format: a sniffer over the first bytes of the file and a streaming parser"""
+    name: str
+    sniff: Callable[[str, str], bool]
+    parser: Callable[[TextIO], Iterator[str]]
+
+def _builtin_transcript_formats() -> List[TranscriptFormat]:
+    return [
+        TranscriptFormat("VTT", lambda head, ext: head.startswith('WEBVTT'), transcript_parser.iter_vtt_segments),
+        TranscriptFormat("SRT", lambda head, ext: ext == '.srt' or bool(_SRT_CUE.match(head)),
+                         transcript_parser.iter_srt_segments),
+        # Zoom exports are the only object-shaped JSON transcripts; the parser locates
+        # transcript.transcript_content wherever it appears in the document
+        TranscriptFormat("ZOOM_JSON", lambda head, ext: ext != '.txt' and bool(_JSON_OBJECT.match(head)),
+                         transcript_parser.iter_zoom_segments),
+        TranscriptFormat("JSON", lambda head, ext: ext != '.txt' and bool(_JSON_ARRAY.match(head)),
+                         transcript_parser.iter_sentence_segments),
+        TranscriptFormat("TXT", lambda head, ext: True, transcript_parser.iter_text_lines),
+    ]
 
 class FileTypes:
+    SNIFF_BYTES = 4096
+    FORMAT_CACHE_SIZE = 4096
+
+    def __init__(self):
+        self._transcript_formats = _builtin_transcript_formats()
+        self._format_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._format_cache_lock = threading.Lock()
+
+    def register_transcript_format(self, name: str, sniff: Callable[[str, str], bool],
+                                   parser: Callable[[TextIO], Iterator[str]]):
+        """Register a transcript format ahead of the built-in ones.
+
+        sniff(head, extension) sees the first SNIFF_BYTES of the file decoded as text;
+        parser(text_handle) yields the message segments.
+        """
+        self._transcript_formats = [f for f in self._transcript_formats if f.name != name]
+        self._transcript_formats.insert(0, TranscriptFormat(name, sniff, parser))
+        with self._format_cache_lock:
+            self._format_cache.clear()
+
+    def transcript_formats(self) -> List[str]:
+        return [f.name for f in self._transcript_formats]
+
+    def _get_transcript_format(self, name: str) -> TranscriptFormat:
+        return next(f for f in self._transcript_formats if f.name == name)
+
+    def _sniff_transcript_format(self, head: bytes, filepath: str) -> TranscriptFormat:
+        text = head.decode('utf-8', errors='ignore').lstrip('\ufeff')
+        extension = self.check_file_type_by_extension(filepath)
+        return next(f for f in self._transcript_formats if f.sniff(text, extension))
+
+    def _format_cache_key(self, filepath: str, stat: os.stat_result) -> Tuple[str, int, int]:
+        return (os.path.realpath(filepath), stat.st_mtime_ns, stat.st_size)
+
+    def _cached_format(self, key) -> str:
+        with self._format_cache_lock:
+            name = self._format_cache.get(key)
+            if name is not None:
+                self._format_cache.move_to_end(key)
+            return name
+
+    def _cache_format(self, key, name: str):
+        with self._format_cache_lock:
+            self._format_cache[key] = name
+            if len(self._format_cache) > self.FORMAT_CACHE_SIZE:
+                self._format_cache.popitem(last=False)
+
+    @contextmanager
+    def open_transcript(self, filepath) -> Iterator[Tuple[str, Iterator[str]]]:
+        """Open a transcript once and yield (format name, segment iterator).
+
+        The format is sniffed from a peek at the buffered handle, so the same handle is then
+        streamed by the format's parser. Detection is cached by (path, mtime, size).
+        """
+        stat = os.stat(filepath)
+        key = self._format_cache_key(filepath, stat)
+        with open(filepath, 'rb', buffering=64 * 1024) as raw:
+            name = self._cached_format(key)
+            if name is not None:
+                transcript_format = self._get_transcript_format(name)
+            else:
+                transcript_format = self._sniff_transcript_format(raw.peek(self.SNIFF_BYTES)[:self.SNIFF_BYTES], filepath)
+                self._cache_format(key, transcript_format.name)
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig')
+            try:
+                yield transcript_format.name, transcript_format.parser(text)
+            finally:
+                text.detach()
+
+    def detect_transcript_format(self, filepath) -> str:
+        """Name of the registered format matching the file"""
+        with self.open_transcript(filepath) as (name, _):
+            return name
+
+    def read_transcript_message(self, filepath) -> str:
+        """Parse a transcript file into the message text sent for summary extraction"""
+        with self.open_transcript(filepath) as (_, segments):
+            return transcript_parser.join_segments(segments)
+
     def check_file_type_by_extension(self, filepath):
         """Check file type using file extension"""
         _, extension = os.path.splitext(filepath)
@@ -59,22 +172,10 @@ class FileTypes:
     def detect_zoom_transcript_format(self, filepath):
         """Detect specific Zoom transcript format"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read(500)
-                
-            # Check for VTT format
-            if content.startswith('WEBVTT'):
-                return "VTT"
-            
-            # Check for JSON format with Zoom structure
-            if ('"speaker_name"' in content and 
-                '"start_time"' in content and 
-                '"end_time"' in content):
-                return "JSON"
-            
-            return "UNKNOWN"
+            name = self.detect_transcript_format(filepath)
         except Exception as e:
             return f"Error reading file: {e}"
+        return {"VTT": "VTT", "ZOOM_JSON": "JSON"}.get(name, "UNKNOWN")
         
     def is_video_file(self, filepath):
         """Check if file is a video"""
@@ -1,10 +1,35 @@
 from Crypto.Cipher import PKCS1_OAEP
+from Crypto.PublicKey import RSA
 
 class RSAEncryption:
-    def __init__(self):
-        self.private_key = None
-    
+    def __init__(self, private_key=None):
+        self._private_key = private_key
+        self._cipher = None
+
+    @classmethod
+    def from_pem(cls, pem) -> 'RSAEncryption':
+        """Import the private key once; the OAEP cipher is built lazily and reused"""
+        return cls(RSA.import_key(pem))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RSAEncryption':
+        with open(path, 'rb') as key_file:
+            return cls.from_pem(key_file.read())
+
+    @property
+    def private_key(self):
+        return self._private_key
+
+    @private_key.setter
+    def private_key(self, private_key):
+        self._private_key = private_key
+        self._cipher = None
+
+    def export_pem(self) -> bytes:
+        return self._private_key.export_key('PEM')
+
     def rsa_decrypt_oaep(self, ciphertext: bytes) -> bytes:
-        cipher = PKCS1_OAEP.new(self.private_key)
-        plaintext = cipher.decrypt(ciphertext)
-        return plaintext
\ No newline at end of file
+        if self._cipher is None:
+            self._cipher = PKCS1_OAEP.new(self._private_key)
+        plaintext = self._cipher.decrypt(ciphertext)
+        return plaintext
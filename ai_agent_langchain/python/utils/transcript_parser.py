@@ -0,0 +1,275 @@
+"""
+Streaming transcript parsing with memory bounded by a single segment
+"""
+
+import io
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Sequence, TextIO
+
+_WHITESPACE = ' \t\r\n'
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+# What may still follow a decoded number in the next chunk, e.g. "12." | "5" or "-3.25e" | "10"
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+class JSONStream:
+    """Incremental JSON reader over a text file handle.
+
+    Only a read-ahead window of the file is held in memory; values are decoded one at a
+    time with ``json.JSONDecoder.raw_decode`` and values that are not needed are skipped
+    without being materialized.
+    """
+
+    def __init__(self, fileobj: TextIO, chunk_size: int = 64 * 1024):
+        self._file = fileobj
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the window, dropping what was already consumed"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, '' at end of input"""
+        while True:
+            buf = self._buf
+            while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buf):
+                return buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of input'}'")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode and return the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Value is cut by the end of the window
+                if self._fill():
+                    continue
+                raise
+            if self._may_continue(value, end) and self._fill():
+                # A number or literal may continue in the next chunk
+                continue
+            self._pos = end
+            return value
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        """Whether the value decoded up to ``end`` could be the prefix of a longer one"""
+        if self._eof:
+            return False
+        if end == len(self._buf):
+            return True
+        # raw_decode stops before a dangling '.', 'e' or exponent sign
+        return isinstance(value, (int, float)) and _NUMBER_TAIL.match(self._buf, end).end() == len(self._buf)
+
+    def skip_value(self):
+        """Consume the next JSON value without building it"""
+        if self.peek() not in '{[':
+            self.read_value()
+            return
+
+        depth = 0
+        in_string = False
+        while True:
+            pattern = _STRING_END if in_string else _STRUCTURAL
+            match = pattern.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of input while skipping value")
+                continue
+            char = match.group()
+            self._pos = match.end()
+            if in_string:
+                if char == '\\':
+                    # Make sure the escaped character is in the window, then step over it
+                    if self._pos >= len(self._buf) and not self._fill():
+                        raise ValueError("Unexpected end of input in string escape")
+                    self._pos += 1
+                else:
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def find_key(self, key: str) -> bool:
+        """Inside an object, advance to the value of ``key``; False if the object ends first"""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return False
+        while True:
+            name = self.read_value()
+            self.expect(':')
+            if name == key:
+                return True
+            self.skip_value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == '}':
+                return False
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator or 'end of input'}'")
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array at the current position one at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator or 'end of input'}'")
+
+def iter_json_array(fileobj: TextIO, path: Sequence[str] = ()) -> Iterator[Any]:
+    """Stream the elements of the array found at ``path`` (a sequence of object keys)"""
+    stream = JSONStream(fileobj)
+    for key in path:
+        if not stream.find_key(key):
+            raise KeyError(key)
+    yield from stream.iter_array()
+
+def iter_zoom_segments(fileobj: TextIO) -> Iterator[str]:
+    """Zoom export: {"transcript": {"transcript_content": [{"speaker_name", "text"}, ...]}}"""
+    for segment in iter_json_array(fileobj, ("transcript", "transcript_content")):
+        yield f"{segment['speaker_name']}: {segment['text']} "
+
+def iter_sentence_segments(fileobj: TextIO) -> Iterator[str]:
+    """Generic export: [{"speaker_name", "sentence", "startTime", "endTime"}, ...]"""
+    for segment in iter_json_array(fileobj):
+        duration = f"{segment['startTime']}-{segment['endTime']}"
+        yield f"{segment['speaker_name']}[{duration}]: {segment['sentence']} "
+
+def iter_text_lines(fileobj: TextIO) -> Iterator[str]:
+    """Plain text transcript, one speaker line at a time"""
+    yield from fileobj
+
+_TAG = re.compile(r'<[^>]+>')
+_VOICE = re.compile(r'<v(?:\.[^\s>]+)*\s+([^>]+)>')
+_INLINE_SPEAKER = re.compile(r'^([^:\[\]]{1,64}):\s+(.*)$')
+
+def _iter_cue_blocks(fileobj: TextIO) -> Iterator[List[str]]:
+    """Yield the non-empty lines of each blank-line separated block"""
+    block = []
+    for line in fileobj:
+        line = line.strip()
+        if line:
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+def _format_cue(start: str, end: str, lines: List[str]) -> str:
+    text = " ".join(lines)
+    speaker = None
+    voice = _VOICE.search(text)
+    if voice:
+        speaker = voice.group(1).strip()
+    text = _TAG.sub("", text).strip()
+    if speaker is None:
+        inline = _INLINE_SPEAKER.match(text)
+        if inline:
+            speaker, text = inline.group(1).strip(), inline.group(2)
+    if speaker:
+        return f"{speaker}[{start}-{end}]: {text} "
+    return f"[{start}-{end}]: {text} "
+
+def _iter_cues(fileobj: TextIO) -> Iterator[str]:
+    for block in _iter_cue_blocks(fileobj):
+        timing_index = next((i for i, line in enumerate(block) if '-->' in line), None)
+        if timing_index is None:
+            # WEBVTT header, NOTE, STYLE and REGION blocks carry no cue timing
+            continue
+        start, _, rest = block[timing_index].partition('-->')
+        end = (rest.split() or [""])[0]
+        text_lines = block[timing_index + 1:]
+        if text_lines:
+            yield _format_cue(start.strip(), end, text_lines)
+
+def iter_vtt_segments(fileobj: TextIO) -> Iterator[str]:
+    """WebVTT: cues with optional identifiers, <v Speaker> voice tags and cue settings"""
+    yield from _iter_cues(fileobj)
+
+def iter_srt_segments(fileobj: TextIO) -> Iterator[str]:
+    """SubRip: numbered cues with "HH:MM:SS,mmm --> HH:MM:SS,mmm" timings"""
+    yield from _iter_cues(fileobj)
+
+def join_segments(segments: Iterable[str]) -> str:
+    """Assemble segments into one message in linear time"""
+    builder = io.StringIO()
+    for segment in segments:
+        builder.write(segment)
+    return builder.getvalue()
+
+def _split_utf8(segment: str, max_bytes: int) -> Iterator[str]:
+    """Split a segment larger than the budget on UTF-8 character boundaries"""
+    encoded = segment.encode('utf-8')
+    is_continuation = lambda i: i < len(encoded) and (encoded[i] & 0xC0) == 0x80
+    start = 0
+    while start < len(encoded):
+        end = min(start + max_bytes, len(encoded))
+        while end > start and is_continuation(end):
+            end -= 1
+        if end == start:
+            # Budget smaller than one character, emit the whole character
+            end = start + 1
+            while is_continuation(end):
+                end += 1
+        yield encoded[start:end].decode('utf-8')
+        start = end
+
+def chunk_segments(segments: Iterable[str], max_bytes: int) -> Iterator[str]:
+    """Group consecutive segments into chunks of at most max_bytes UTF-8 bytes.
+
+    Chunks break on segment (speaker) boundaries; only a segment that alone exceeds the
+    budget is split further.
+    """
+    builder = io.StringIO()
+    size = 0
+    for segment in segments:
+        segment_bytes = len(segment.encode('utf-8'))
+        if size and size + segment_bytes > max_bytes:
+            yield builder.getvalue()
+            builder = io.StringIO()
+            size = 0
+        if segment_bytes > max_bytes:
+            yield from _split_utf8(segment, max_bytes)
+            continue
+        builder.write(segment)
+        size += segment_bytes
+    if size:
+        yield builder.getvalue()